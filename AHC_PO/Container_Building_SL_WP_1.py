@@ -1,6 +1,8 @@
 import pandas as pd
 import math
 import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 
 #=================================================
 #       File path definitions (adjust as needed)
@@ -11,27 +13,6 @@ input_file_storage = '/Users/yingji/Documents/python/vs_code/python_playground/A
 input_file_urgent = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Urgent_Items.xlsx'
 output_file = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Container_Building_Output_6.xlsx'
 
-#=================================================
-#     Read Excel: Summary, SKU, StorageTiHi, Urgent Items
-#=================================================
-
-summary_df = pd.read_excel(os.path.expanduser(input_file_summary))
-supplier = summary_df.iloc[0]['Supplier']  # from first row
-storage_tihi_df = pd.read_excel(os.path.expanduser(input_file_storage))
-sku_dict_df = pd.read_excel(os.path.expanduser(input_file_sku))
-urgent_df = pd.read_excel(os.path.expanduser(input_file_urgent))
-
-# Build (location, item) -> urgent quantity map
-urgent_items = {(row['Location'], row['Item']): row['Urgent Quantity'] for _, row in urgent_df.iterrows()}
-
-# Build (location, item) -> cases_per_pallet map
-cases_per_pallet_map = {}
-for _, row in storage_tihi_df.iterrows():
-    loc = row['Location']
-    it = row['Item']
-    c_per_pal = row['Cases per pallet']
-    cases_per_pallet_map[(loc, it)] = c_per_pal
-
 #=================================================
 #          Constraints & constants
 #=================================================
@@ -43,10 +24,10 @@ UNSCENTED_ITEMS = {'10CA11WP0002', '10CA11WP0004', '10CA11WP0028', '10CA11WP0034
 # Define the locations for this special logic
 AHS_LOCATIONS = {'Source NJ', 'Source Montebello', 'Golden State FC LLC (AGL)', 'Northland Goreway'}
 
-if loc == 'Yanada':
-    CONTAINER_CBM_LIMIT = float('inf')  # No CBM limit
-else:
-    CONTAINER_CBM_LIMIT = 68
+CONTAINER_CBM_LIMIT = 68
+LOCATION_CBM_LIMITS = {
+    'Yanada': float('inf')  # No CBM limit
+}
 
 LOCATION_WEIGHT_LIMITS = {
     'Northland Goreway': 25000,
@@ -59,326 +40,621 @@ LOCATION_WEIGHT_LIMITS = {
 }
 ITEMS_PER_CONTAINER = 17
 
-def get_weight_limit(location):
-    return LOCATION_WEIGHT_LIMITS.get(location, 25000)
+# Weight of the weight ratio in the combined weight+volume sort score
+ALPHA = 0.5
+
+# How pallets are packed into containers:
+#   'greedy' - fill one container at a time, close it when the next pallet doesn't fit
+#   'ffd'    - first-fit decreasing: place pallets in the first open container with room
+#   'cpsat'  - minimize containers with OR-Tools CP-SAT (needs `pip install ortools`, else uses 'ffd')
+PACKING_MODE = 'greedy'
+CPSAT_TIME_LIMIT = 30  # seconds per packing pool
+# Locations are independent packing problems: with more than 1 worker each location is packed
+# in its own process (worth it for 'cpsat', which can take seconds per location)
+LOCATION_WORKERS = 1
+
+# Packing settings of the chosen plan; scenarios override any of these keys
+DEFAULT_SCENARIO = {
+    'alpha': ALPHA,
+    'cbm_limit': CONTAINER_CBM_LIMIT,  # for locations without their own LOCATION_CBM_LIMITS entry
+    'weight_scale': 1.0,               # multiplier on LOCATION_WEIGHT_LIMITS
+    'sort': 'combined',                # 'combined' score, 'load' (largest total load first) or 'input' order
+    'mode': PACKING_MODE
+}
+# Alternatives to compare with the chosen plan, as lists of values per DEFAULT_SCENARIO key; every
+# combination is packed from the same loaded data and summarized in a 'Scenarios' sheet. None = off.
+# e.g. {'alpha': [0.3, 0.5, 0.7], 'cbm_limit': [66, 68], 'sort': ['combined', 'load'], 'mode': ['greedy', 'ffd']}
+SCENARIO_GRID = None
+SCENARIO_WORKERS = os.cpu_count() or 1
+
+def get_weight_limit(location, scenario=None):
+    weight_scale = scenario['weight_scale'] if scenario else 1.0
+    return LOCATION_WEIGHT_LIMITS.get(location, 25000) * weight_scale
+
+def get_cbm_limit(location, scenario=None):
+    if location in LOCATION_CBM_LIMITS:
+        return LOCATION_CBM_LIMITS[location]
+    return scenario['cbm_limit'] if scenario else CONTAINER_CBM_LIMIT
+
+def get_category(item):
+    if item in SCENTED_ITEMS:
+        return 'A_Scented'  # 'A_' prefix ensures it's sorted first
+    elif item in UNSCENTED_ITEMS:
+        return 'B_Unscented'
+    else:
+        return 'C_Other'
+
 
 #=================================================
-#    Clean & check columns
+#     Read Excel: Summary, SKU, StorageTiHi, Urgent Items
 #=================================================
-sku_dict_df.columns = sku_dict_df.columns.str.strip().str.lower()
-required_cols = ['item', 'units per case/carton', 'unit weight', 'cbm per unit']
-for col in required_cols:
-    if col not in sku_dict_df.columns:
-        raise KeyError(f"Missing required column in SKU dictionary: {col}")
-
-summary_df.columns = summary_df.columns.str.strip()
-summary_df = summary_df[(summary_df['Item'].notnull()) & (summary_df['Item'] != 0)]
+def load_inputs():
+    summary_df = pd.read_excel(os.path.expanduser(input_file_summary))
+    storage_tihi_df = pd.read_excel(os.path.expanduser(input_file_storage))
+    sku_dict_df = pd.read_excel(os.path.expanduser(input_file_sku))
+    urgent_df = pd.read_excel(os.path.expanduser(input_file_urgent))
+    return summary_df, storage_tihi_df, sku_dict_df, urgent_df
 
-# Keep only needed columns from SKU
-sku_dict_df = sku_dict_df[['item','units per case/carton','unit weight','cbm per unit']]
 
 #=================================================
-#   Merge summary with SKU
+#    Clean, check columns & merge summary with SKU
 #=================================================
-merged_df = pd.merge(summary_df, sku_dict_df, left_on='Item', right_on='item', how='left')
+def build_merged_df(summary_df, sku_dict_df):
+    sku_dict_df = sku_dict_df.copy()
+    sku_dict_df.columns = sku_dict_df.columns.str.strip().str.lower()
+    required_cols = ['item', 'units per case/carton', 'unit weight', 'cbm per unit']
+    for col in required_cols:
+        if col not in sku_dict_df.columns:
+            raise KeyError(f"Missing required column in SKU dictionary: {col}")
+
+    summary_df = summary_df.copy()
+    summary_df.columns = summary_df.columns.str.strip()
+    summary_df = summary_df[(summary_df['Item'].notnull()) & (summary_df['Item'] != 0)]
+
+    # Keep only needed columns from SKU
+    sku_dict_df = sku_dict_df[['item','units per case/carton','unit weight','cbm per unit']]
+
+    merged_df = pd.merge(summary_df, sku_dict_df, left_on='Item', right_on='item', how='left')
+
+    # Convert numeric columns
+    merged_df['Quantity'] = pd.to_numeric(merged_df['Suggested Quantity'], errors='coerce').fillna(0)
+    merged_df['units per case/carton'] = pd.to_numeric(merged_df['units per case/carton'], errors='coerce').fillna(1)
+    merged_df['unit weight'] = pd.to_numeric(merged_df['unit weight'], errors='coerce').fillna(0)
+    merged_df['cbm per unit'] = pd.to_numeric(merged_df['cbm per unit'], errors='coerce').fillna(0)
 
-# Convert numeric columns
-merged_df['Quantity'] = pd.to_numeric(merged_df['Suggested Quantity'], errors='coerce').fillna(0)
-merged_df['units per case/carton'] = pd.to_numeric(merged_df['units per case/carton'], errors='coerce').fillna(1)
-merged_df['unit weight'] = pd.to_numeric(merged_df['unit weight'], errors='coerce').fillna(0)
-merged_df['cbm per unit'] = pd.to_numeric(merged_df['cbm per unit'], errors='coerce').fillna(0)
+    # (Optional) compute or store columns like 'Cases Needed', 'Density', etc.
+    merged_df['Cases Needed'] = (merged_df['Quantity']/merged_df['units per case/carton']).apply(math.ceil)
+    merged_df['Total Weight'] = merged_df['Cases Needed'] * merged_df['units per case/carton'] * merged_df['unit weight']
+    merged_df['Total CBM']    = merged_df['Cases Needed'] * merged_df['units per case/carton'] * merged_df['cbm per unit']
+    return merged_df
 
-# (Optional) compute or store columns like 'Cases Needed', 'Density', etc.
-merged_df['Cases Needed'] = (merged_df['Quantity']/merged_df['units per case/carton']).apply(math.ceil)
-merged_df['Total Weight'] = merged_df['Cases Needed'] * merged_df['units per case/carton'] * merged_df['unit weight']
-merged_df['Total CBM']    = merged_df['Cases Needed'] * merged_df['units per case/carton'] * merged_df['cbm per unit']
 
 #=================================================
 #   Separate urgent and non-urgent items
 #=================================================
-urgent_df = merged_df[merged_df.apply(lambda row: (row['Location'], row['Item']) in urgent_items, axis=1)]
-non_urgent_df = merged_df[~merged_df.apply(lambda row: (row['Location'], row['Item']) in urgent_items, axis=1)]
-
-# Update urgent_df quantities to match urgent quantities specified
-for index, row in urgent_df.iterrows():
-    key = (row['Location'], row['Item'])
-    if key in urgent_items:
-        urgent_df.at[index, 'Quantity'] = urgent_items[key]
-        remaining_quantity = row['Quantity'] - urgent_items[key]
-        if remaining_quantity > 0:
-            new_row = row.copy()
-            new_row['Quantity'] = remaining_quantity
-            non_urgent_df = pd.concat([non_urgent_df, pd.DataFrame([new_row])], ignore_index=True)
+def split_urgent(merged_df, urgent_df):
+    """
+    Splits items into urgent and non-urgent frames with one merge on (Location, Item):
+    urgent rows get the urgent quantity, the rest of their quantity (clipped at 0) becomes
+    a non-urgent row. Both frames carry an 'Urgent' flag used when packing.
+    """
+    urgent_qty = urgent_df.drop_duplicates(subset=['Location', 'Item'], keep='last')[['Location', 'Item', 'Urgent Quantity']]
+    df = pd.merge(merged_df, urgent_qty, on=['Location', 'Item'], how='left')
+    is_urgent = df['Urgent Quantity'].notna()
+
+    urgent = df[is_urgent].assign(Quantity=df['Urgent Quantity'], Urgent=True)
+    remainder = df[is_urgent].assign(Quantity=(df['Quantity'] - df['Urgent Quantity']).clip(lower=0), Urgent=False)
+    non_urgent = pd.concat([df[~is_urgent].assign(Urgent=False), remainder[remainder['Quantity'] > 0]], ignore_index=True)
+    return urgent.drop(columns='Urgent Quantity'), non_urgent.drop(columns='Urgent Quantity')
+
+
+def attach_cases_per_pallet(items_df, storage_tihi_df):
+    """Adds the ShippingTiHi 'Cases per pallet' of each (Location, Item); NaN when not listed."""
+    cases_per_pallet = storage_tihi_df.drop_duplicates(subset=['Location', 'Item'], keep='last')[['Location', 'Item', 'Cases per pallet']]
+    return pd.merge(items_df, cases_per_pallet, on=['Location', 'Item'], how='left')
+
 
 #=================================================
 #   Container & Pallet-based allocation
 #=================================================
-containers = []
-container_number = 1
+class PalletSpec:
+    """Per-pallet figures of one item at one location, computed once before packing."""
+    __slots__ = ('item', 'c_per_pal', 'units_per_carton', 'weight', 'cbm')
+
+    def __init__(self, item, c_per_pal, units_per_carton, unit_weight, cbm_per_unit):
+        self.item = item
+        self.c_per_pal = c_per_pal
+        self.units_per_carton = units_per_carton
+        units_per_pallet = c_per_pal * units_per_carton
+        self.weight = units_per_pallet * unit_weight
+        self.cbm = units_per_pallet * cbm_per_unit
 
 
-def open_new_container():
+class Container:
     """
-    Returns a new container dict with no items, ready for usage.
-    We'll fill in the rest once we know location, etc.
+    A container being packed: running weight & CBM totals plus an item -> line index,
+    so checking and adding pallets take constant time.
+    Container# (number) is assigned once all locations are packed.
     """
-    return {
-        'Container#': None,   # assign later
-        'Supplier': supplier,
-        'Location': None,
-        'Items': [],
-        'Total Weight': 0.0,
-        'Total CBM': 0.0,
-        'Weight Cap': 0.0,
-        'CBM Cap': 0.0
-    }
+    __slots__ = ('number', 'supplier', 'location', 'lines', 'line_index',
+                 'total_weight', 'total_cbm', 'weight_cap', 'cbm_cap')
+
+    def __init__(self, supplier, location, scenario=None):
+        self.number = None
+        self.supplier = supplier
+        self.location = location
+        self.lines = []        # one dict per item: Item, Quantity (units), Weight, CBM, Cartons
+        self.line_index = {}   # item -> position in lines
+        self.total_weight = 0.0
+        self.total_cbm = 0.0
+        self.weight_cap = get_weight_limit(location, scenario)
+        self.cbm_cap = get_cbm_limit(location, scenario)
+
+    def max_pallets(self, spec):
+        """
+        Closed-form number of whole pallets of the item that still fit,
+        from the remaining weight & CBM headroom. Returns inf if nothing limits it.
+        A container holding ITEMS_PER_CONTAINER lines takes no more pallets, not even of an item it already has.
+        """
+        if len(self.lines) >= ITEMS_PER_CONTAINER:
+            return 0
+        limit = float('inf')
+        if spec.weight > 0 and self.weight_cap != float('inf'):
+            limit = min(limit, math.floor((self.weight_cap - self.total_weight) / spec.weight + 1e-9))
+        if spec.cbm > 0 and self.cbm_cap != float('inf'):
+            limit = min(limit, math.floor((self.cbm_cap - self.total_cbm) / spec.cbm + 1e-9))
+        return max(0, limit)
+
+    def can_fit(self, pallets, spec):
+        """Check if 'pallets' (may be float for partial leftover) fit by weight, CBM & item count."""
+        return (self.total_weight + pallets * spec.weight <= self.weight_cap
+                and self.total_cbm + pallets * spec.cbm <= self.cbm_cap
+                and len(self.lines) < ITEMS_PER_CONTAINER)
+
+    def add(self, pallets, spec):
+        """Adds that many full or partial pallets of the item."""
+        cartons = pallets * spec.c_per_pal
+        weight = pallets * spec.weight
+        cbm = pallets * spec.cbm
+        self.total_weight += weight
+        self.total_cbm += cbm
+
+        idx = self.line_index.get(spec.item)
+        if idx is None:
+            self.line_index[spec.item] = len(self.lines)
+            self.lines.append({'Item': spec.item, 'Quantity': 0, 'Weight': 0.0, 'CBM': 0.0, 'Cartons': 0})
+            idx = len(self.lines) - 1
+        line = self.lines[idx]
+        line['Quantity'] += cartons * spec.units_per_carton  # units
+        line['Weight'] += weight
+        line['CBM'] += cbm
+        line['Cartons'] += cartons
 
 
-def can_fit_pallets(container, pallets_to_add, item_dict, c_per_pal):
+#=================================================
+#    Combined weight+volume heuristic (alpha=0.5)
+#=================================================
+def sort_location_items(location, loc_items_df, supplier, scenario):
     """
-    Check if 'pallets_to_add' (may be float for partial leftover)
-    can fit in the container by weight & CBM constraints.
+    Sorts one location's items by the scenario's sort strategy:
+      'combined': combined_score = alpha*(unit_weight/location_weight_limit) + (1-alpha)*(cbm_per_unit/location_cbm_limit)
+      'load':     combined_score of the item's whole quantity, largest first
+      'input':    keep the input order
+    grouping scented/unscented items first for American Hygienics Corporation at AHS_LOCATIONS.
     """
-    upc = item_dict['units per case/carton']
-    wpu = item_dict['unit weight']
-    cpu = item_dict['cbm per unit']
+    alpha = scenario['alpha']
+    loc_items_df = loc_items_df.copy()
+    loc_items_df['combined_score'] = (
+        alpha * (loc_items_df['unit weight'] / get_weight_limit(location, scenario))
+        + (1 - alpha) * (loc_items_df['cbm per unit'] / get_cbm_limit(location, scenario))
+    )
+    if scenario['sort'] == 'load':
+        loc_items_df['combined_score'] *= loc_items_df['Quantity']
+    elif scenario['sort'] == 'input':
+        loc_items_df['combined_score'] = 0
+    if supplier == 'American Hygienics Corporation' and location in AHS_LOCATIONS:
+        # Sort by Category first, then by the original score
+        loc_items_df['Category'] = loc_items_df['Item'].apply(get_category)
+        return loc_items_df.sort_values(by=['Category', 'combined_score'], ascending=[True, False], kind='stable')
+    # Original logic: Sort by score only for all other suppliers/locations
+    return loc_items_df.sort_values(by='combined_score', ascending=False, kind='stable')
 
-    # total cartons = pallets_to_add * c_per_pal
-    # total units   = that * upc
-    total_cartons = pallets_to_add * c_per_pal
-    weight_needed = total_cartons * upc * wpu
-    cbm_needed = total_cartons * upc * cpu
 
-    if container['Total Weight'] + weight_needed <= container['Weight Cap'] and \
-            container['Total CBM'] + cbm_needed <= container['CBM Cap'] and \
-            len(container['Items']) < ITEMS_PER_CONTAINER:
-        return True
-    return False
+def to_pallet_list(items_df):
+    """Turns sorted item rows into (PalletSpec, total pallets as float) tuples."""
+    # units -> cartons -> pallets, treating missing or <1 carton/pallet sizes as 1
+    upc = items_df['units per case/carton'].where(items_df['units per case/carton'] >= 1, 1)
+    c_per_pal = items_df['Cases per pallet'].fillna(1)
+    c_per_pal = c_per_pal.where(c_per_pal >= 1, 1)
+    total_pallets = items_df['Quantity'] / upc / c_per_pal
+    return [(PalletSpec(item, cpp, units_per_carton, unit_weight, cbm_per_unit), pallets)
+            for item, cpp, units_per_carton, unit_weight, cbm_per_unit, pallets
+            in zip(items_df['Item'], c_per_pal, items_df['units per case/carton'],
+                   items_df['unit weight'], items_df['cbm per unit'], total_pallets)]
 
 
-def add_pallets_to_container(container, pallets_to_add, item_dict, c_per_pal):
+def pack_greedy(location, pallet_list, supplier, scenario, warn=True):
     """
-    Actually update container with that many full or partial pallets for the item.
+    Fills one container at a time: full pallets first, then the partial leftover,
+    closing the container as soon as the next pallet doesn't fit.
+    warn=False skips the unfit-pallet warnings (for comparison runs that another packer reports).
     """
-    upc = item_dict['units per case/carton']
-    wpu = item_dict['unit weight']
-    cpu = item_dict['cbm per unit']
-
-    total_cartons = pallets_to_add * c_per_pal
-    weight_to_add = total_cartons * upc * wpu
-    cbm_to_add = total_cartons * upc * cpu
-
-    container['Total Weight'] += weight_to_add
-    container['Total CBM'] += cbm_to_add
-
-    # Update or create an entry in container['Items']
-    found = None
-    for i in container['Items']:
-        if i['Item'] == item_dict['Item']:
-            found = i
-            break
-    if found:
-        found['Quantity'] += total_cartons * upc  # total units
-        found['Weight'] += weight_to_add
-        found['CBM'] += cbm_to_add
-        found['Cartons'] += total_cartons
-    else:
-        container['Items'].append({
-            'Item': item_dict['Item'],
-            'Quantity': total_cartons * upc,  # units
-            'Weight': weight_to_add,
-            'CBM': cbm_to_add,
-            'Cartons': total_cartons
-        })
+    containers = []
+    current_container = None
+    for spec, total_pallets_float in pallet_list:
+        leftover_pallets = total_pallets_float
+
+        #-----------------------------------------
+        #  Allocate FULL pallets first
+        #-----------------------------------------
+        while leftover_pallets >= 1:
+            if current_container is None:
+                current_container = Container(supplier, location, scenario)
+            placed = min(math.floor(leftover_pallets), current_container.max_pallets(spec))
+            if placed == 0:
+                if not current_container.lines:
+                    if warn:
+                        print(f"WARNING: Single pallet of {spec.item} doesn't fit an empty container at {location}.")
+                    leftover_pallets = 0
+                    break
+                # close container, open a new one
+                containers.append(current_container)
+                current_container = Container(supplier, location, scenario)
+                continue
+            current_container.add(placed, spec)
+            leftover_pallets -= placed
+
+        #-----------------------------------------
+        #  If leftover_pallets < 1 => partial leftover
+        #-----------------------------------------
+        if leftover_pallets > 0:
+            if current_container is None:
+                current_container = Container(supplier, location, scenario)
+            if not current_container.can_fit(leftover_pallets, spec):
+                # finalize and open new container
+                if current_container.lines:
+                    containers.append(current_container)
+                    current_container = Container(supplier, location, scenario)
+                if not current_container.can_fit(leftover_pallets, spec):
+                    if warn:
+                        print(f"WARNING: partial leftover pallet {round(leftover_pallets, 3)} of {spec.item} doesn't fit even in empty container at {location}. Skipping leftover.")
+                    leftover_pallets = 0
+            if leftover_pallets > 0:
+                current_container.add(leftover_pallets, spec)
 
+    # finalize the last container if not empty
+    if current_container is not None and current_container.lines:
+        containers.append(current_container)
+    return containers
 
-#=================================================
-#    Combined weight+volume heuristic (alpha=0.5)
-#=================================================
-alpha = 0.5
 
-for location, loc_items_df in pd.concat([urgent_df, non_urgent_df]).groupby('Location'):
-    location_weight_limit = get_weight_limit(location)
+def drop_unfit_pallets(location, pallet_list, supplier, scenario):
+    """
+    Splits each item into (PalletSpec, full pallets, partial pallet) and drops the pallets
+    that don't fit even an empty container, with the same warnings as the greedy packer.
+    """
+    pieces = []
+    empty = Container(supplier, location, scenario)
+    for spec, total_pallets_float in pallet_list:
+        full = math.floor(total_pallets_float)
+        partial = total_pallets_float - full
+        if full == 0 and partial <= 0:
+            continue
+        if full and empty.max_pallets(spec) == 0:
+            print(f"WARNING: Single pallet of {spec.item} doesn't fit an empty container at {location}.")
+            continue
+        if partial > 0 and not empty.can_fit(partial, spec):
+            print(f"WARNING: partial leftover pallet {round(partial, 3)} of {spec.item} doesn't fit even in empty container at {location}. Skipping leftover.")
+            partial = 0
+        pieces.append((spec, full, partial))
+    return pieces
+
+
+def pallet_footprint(location, spec, scenario):
+    """Combined weight+volume share of one pallet of the item in an empty container."""
+    return (scenario['alpha'] * spec.weight / get_weight_limit(location, scenario)
+            + (1 - scenario['alpha']) * spec.cbm / get_cbm_limit(location, scenario))
+
+
+def pack_ffd(location, pallet_list, supplier, scenario):
+    """
+    First-fit decreasing: items in decreasing pallet footprint, each pallet goes to the first
+    open container with room (full pallets in one closed-form step per container).
+    """
+    pieces = drop_unfit_pallets(location, pallet_list, supplier, scenario)
+    return pack_ffd_pieces(location, pieces, supplier, scenario)
+
+
+def pack_ffd_pieces(location, pieces, supplier, scenario):
+    """pack_ffd on (PalletSpec, full pallets, partial pallet) pieces that already fit an empty container."""
+    pieces = sorted(pieces, key=lambda p: pallet_footprint(location, p[0], scenario), reverse=True)
+    containers = []
+    for spec, full, partial in pieces:
+        for container in containers:
+            if full == 0:
+                break
+            placed = min(full, container.max_pallets(spec))
+            if placed:
+                container.add(placed, spec)
+                full -= placed
+        while full > 0:
+            container = Container(supplier, location, scenario)
+            placed = min(full, container.max_pallets(spec))
+            container.add(placed, spec)
+            containers.append(container)
+            full -= placed
+        if partial > 0:
+            target = next((c for c in containers if c.can_fit(partial, spec)), None)
+            if target is None:
+                target = Container(supplier, location, scenario)
+                containers.append(target)
+            target.add(partial, spec)
+    return containers
+
+
+def pack_cpsat(location, pallet_list, supplier, scenario, time_limit=CPSAT_TIME_LIMIT):
+    """
+    Minimizes the number of containers with OR-Tools CP-SAT, starting from the 'ffd' plan as the
+    upper bound. Full pallets may be split across containers, each partial pallet goes to one container.
+    Keeps the 'ffd' plan if ortools is missing or no better plan is found within time_limit seconds.
+    """
+    pieces = drop_unfit_pallets(location, pallet_list, supplier, scenario)
+    ffd_containers = pack_ffd_pieces(location, pieces, supplier, scenario)
+    if len(ffd_containers) <= 1:
+        return ffd_containers
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError:
+        print("WARNING: ortools is not installed (pip install ortools); using 'ffd' packing.")
+        return ffd_containers
+
+    n_containers = len(ffd_containers)
+    weight_cap = get_weight_limit(location, scenario)
+    cbm_cap = get_cbm_limit(location, scenario)
+    # CP-SAT needs integers: grams and cm3, rounded against us so the plan always fits
+    scaled_caps = []
+    for cap, key, scale in ((weight_cap, 'weight', 1000), (cbm_cap, 'cbm', 1000000)):
+        if cap != float('inf'):
+            scaled_caps.append((math.floor(cap * scale), key, scale))
+
+    model = cp_model.CpModel()
+    used = [model.NewBoolVar(f"used_{c}") for c in range(n_containers)]
+    full_vars, partial_vars = [], []
+    for k, (spec, full, partial) in enumerate(pieces):
+        x = [model.NewIntVar(0, full, f"full_{k}_{c}") for c in range(n_containers)]
+        q = [model.NewBoolVar(f"partial_{k}_{c}") for c in range(n_containers)] if partial > 0 else []
+        present = [model.NewBoolVar(f"present_{k}_{c}") for c in range(n_containers)]
+        model.Add(sum(x) == full)
+        if q:
+            model.Add(sum(q) == 1)
+        for c in range(n_containers):
+            model.Add(x[c] <= full * present[c])
+            if q:
+                model.Add(q[c] <= present[c])
+        full_vars.append(x)
+        partial_vars.append((q, present))
+    for c in range(n_containers):
+        model.Add(sum(present[c] for _, present in partial_vars) <= ITEMS_PER_CONTAINER * used[c])
+        for cap, key, scale in scaled_caps:
+            load = []
+            for k, (spec, full, partial) in enumerate(pieces):
+                per_pallet = getattr(spec, key) * scale
+                load.append(math.ceil(per_pallet) * full_vars[k][c])
+                if partial > 0:
+                    load.append(math.ceil(per_pallet * partial) * partial_vars[k][0][c])
+            model.Add(sum(load) <= cap * used[c])
+        if c:
+            model.Add(used[c] <= used[c - 1])
+    model.Minimize(sum(used))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE) or solver.ObjectiveValue() >= n_containers:
+        return ffd_containers
+
+    containers = []
+    for c in range(n_containers):
+        if not solver.Value(used[c]):
+            continue
+        container = Container(supplier, location, scenario)
+        for k, (spec, full, partial) in enumerate(pieces):
+            if solver.Value(full_vars[k][c]):
+                container.add(solver.Value(full_vars[k][c]), spec)
+            if partial > 0 and solver.Value(partial_vars[k][0][c]):
+                container.add(partial, spec)
+        if container.lines:
+            containers.append(container)
+    return containers
+
+
+PACKERS = {
+    'greedy': pack_greedy,
+    'ffd': pack_ffd,
+    'cpsat': pack_cpsat
+}
 
-    # For each item, compute a combined_score
-    # = alpha*(unit_weight/location_weight_limit) + (1-alpha)*(cbm_per_unit/CONTAINER_CBM_LIMIT)
-    loc_items_df['combined_score'] = (
-        alpha * (loc_items_df['unit weight'] / location_weight_limit)
-        + (1 - alpha) * (loc_items_df['cbm per unit'] / CONTAINER_CBM_LIMIT)
-    )
 
-    # =================================================
-    #   >>> NEW LOGIC: Conditional sorting by category <<<
-    # =================================================
-    if supplier == 'American Hygienics Corporation' and location in AHS_LOCATIONS:
-        # Define a function to assign a category to an item
-        def get_category(item):
-            if item in SCENTED_ITEMS:
-                return 'A_Scented'  # 'A_' prefix ensures it's sorted first
-            elif item in UNSCENTED_ITEMS:
-                return 'B_Unscented'
+def pack_location(location, loc_items_df, supplier, scenario=None):
+    """
+    Packs one location's items into containers. Urgent items are packed first, in containers
+    of their own. With 'ffd'/'cpsat', scented/unscented/other items at AHS locations are packed
+    in separate containers so the category grouping is kept, and for each of these pools the
+    greedy plan is used instead whenever it needs fewer containers. scenario overrides
+    DEFAULT_SCENARIO settings.
+    """
+    scenario = {**DEFAULT_SCENARIO, **(scenario or {})}
+    mode = scenario['mode']
+    loc_items_df = sort_location_items(location, loc_items_df, supplier, scenario)
+
+    # Separate urgent and non-urgent containers for priority processing
+    is_urgent = loc_items_df['Urgent'].astype(bool)
+    urgent_items_df = loc_items_df[is_urgent]
+    non_urgent_items_df = loc_items_df[~is_urgent]
+
+    location_containers = []
+    for items_df in [urgent_items_df, non_urgent_items_df]:
+        if mode == 'greedy':
+            location_containers.extend(pack_greedy(location, to_pallet_list(items_df), supplier, scenario))
+            continue
+        if 'Category' in items_df.columns:
+            pools = [group for _, group in items_df.groupby('Category', sort=True)]
+        else:
+            pools = [items_df]
+        for pool_df in pools:
+            pallet_list = to_pallet_list(pool_df)
+            mode_containers = PACKERS[mode](location, pallet_list, supplier, scenario)
+            # The mode packer already warned about unfit pallets
+            greedy_containers = pack_greedy(location, pallet_list, supplier, scenario, warn=False)
+            if len(mode_containers) < len(greedy_containers):
+                location_containers.extend(mode_containers)
             else:
-                return 'C_Other'
+                location_containers.extend(greedy_containers)
+    return location_containers
 
-        # Create a new 'Category' column
-        loc_items_df['Category'] = loc_items_df['Item'].apply(get_category)
 
-        # Sort by Category first, then by the original score
-        loc_items_df = loc_items_df.sort_values(by=['Category', 'combined_score'], ascending=[True, False])
+def pack_all_locations(items_df, supplier, scenario=None, workers=LOCATION_WORKERS):
+    """
+    Packs every location and numbers the containers 1..N in location order, then packing order,
+    so the plan is the same whether locations were packed sequentially or in parallel.
+    """
+    location_groups = list(items_df.groupby('Location'))
+    if workers > 1 and len(location_groups) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(location_groups))) as executor:
+            futures = [executor.submit(pack_location, location, loc_items_df, supplier, scenario)
+                       for location, loc_items_df in location_groups]
+            results = [future.result() for future in futures]
     else:
-        # Original logic: Sort by score only for all other suppliers/locations
-        loc_items_df = loc_items_df.sort_values(by='combined_score', ascending=False)
+        results = [pack_location(location, loc_items_df, supplier, scenario)
+                   for location, loc_items_df in location_groups]
 
-    # Separate urgent and non-urgent containers for priority processing
-    urgent_items_df = loc_items_df[loc_items_df.apply(lambda row: (row['Location'], row['Item']) in urgent_items, axis=1)]
-    non_urgent_items_df = loc_items_df[~loc_items_df.apply(lambda row: (row['Location'], row['Item']) in urgent_items, axis=1)]
+    containers = [container for location_containers in results for container in location_containers]
+    for container_number, container in enumerate(containers, 1):
+        container.number = container_number
+    return containers
 
-    location_containers = []
-    current_container = None
 
-    # Process urgent items first
-    for df in [urgent_items_df, non_urgent_items_df]:
-        for _, item_row in df.iterrows():
-            # 1) compute total CARTONS for this item
-            upc = item_row['units per case/carton']
-            if upc < 1:
-                upc = 1
-            total_cartons = item_row['Quantity'] / upc  # how many "cartons"
-
-            # 2) from storage_tihi: c_per_pal
-            c_per_pal = cases_per_pallet_map.get((location, item_row['Item']), 1)
-            if c_per_pal < 1:
-                c_per_pal = 1
-
-            # total pallets (float)
-            total_pallets_float = total_cartons / c_per_pal
-            leftover_pallets = total_pallets_float
-
-            #-----------------------------------------
-            #  Allocate FULL pallets first
-            #-----------------------------------------
-            while leftover_pallets >= 1:
-                if current_container is None:
-                    current_container = open_new_container()
-                    current_container['Container#'] = container_number
-                    current_container['Location'] = location
-                    current_container['Supplier'] = supplier
-                    current_container['Weight Cap'] = location_weight_limit
-                    current_container['CBM Cap'] = CONTAINER_CBM_LIMIT
-                    container_number += 1
-
-                full_pallets_avail = math.floor(leftover_pallets)
-
-                # Check if we can fit at least 1 pallet
-                if not can_fit_pallets(current_container, 1, item_row, c_per_pal):
-                    # close container, open a new one
-                    location_containers.append(current_container)
-                    current_container = open_new_container()
-                    current_container['Container#'] = container_number
-                    current_container['Location'] = location
-                    current_container['Supplier'] = supplier
-                    current_container['Weight Cap'] = location_weight_limit
-                    current_container['CBM Cap'] = CONTAINER_CBM_LIMIT
-                    container_number += 1
-
-                    # if can't fit 1 pallet in an empty container => skip or break
-                    if not can_fit_pallets(current_container, 1, item_row, c_per_pal):
-                        print(f"WARNING: Single pallet of {item_row['Item']} doesn't fit an empty container at {location}.")
-                        leftover_pallets = 0
-                        break
-
-                # how many pallets can we place at once?
-                # naive approach: try full_pallets_avail in descending order
-                placed = 0
-                for possible_count in range(full_pallets_avail, 0, -1):
-                    if can_fit_pallets(current_container, possible_count, item_row, c_per_pal):
-                        add_pallets_to_container(current_container, possible_count, item_row, c_per_pal)
-                        placed = possible_count
-                        break
-                leftover_pallets -= placed
-
-                if leftover_pallets < 1:
-                    break  # done full pallets => might have partial leftover
-                # if we still have leftover_pallets >=1 => continue in this container if possible
-
-            #-----------------------------------------
-            #  If leftover_pallets < 1 => partial leftover
-            #-----------------------------------------
-            if leftover_pallets > 0:
-                # we have a partial pallet leftover
-                if current_container is None:
-                    current_container = open_new_container()
-                    current_container['Container#'] = container_number
-                    current_container['Location'] = location
-                    current_container['Supplier'] = supplier
-                    current_container['Weight Cap'] = location_weight_limit
-                    current_container['CBM Cap'] = CONTAINER_CBM_LIMIT
-                    container_number += 1
-
-                if not can_fit_pallets(current_container, leftover_pallets, item_row, c_per_pal):
-                    # finalize and open new container
-                    location_containers.append(current_container)
-                    current_container = open_new_container()
-                    current_container['Container#'] = container_number
-                    current_container['Location'] = location
-                    current_container['Supplier'] = supplier
-                    current_container['Weight Cap'] = location_weight_limit
-                    current_container['CBM Cap'] = CONTAINER_CBM_LIMIT
-                    container_number += 1
-                    if not can_fit_pallets(current_container, leftover_pallets, item_row, c_per_pal):
-                        print(f"WARNING: partial leftover pallet {round(leftover_pallets, 3)} of {item_row['Item']} doesn't fit even in empty container at {location}. Skipping leftover.")
-                        leftover_pallets = 0
-
-                # if still leftover
-                if leftover_pallets > 0:
-                    add_pallets_to_container(current_container, leftover_pallets, item_row, c_per_pal)
-                leftover_pallets = 0
-
-        # finalize the last container if not empty
-        if current_container is not None:
-            location_containers.append(current_container)
-            current_container = None
-
-    # add to global containers
-    containers.extend(location_containers)
+#=================================================
+#   Scenario runner: compare packing settings
+#=================================================
+def summarize_plan(containers):
+    """Container count, average weight/CBM fill % (capped containers only) and items split across containers."""
+    weight_fill = [c.total_weight / c.weight_cap for c in containers if c.weight_cap != float('inf')]
+    cbm_fill = [c.total_cbm / c.cbm_cap for c in containers if c.cbm_cap != float('inf')]
+    containers_per_item = {}
+    for c in containers:
+        for line in c.lines:
+            key = (c.location, line['Item'])
+            containers_per_item[key] = containers_per_item.get(key, 0) + 1
+    return {
+        'Containers': len(containers),
+        'Avg Weight Fill %': round(100 * sum(weight_fill) / len(weight_fill), 1) if weight_fill else None,
+        'Avg CBM Fill %': round(100 * sum(cbm_fill) / len(cbm_fill), 1) if cbm_fill else None,
+        'Items Split': sum(1 for n in containers_per_item.values() if n > 1)
+    }
+
+
+def build_scenario_grid(grid):
+    """Every combination of the grid's values, each completed from DEFAULT_SCENARIO."""
+    keys = list(grid)
+    return [{**DEFAULT_SCENARIO, **dict(zip(keys, values))}
+            for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def run_scenario(items_df, supplier, scenario):
+    return summarize_plan(pack_all_locations(items_df, supplier, scenario, workers=1))
+
+
+def run_scenarios(items_df, supplier, scenarios, workers=SCENARIO_WORKERS):
+    """
+    Packs the same items under every scenario (in parallel worker processes when workers > 1)
+    and returns one comparison row per scenario, fewest containers first.
+    The row of DEFAULT_SCENARIO (the chosen plan) is marked in the 'Chosen' column.
+    """
+    if DEFAULT_SCENARIO not in scenarios:
+        scenarios = [DEFAULT_SCENARIO] + scenarios
+    if workers > 1 and len(scenarios) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(scenarios))) as executor:
+            futures = [executor.submit(run_scenario, items_df, supplier, scenario) for scenario in scenarios]
+            summaries = [future.result() for future in futures]
+    else:
+        summaries = [run_scenario(items_df, supplier, scenario) for scenario in scenarios]
+
+    comparison_df = pd.DataFrame([{**scenario, **summary, 'Chosen': scenario == DEFAULT_SCENARIO}
+                                  for scenario, summary in zip(scenarios, summaries)])
+    return comparison_df.sort_values(by=['Containers', 'Avg Weight Fill %', 'Avg CBM Fill %'],
+                                     ascending=[True, False, False], kind='stable').reset_index(drop=True)
 
 
 #=================================================
 #   Prepare final output
 #=================================================
-output_data = []
-
-for container in containers:
-    cid = container['Container#']
-    loc = container['Location']
-    supp = container['Supplier']
-    tot_wt = container['Total Weight']
-    tot_cbm = container['Total CBM']
-    itemlist = container['Items']
-
-    for idx, it in enumerate(itemlist):
-        c_per_pal = cases_per_pallet_map.get((loc, it['Item']), 0)
-        if c_per_pal == 0:
-            num_pal = 0
-        else:
-            # Number of pallet = Cartons / c_per_pal
-            num_pal = round(it['Cartons'] / c_per_pal, 2)
-
-        output_data.append({
-            'Container#': cid,
-            'Supplier': supp,
-            'Location': loc,
-            'Item': it['Item'],
-            'Quantity': it['Quantity'],
-            'Weight': round(it['Weight'], 2),
-            'CBM': round(it['CBM'], 2),
-            'Cartons': it['Cartons'],
-            'Cases per pallet': c_per_pal,
-            'Number of pallet': num_pal,
-            'Total Weight': '' if idx > 0 else round(tot_wt, 2),
-            'Total CBM': '' if idx > 0 else round(tot_cbm, 2)
-        })
-
-final_df = pd.DataFrame(output_data)
-final_df.to_excel(os.path.expanduser(output_file), index=False)
-print(f"Done! Created {len(containers)} containers with combined-heuristic item sort + pallet-based allocation.\nOutput: {output_file}")
+def build_output(containers, storage_tihi_df):
+    output_data = []
+
+    for container in containers:
+        for idx, it in enumerate(container.lines):
+            output_data.append({
+                'Container#': container.number,
+                'Supplier': container.supplier,
+                'Location': container.location,
+                'Item': it['Item'],
+                'Quantity': it['Quantity'],
+                'Weight': round(it['Weight'], 2),
+                'CBM': round(it['CBM'], 2),
+                'Cartons': it['Cartons'],
+                'Total Weight': '' if idx > 0 else round(container.total_weight, 2),
+                'Total CBM': '' if idx > 0 else round(container.total_cbm, 2)
+            })
+
+    columns = ['Container#', 'Supplier', 'Location', 'Item', 'Quantity', 'Weight', 'CBM', 'Cartons',
+               'Cases per pallet', 'Number of pallet', 'Total Weight', 'Total CBM']
+    if not output_data:
+        return pd.DataFrame(columns=columns)
+    final_df = attach_cases_per_pallet(pd.DataFrame(output_data), storage_tihi_df)
+    final_df['Cases per pallet'] = final_df['Cases per pallet'].fillna(0)
+    # Number of pallet = Cartons / Cases per pallet (0 when the item has no pallet size); Python round()
+    # as before, Series.round rounds some exact halves differently
+    cases = final_df['Cases per pallet'].where(final_df['Cases per pallet'] != 0)
+    final_df['Number of pallet'] = [0 if pd.isna(pallets) else round(pallets, 2)
+                                    for pallets in final_df['Cartons'] / cases]
+    return final_df[columns]
+
+
+def prepare_items(summary_df, storage_tihi_df, sku_dict_df, urgent_df):
+    """Merged items with pallet sizes, split into urgent/non-urgent rows, ready for packing."""
+    merged_df = attach_cases_per_pallet(build_merged_df(summary_df, sku_dict_df), storage_tihi_df)
+    urgent_df, non_urgent_df = split_urgent(merged_df, urgent_df)
+    return pd.concat([urgent_df, non_urgent_df], ignore_index=True)
+
+
+def build_container_plan(summary_df, storage_tihi_df, sku_dict_df, urgent_df, scenario=None):
+    """
+    Runs container building on in-memory inputs (the cleaned Summary, ShippingTiHi, SKU Dictionary
+    and Urgent Items) and returns the plan in the layout of the output workbook, plus the containers.
+    """
+    supplier = summary_df.iloc[0]['Supplier']  # from first row
+    items_df = prepare_items(summary_df, storage_tihi_df, sku_dict_df, urgent_df)
+    containers = pack_all_locations(items_df, supplier, scenario)
+    return build_output(containers, storage_tihi_df), containers
+
+
+def main():
+    summary_df, storage_tihi_df, sku_dict_df, urgent_df = load_inputs()
+    final_df, containers = build_container_plan(summary_df, storage_tihi_df, sku_dict_df, urgent_df)
+
+    if SCENARIO_GRID:
+        supplier = summary_df.iloc[0]['Supplier']
+        items_df = prepare_items(summary_df, storage_tihi_df, sku_dict_df, urgent_df)
+        comparison_df = run_scenarios(items_df, supplier, build_scenario_grid(SCENARIO_GRID))
+        with pd.ExcelWriter(os.path.expanduser(output_file)) as writer:
+            final_df.to_excel(writer, sheet_name='Sheet1', index=False)
+            comparison_df.to_excel(writer, sheet_name='Scenarios', index=False)
+        print(comparison_df.to_string(index=False))
+    else:
+        final_df.to_excel(os.path.expanduser(output_file), index=False)
+    print(f"Done! Created {len(containers)} containers with '{DEFAULT_SCENARIO['mode']}' packing + pallet-based allocation.\nOutput: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import pandas as pd
-import math
+import numpy as np
 import os
 
 # -----------------------------------------------------------------
@@ -11,109 +11,142 @@ input_file_sku      = '/Users/yingji/Documents/python/vs_code/python_playground/
 output_file         = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Summary_Cleaned.xlsx'
 
 # -----------------------------------------------------------------
-#   Read the input files
+#   Pallet rounding policies
 # -----------------------------------------------------------------
-summary_df  = pd.read_excel(os.path.expanduser(input_file_summary))
-shipping_df = pd.read_excel(os.path.expanduser(input_file_shipping))
-sku_df      = pd.read_excel(os.path.expanduser(input_file_sku))
+# threshold:      round up when the fractional pallet is > threshold, otherwise round down
+#                 (0.5 = nearest with .5 rounding down, 0 = always up, 1 = always down)
+# min_one_pallet: a positive quantity below one pallet is raised to one full pallet
+DEFAULT_ROUNDING_POLICY = {'threshold': 0.5, 'min_one_pallet': True}
 
-# -----------------------------------------------------------------
-#   Drop duplicates if needed
-# -----------------------------------------------------------------
-shipping_df = shipping_df.drop_duplicates(subset=['Item','Location'], keep='first')
-summary_df  = summary_df.drop_duplicates(subset=['Item','Location'], keep='first')
-sku_df      = sku_df.drop_duplicates(subset=['Item'], keep='first')
-
-# -----------------------------------------------------------------
-#   Clean up column names for consistent merges
-# -----------------------------------------------------------------
-shipping_df.rename(columns={'Cases per pallet': 'cases_per_pallet'}, inplace=True)
-sku_df.rename(columns={'units per case/carton': 'units_per_case_carton'}, inplace=True)
-
-summary_df.columns = summary_df.columns.str.strip()
-shipping_df.columns = shipping_df.columns.str.strip()
-sku_df.columns = sku_df.columns.str.strip()
+# Per-location overrides, e.g. {'Progressive UK': {'threshold': 0.3}}
+LOCATION_ROUNDING_POLICIES = {}
 
-# -----------------------------------------------------------------
-#   Merge summary with ShippingTiHi on (Item, Location)
-# -----------------------------------------------------------------
-merged_df = pd.merge(
-    summary_df, 
-    shipping_df[['Item','Location','cases_per_pallet']],
-    on=['Item','Location'],
-    how='left'
-)
-
-# -----------------------------------------------------------------
-#   Merge with SKU Dictionary on Item only
-# -----------------------------------------------------------------
-merged_df = pd.merge(
-    merged_df,
-    sku_df[['Item','units_per_case_carton']],
-    on='Item',
-    how='left'
-)
 
 # -----------------------------------------------------------------
 #   Define function to compute suggested quantity in units
 # -----------------------------------------------------------------
-def compute_suggested_quantity(row):
+def compute_suggested_quantity(qty_units, upc, cpp, threshold=0.5, min_one_pallet=True):
     """
+    Vectorized over NumPy arrays (scalars broadcast, including threshold / min_one_pallet):
     1) Convert 'Quantity' (units) to 'cartons' by dividing by units_per_case_carton.
     2) Convert 'cartons' to 'pallets' by dividing by cases_per_pallet.
     3) If actual pallets (for a positive quantity) is less than 1, set suggested pallets = 1.
     4) Otherwise, use:
-         - roundup if fractional part > 0.5,
-         - roundown if fractional part < 0.5.
+         - roundup if fractional part > threshold,
+         - roundown if fractional part <= threshold.
     5) Convert suggested pallets back to units (for 'Suggested Quantity').
     6) 'Quantity Variance' = actual units - suggested units.
+    Returns (actual_pallets, suggested_pallets, suggested_units, quantity_variance).
     """
-    qty_units = row['Quantity']
-    upc = row['units_per_case_carton']
-    cpp = row['cases_per_pallet']
+    qty_units = np.asarray(qty_units, dtype=float)
+    upc = np.asarray(upc, dtype=float)
+    cpp = np.asarray(cpp, dtype=float)
 
     # Handle missing or zero gracefully
-    if pd.isna(upc) or upc == 0:
-        upc = 1
-    if pd.isna(cpp) or cpp == 0:
-        cpp = 1
+    upc = np.where(np.isnan(upc) | (upc == 0), 1.0, upc)
+    cpp = np.where(np.isnan(cpp) | (cpp == 0), 1.0, cpp)
 
     # Convert units -> cartons and then to pallets
     actual_cartons = qty_units / upc
     actual_pallets = actual_cartons / cpp
 
-    # Check if we have a positive quantity that results in less than one pallet.
-    if qty_units > 0 and actual_pallets < 1:
-        suggested_pallets = 1
-    else:
-        fractional_part = actual_pallets - math.floor(actual_pallets)
-        if math.isclose(fractional_part, 0.0, abs_tol=1e-9):
-            suggested_pallets = actual_pallets
-        else:
-            if fractional_part > 0.5:
-                suggested_pallets = math.ceil(actual_pallets)
-            else:
-                suggested_pallets = math.floor(actual_pallets)
+    floor_pallets = np.floor(actual_pallets)
+    fractional_part = actual_pallets - floor_pallets
+    suggested_pallets = np.where(fractional_part > threshold, floor_pallets + 1, floor_pallets)
+    # Whole pallets (within float noise) are kept as they are
+    suggested_pallets = np.where(np.abs(fractional_part) <= 1e-9, actual_pallets, suggested_pallets)
+    # A positive quantity that results in less than one pallet ships one pallet
+    below_one = np.asarray(min_one_pallet, dtype=bool) & (qty_units > 0) & (actual_pallets < 1)
+    suggested_pallets = np.where(below_one, 1.0, suggested_pallets)
 
     # Convert suggested pallets back into units
     suggested_units = suggested_pallets * cpp * upc
     quantity_variance = qty_units - suggested_units
+    return actual_pallets, suggested_pallets, suggested_units, quantity_variance
+
+
+def suggest_quantities(merged_df, rounding_policies=None):
+    """
+    Runs compute_suggested_quantity over a merged summary, using the rounding policy of each row's
+    Location (falling back to DEFAULT_ROUNDING_POLICY).
+    """
+    if rounding_policies is None:
+        rounding_policies = LOCATION_ROUNDING_POLICIES
+    policies = {loc: {**DEFAULT_ROUNDING_POLICY, **policy} for loc, policy in rounding_policies.items()}
+    threshold = merged_df['Location'].map({loc: p['threshold'] for loc, p in policies.items()})
+    min_one_pallet = merged_df['Location'].map({loc: p['min_one_pallet'] for loc, p in policies.items()})
 
-    return pd.Series({
+    actual_pallets, suggested_pallets, suggested_units, quantity_variance = compute_suggested_quantity(
+        merged_df['Quantity'].to_numpy(dtype=float),
+        merged_df['units_per_case_carton'].to_numpy(dtype=float),
+        merged_df['cases_per_pallet'].to_numpy(dtype=float),
+        threshold.fillna(DEFAULT_ROUNDING_POLICY['threshold']).to_numpy(dtype=float),
+        min_one_pallet.fillna(DEFAULT_ROUNDING_POLICY['min_one_pallet']).to_numpy(dtype=bool),
+    )
+    return pd.DataFrame({
         'Actual Pallets': actual_pallets,
         'Suggested Pallets': suggested_pallets,
         'Suggested Quantity': suggested_units,
         'Quantity Variance': quantity_variance
-    })
+    }, index=merged_df.index)
 
-# -----------------------------------------------------------------
-#   Apply function to each row and attach new columns
-# -----------------------------------------------------------------
-results_df = merged_df.apply(compute_suggested_quantity, axis=1)
-cleaned_df = pd.concat([merged_df, results_df], axis=1)
 
 # -----------------------------------------------------------------
-#   Write to Excel
+#   Clean & merge the inputs, then compute suggested quantities
 # -----------------------------------------------------------------
-cleaned_df.to_excel(os.path.expanduser(output_file), index=False)
-print("data cleaning is done")
+def clean_summary(summary_df, shipping_df, sku_df, rounding_policies=None):
+    """
+    Merges the Summary with ShippingTiHi (cases per pallet) and the SKU Dictionary
+    (units per case/carton) and appends the pallet-rounded suggested quantities.
+    rounding_policies overrides LOCATION_ROUNDING_POLICIES.
+    The input DataFrames are not modified.
+    """
+    # Drop duplicates if needed
+    shipping_df = shipping_df.drop_duplicates(subset=['Item','Location'], keep='first')
+    summary_df  = summary_df.drop_duplicates(subset=['Item','Location'], keep='first')
+    sku_df      = sku_df.drop_duplicates(subset=['Item'], keep='first')
+
+    # Clean up column names for consistent merges
+    shipping_df = shipping_df.rename(columns={'Cases per pallet': 'cases_per_pallet'})
+    sku_df = sku_df.rename(columns={'units per case/carton': 'units_per_case_carton'})
+
+    summary_df.columns = summary_df.columns.str.strip()
+    shipping_df.columns = shipping_df.columns.str.strip()
+    sku_df.columns = sku_df.columns.str.strip()
+
+    # Merge summary with ShippingTiHi on (Item, Location)
+    merged_df = pd.merge(
+        summary_df, 
+        shipping_df[['Item','Location','cases_per_pallet']],
+        on=['Item','Location'],
+        how='left'
+    )
+
+    # Merge with SKU Dictionary on Item only
+    merged_df = pd.merge(
+        merged_df,
+        sku_df[['Item','units_per_case_carton']],
+        on='Item',
+        how='left'
+    )
+
+    # Compute the suggested quantities for all rows at once and attach new columns
+    results_df = suggest_quantities(merged_df, rounding_policies)
+    return pd.concat([merged_df, results_df], axis=1)
+
+
+def main():
+    # Read the input files
+    summary_df  = pd.read_excel(os.path.expanduser(input_file_summary))
+    shipping_df = pd.read_excel(os.path.expanduser(input_file_shipping))
+    sku_df      = pd.read_excel(os.path.expanduser(input_file_sku))
+
+    cleaned_df = clean_summary(summary_df, shipping_df, sku_df)
+
+    # Write to Excel
+    cleaned_df.to_excel(os.path.expanduser(output_file), index=False)
+    print("data cleaning is done")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,38 @@
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_UP
+from datetime import datetime
 
 # ---------------------------------------------------------
 # Helper: Excel-like ROUNDUP (away from zero)
 # ---------------------------------------------------------
 def rup(x, ndigits=0):
-    q = Decimal('1').scaleb(-ndigits)  # 10**-ndigits
-    return float(Decimal(str(x)).quantize(q, rounding=ROUND_UP))
+    """
+    Rounds x (a scalar or a whole column) away from zero to ndigits decimals, like Excel ROUNDUP.
+    A value is taken at its shortest decimal representation (same as Decimal(str(x))), so float
+    artifacts such as 0.1 + 0.2 = 0.30000000000000004 round up to 0.31, and 1.15 stays 1.15.
+
+    The result is the smallest k / 10**ndigits whose float is >= |x|: a decimal with at most
+    ndigits decimals converts to exactly x, any longer decimal between two steps does not, so
+    comparing the candidates around |x| * 10**ndigits in floats gives the Decimal result bit for bit
+    (for |x| * 10**ndigits below 2**53).
+    """
+    values = np.asarray(x, dtype=float)
+    magnitude = np.abs(values)
+    scale = 10.0 ** abs(ndigits)
+
+    def to_value(k):
+        return k / scale if ndigits >= 0 else k * scale
+
+    scaled = magnitude * scale if ndigits >= 0 else magnitude / scale
+    base = np.floor(scaled) - 1
+    result = to_value(base + 3)
+    # Walk down from the largest candidate so the smallest one that still covers |x| wins
+    for offset in (2, 1, 0):
+        candidate = to_value(base + offset)
+        result = np.where(candidate >= magnitude, candidate, result)
+    result = np.where(np.isfinite(values), np.copysign(result, values), values)
+    return float(result) if result.ndim == 0 else result
 
 # ---------------------------------------------------------
 # 1. Define Paths
@@ -59,108 +83,22 @@ production_lead_time_mapping = {
     "Tianjin Yiyi Hygiene Products Co., Ltd.": 50
 }
 
-# ---------------------------------------------------------
-# 3. Load Data
-# ---------------------------------------------------------
-try:
-    container_data = pd.read_excel(os.path.expanduser(input_path_1))
-    sku_dictionary = pd.read_excel(os.path.expanduser(input_path_2), sheet_name="SKU Dictionary")
-except Exception as e:
-    print(f"Error loading files: {e}")
-    exit()
-
-# ---------------------------------------------------------
-# 4. Prepare for Output
-# ---------------------------------------------------------
-output_data = []
-today_str = datetime.today().strftime("%Y%m%d")
-
-# Group by "Container#"
-container_groups = container_data.groupby("Container#")
-external_id_counter = 1
-
-# ---------------------------------------------------------
-# 5. Build Rows for the Output CSV
-# ---------------------------------------------------------
-for container, group in container_groups:
-    # Create a unique External ID per container
-    external_id = f"{today_str}{external_id_counter}"
-    external_id_counter += 1
-
-    for idx, row in group.iterrows():
-        try:
-            # Extract data from each row
-            location = row["Location"]
-            payee = row["Supplier"]  # or row["Payee"], depending on your columns
-            item = row["Item"]
-            box_qty = row["Quantity"]
-
-            # Lookup Payee Price in SKU Dictionary
-            payee_price = sku_dictionary.loc[sku_dictionary["Item"] == item, "Payee Price"].values[0]
-
-            # Basic columns
-            subsidiary = "Earth Rated"
-            location_internal_id = location_mapping.get(location, "Unknown")
-            date = datetime.today().strftime("%Y-%m-%d")
-
-            # Requested ship date = today + production lead time
-            requested_ship_date = (
-                datetime.today() 
-                + timedelta(days=production_lead_time_mapping.get(payee, 0))
-            ).strftime("%Y-%m-%d")
-
-            # Expected receipt date = requested ship date + shipping lead time
-            exp_receipt_date = (
-                datetime.strptime(requested_ship_date, "%Y-%m-%d")
-                + timedelta(days=shipping_lead_time_mapping.get(location, 0))
-            ).strftime("%Y-%m-%d")
-
-            production_month = ""
-            memo = ""
-            status = "open"
-            vendor_internal_id = vendor_internal_id_mapping.get(payee, "Unknown")
-
-            # Lookup internal ID for item from SKU Dictionary
-            sku_internal_id = sku_dictionary.loc[sku_dictionary["Item"] == item, "Internal ID"].values[0]
-
-            # Calculate UNIT_COST_Orig (amended only for Sunner)
-            if payee == "SUNNER GROUP CO., LTD.":
-                if location == "Progressive UK":
-                    unit_cost_orig = rup(payee_price * 0.85, 3)
-                elif location in ["Northland Goreway", "Rhenus Netherlands"]:
-                    unit_cost_orig = rup(payee_price * 0.90, 3)
-                elif location in ["Source Montebello", "Source NJ", "Golden State FC LLC (AGL)"]:
-                    item_u = str(item).upper()
-                    if any(k in item_u for k in ("BG0051", "BG0070", "BG0071")):
-                        unit_cost_orig = rup(payee_price * 1, 3)
-                    elif any(k in item_u for k in ("BG0052", "BG0053", "BG0054", "BG0055")):
-                        unit_cost_orig = rup(payee_price * 0.75, 3)
-                    elif "DP" in item_u:
-                        unit_cost_orig = rup(payee_price * 0.77, 3)
-                    else:
-                        unit_cost_orig = rup(payee_price * 0.79, 3)
-                else:
-                    unit_cost_orig = payee_price
-            else:
-                unit_cost_orig = payee_price
-
-            # Total amount: roundup only for Sunner, keep existing behavior for others
-            if payee == "SUNNER GROUP CO., LTD.":
-                total_amount = rup(box_qty * unit_cost_orig, 2)
-            else:
-                total_amount = round(box_qty * unit_cost_orig, 2)
-
-            # Append row to output_data
-            output_data.append([
-                subsidiary, location, location_internal_id, date, exp_receipt_date, external_id,
-                production_month, memo, requested_ship_date, status, payee, vendor_internal_id,
-                item, sku_internal_id, box_qty, unit_cost_orig, total_amount
-            ])
-        except Exception as e:
-            print(f"Error processing row {idx + 1}: {e}")
+# Sunner unit-cost multipliers (UNIT COST_Orig = ROUNDUP(Payee Price * multiplier, 3)).
+# Rules are checked in order and the first match wins: (locations, item keywords or None for any item, multiplier).
+# Sunner lines matching no rule keep the Payee Price as is.
+SUNNER_PAYEE = "SUNNER GROUP CO., LTD."
+SUNNER_US_LOCATIONS = ["Source Montebello", "Source NJ", "Golden State FC LLC (AGL)"]
+SUNNER_PRICING_RULES = [
+    (["Progressive UK"], None, 0.85),
+    (["Northland Goreway", "Rhenus Netherlands"], None, 0.90),
+    (SUNNER_US_LOCATIONS, ("BG0051", "BG0070", "BG0071"), 1),
+    (SUNNER_US_LOCATIONS, ("BG0052", "BG0053", "BG0054", "BG0055"), 0.75),
+    (SUNNER_US_LOCATIONS, ("DP",), 0.77),
+    (SUNNER_US_LOCATIONS, None, 0.79),
+]
 
 # ---------------------------------------------------------
-# 6. Convert to DataFrame & Write CSV
+# 3. Build the PO upload rows from the container plan
 # ---------------------------------------------------------
 output_columns = [
     "Subsidiary", "Location", "Location InternalID", "Date", "Exp Receipt Date",
@@ -169,10 +107,108 @@ output_columns = [
     "BOX QTY", "UNIT COST_Orig", "Total Amount $"
 ]
 
-output_df = pd.DataFrame(output_data, columns=output_columns)
-
-try:
-    output_df.to_csv(os.path.expanduser(output_path), index=False, encoding='utf-8-sig')
-    print("Output CSV file created successfully.")
-except Exception as e:
-    print(f"Error saving output CSV file: {e}")
+def sunner_multipliers(locations, items):
+    """Multiplier of the first matching SUNNER_PRICING_RULES entry per line, NaN when none matches."""
+    items_u = items.astype(str).str.upper()
+    conditions = []
+    for rule_locations, keywords, _ in SUNNER_PRICING_RULES:
+        condition = locations.isin(rule_locations)
+        if keywords:
+            condition &= items_u.str.contains("|".join(keywords), regex=True)
+        conditions.append(condition.to_numpy())
+    return np.select(conditions, [multiplier for _, _, multiplier in SUNNER_PRICING_RULES], default=np.nan)
+
+
+def build_po_upload(container_data, sku_dictionary, wave_id=None):
+    """
+    One PO (External ID) per container, one line per container item, priced from the SKU Dictionary.
+    Returns the rows of the NetSuite PO import CSV as a DataFrame.
+
+    External IDs are <date>-<wave_id>-<container n>; wave_id defaults to the run time (HHMMSS), so a
+    second wave on the same day never reuses (and, through the eid upsert, overwrites) earlier POs.
+    """
+    now = datetime.now()
+    today = pd.Timestamp(now.date())
+    today_str = today.strftime("%Y%m%d")
+    wave_id = wave_id or now.strftime("%H%M%S")
+
+    # Lines grouped by "Container#" (in container order), each container gets a unique External ID
+    lines = container_data.sort_values("Container#", kind="stable")
+    lines = lines[lines["Container#"].notna()]
+    external_id_numbers = lines.groupby("Container#", sort=True).ngroup() + 1
+
+    # Lookup Payee Price / Internal ID in the SKU Dictionary (first entry per Item)
+    sku_lookup = sku_dictionary.drop_duplicates(subset="Item", keep="first")[["Item", "Payee Price", "Internal ID"]]
+    lines = lines.assign(external_id=f"{today_str}-{wave_id}-" + external_id_numbers.astype(str))
+    missing = ~lines["Item"].isin(sku_lookup["Item"])
+    for item in lines.loc[missing, "Item"].unique():
+        print(f"Error processing item {item}: not found in SKU Dictionary, lines skipped")
+    lines = lines.merge(sku_lookup, on="Item", how="inner")  # keeps the line order
+
+    location = lines["Location"]
+    payee = lines["Supplier"]  # or "Payee", depending on your columns
+    box_qty = lines["Quantity"]
+    payee_price = lines["Payee Price"].to_numpy(dtype=float)
+
+    # Requested ship date = today + production lead time
+    # Expected receipt date = requested ship date + shipping lead time
+    production_days = pd.to_timedelta(payee.map(production_lead_time_mapping).fillna(0), unit="D")
+    shipping_days = pd.to_timedelta(location.map(shipping_lead_time_mapping).fillna(0), unit="D")
+    requested_ship_date = today + production_days
+    exp_receipt_date = requested_ship_date + shipping_days
+
+    # Calculate UNIT_COST_Orig (amended only for Sunner)
+    is_sunner = (payee == SUNNER_PAYEE).to_numpy()
+    multipliers = np.where(is_sunner, sunner_multipliers(location, lines["Item"]), np.nan)
+    priced = ~np.isnan(multipliers)
+    unit_cost_orig = payee_price.copy()
+    unit_cost_orig[priced] = rup(payee_price[priced] * multipliers[priced], 3)
+
+    # Total amount: roundup only for Sunner, keep existing behavior for others
+    amount = box_qty.to_numpy(dtype=float) * unit_cost_orig
+    total_amount = np.array([round(x, 2) for x in amount], dtype=float)
+    total_amount[is_sunner] = rup(amount[is_sunner], 2)
+
+    output_df = pd.DataFrame({
+        "Subsidiary": "Earth Rated",
+        "Location": location,
+        "Location InternalID": location.map(lambda loc: location_mapping.get(loc, "Unknown")),
+        "Date": today.strftime("%Y-%m-%d"),
+        "Exp Receipt Date": exp_receipt_date.dt.strftime("%Y-%m-%d"),
+        "External ID": lines["external_id"],
+        "Production Month": "",
+        "Memo": "",
+        "Requested Ship Date": requested_ship_date.dt.strftime("%Y-%m-%d"),
+        "Status": "open",
+        "Payee": payee,
+        "Vendor InternalID": payee.map(lambda p: vendor_internal_id_mapping.get(p, "Unknown")),
+        "ITEM": lines["Item"],
+        "Item InternalID": lines["Internal ID"],
+        "BOX QTY": box_qty,
+        "UNIT COST_Orig": unit_cost_orig,
+        "Total Amount $": total_amount,
+    })
+    return output_df[output_columns]
+
+
+def main():
+    # Load Data
+    try:
+        container_data = pd.read_excel(os.path.expanduser(input_path_1))
+        sku_dictionary = pd.read_excel(os.path.expanduser(input_path_2), sheet_name="SKU Dictionary")
+    except Exception as e:
+        print(f"Error loading files: {e}")
+        exit()
+
+    output_df = build_po_upload(container_data, sku_dictionary)
+
+    # Write CSV
+    try:
+        output_df.to_csv(os.path.expanduser(output_path), index=False, encoding='utf-8-sig')
+        print("Output CSV file created successfully.")
+    except Exception as e:
+        print(f"Error saving output CSV file: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import pandas as pd
+import os
+import time
+
+import Data_Cleaning
+import Container_Building_SL_WP_1 as Container_Building
+import PO_Upload_2
+
+# -----------------------------
+#   File paths
+# -----------------------------
+input_file_summary  = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Summary.xlsx'
+input_file_shipping = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/ShippingTiHi.xlsx'
+input_file_sku      = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/SKU Dictionary.xlsx'
+input_file_urgent   = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Urgent_Items.xlsx'
+output_path         = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/PO_Upload_Output_2.csv'
+
+# Intermediate workbooks of the three-script flow, only written for debugging
+WRITE_ARTIFACTS = False
+artifact_file_cleaned   = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Summary_Cleaned.xlsx'
+artifact_file_container = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/Container_Building_Output_6.xlsx'
+
+SKU_DICTIONARY_SHEET = "SKU Dictionary"
+
+
+#=================================================
+#    Load every reference workbook once
+#=================================================
+def load_inputs():
+    summary_df  = pd.read_excel(os.path.expanduser(input_file_summary))
+    shipping_df = pd.read_excel(os.path.expanduser(input_file_shipping))
+    sku_df      = pd.read_excel(os.path.expanduser(input_file_sku), sheet_name=SKU_DICTIONARY_SHEET)
+    urgent_df   = pd.read_excel(os.path.expanduser(input_file_urgent))
+    return summary_df, shipping_df, sku_df, urgent_df
+
+
+#=================================================
+#    Summary -> cleaned summary -> containers -> PO rows
+#=================================================
+def run_wave(summary_df, shipping_df, sku_df, urgent_df, write_artifacts=WRITE_ARTIFACTS):
+    """
+    Runs Data Cleaning, Container Building and PO Upload on in-memory DataFrames and
+    returns the PO import rows. ShippingTiHi and the SKU Dictionary are shared by all steps.
+    """
+    t0 = time.perf_counter()
+    cleaned_df = Data_Cleaning.clean_summary(summary_df, shipping_df, sku_df)
+    t1 = time.perf_counter()
+    container_df, containers = Container_Building.build_container_plan(cleaned_df, shipping_df, sku_df, urgent_df)
+    t2 = time.perf_counter()
+    po_df = PO_Upload_2.build_po_upload(container_df, sku_df)
+    t3 = time.perf_counter()
+
+    print(f"Data cleaning:      {t1 - t0:.2f}s ({len(cleaned_df)} rows)")
+    print(f"Container building: {t2 - t1:.2f}s ({len(containers)} containers)")
+    print(f"PO upload:          {t3 - t2:.2f}s ({len(po_df)} lines)")
+
+    if write_artifacts:
+        cleaned_df.to_excel(os.path.expanduser(artifact_file_cleaned), index=False)
+        container_df.to_excel(os.path.expanduser(artifact_file_container), index=False)
+    return po_df
+
+
+def main():
+    summary_df, shipping_df, sku_df, urgent_df = load_inputs()
+    po_df = run_wave(summary_df, shipping_df, sku_df, urgent_df)
+    po_df.to_csv(os.path.expanduser(output_path), index=False, encoding='utf-8-sig')
+    print(f"Output CSV file created successfully.\nOutput: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
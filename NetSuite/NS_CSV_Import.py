@@ -1,13 +1,8 @@
-import requests
-import time
-import hmac
-import hashlib
-import base64
-import urllib.parse
-import secrets
 import json
 import os
 
+from netsuite_session import ConnectionHealth, create_netsuite_session
+
 class NetSuiteOAuth:
     """OAuth 1.0 implementation for NetSuite"""
     
@@ -16,64 +11,11 @@ class NetSuiteOAuth:
         self.account_formatted = config['ACCOUNT_ID'].lower().replace('_', '-')
         self.base_url = f"https://{self.account_formatted}.suitetalk.api.netsuite.com"
         self.realm = config['ACCOUNT_ID']
-    
-    def generate_oauth_header(self, url, method='GET'):
-        """Generate OAuth 1.0 header"""
-        
-        oauth_timestamp = str(int(time.time()))
-        oauth_nonce = secrets.token_hex(8)
-        
-        oauth_params = {
-            'oauth_consumer_key': self.config['CONSUMER_KEY'],
-            'oauth_token': self.config['TOKEN_ID'],
-            'oauth_signature_method': 'HMAC-SHA256',
-            'oauth_timestamp': oauth_timestamp,
-            'oauth_nonce': oauth_nonce,
-            'oauth_version': '1.0'
-        }
-        
-        parsed_url = urllib.parse.urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-        query_params = urllib.parse.parse_qsl(parsed_url.query)
-        
-        all_params = {**oauth_params}
-        for key, value in query_params:
-            all_params[key] = value
-        
-        sorted_params = sorted(all_params.items())
-        param_string = '&'.join([f"{urllib.parse.quote(str(k), safe='')}={urllib.parse.quote(str(v), safe='')}" 
-                                 for k, v in sorted_params])
-        
-        signature_base = '&'.join([
-            method.upper(),
-            urllib.parse.quote(base_url, safe=''),
-            urllib.parse.quote(param_string, safe='')
-        ])
-        
-        signing_key = f"{urllib.parse.quote(self.config['CONSUMER_SECRET'], safe='')}&{urllib.parse.quote(self.config['TOKEN_SECRET'], safe='')}"
-        
-        signature = base64.b64encode(
-            hmac.new(
-                signing_key.encode('utf-8'),
-                signature_base.encode('utf-8'),
-                hashlib.sha256
-            ).digest()
-        ).decode('utf-8')
-        
-        encoded_signature = urllib.parse.quote(signature, safe='')
-        
-        auth_header = (
-            f'OAuth realm="{self.realm}",'
-            f'oauth_consumer_key="{oauth_params["oauth_consumer_key"]}",'
-            f'oauth_token="{oauth_params["oauth_token"]}",'
-            f'oauth_signature_method="{oauth_params["oauth_signature_method"]}",'
-            f'oauth_timestamp="{oauth_params["oauth_timestamp"]}",'
-            f'oauth_nonce="{oauth_params["oauth_nonce"]}",'
-            f'oauth_version="{oauth_params["oauth_version"]}",'
-            f'oauth_signature="{encoded_signature}"'
-        )
-        
-        return auth_header
+        # Signed persistent session (OAuth key material prepared once, see netsuite_session.NetSuiteAuth)
+        self.session = create_netsuite_session(config)
+        # Skip the connection test while a recent call succeeded; re-test and retry once on 401
+        self.health = ConnectionHealth(config)
+        self.health.attach(self.session, self.test_connection)
     
     def test_connection(self):
         """Test NetSuite connection"""
@@ -81,16 +23,12 @@ class NetSuiteOAuth:
         
         url = f"{self.base_url}/services/rest/record/v1/purchaseorder"
         params = {'limit': 1}
-        full_url = f"{url}?{urllib.parse.urlencode(params)}"
-        
-        auth_header = self.generate_oauth_header(full_url, 'GET')
         headers = {
-            'Authorization': auth_header,
             'Accept': 'application/json'
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=30)
+            response = self.session.get(url, params=params, headers=headers, timeout=30)
             
             if response.status_code == 200:
                 print("✅ Connection successful!\n")
@@ -113,12 +51,8 @@ class NetSuiteOAuth:
         query = f"SELECT id, name, folder FROM file WHERE name = '{filename}' AND folder = {self.config['FILE_CABINET_FOLDER_ID']}"
         
         params = {'limit': 10}
-        full_url = f"{url}?{urllib.parse.urlencode(params)}"
-        
-        auth_header = self.generate_oauth_header(full_url, 'POST')
         
         headers = {
-            'Authorization': auth_header,
             'Content-Type': 'application/json',
             'Accept': 'application/json',
             'Prefer': 'transient'
@@ -127,7 +61,7 @@ class NetSuiteOAuth:
         payload = {"q": query}
         
         try:
-            response = requests.post(url, params=params, headers=headers, json=payload, timeout=30)
+            response = self.session.post(url, params=params, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -156,10 +90,7 @@ class NetSuiteOAuth:
         # Use the Task API for CSV import
         url = f"{self.base_url}/services/rest/record/v1/task"
         
-        auth_header = self.generate_oauth_header(url, 'POST')
-        
         headers = {
-            'Authorization': auth_header,
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
@@ -182,7 +113,7 @@ class NetSuiteOAuth:
         print("="*70 + "\n")
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            response = self.session.post(url, headers=headers, json=payload, timeout=60)
             
             print(f"Status: {response.status_code}")
             print(f"Response: {response.text}\n")
@@ -248,7 +179,7 @@ class NetSuiteOAuth:
         
         # Step 1: Test connection
         print("Step 1: Testing connection...")
-        if not self.test_connection():
+        if not self.health.ensure(self.test_connection):
             print("❌ Connection failed. Stopping.\n")
             return False
         
@@ -1,11 +1,15 @@
-import requests
 import json
-from requests_oauthlib import OAuth1
 import time
 from datetime import datetime
 import os
 import csv
 
+from concurrent.futures import ThreadPoolExecutor
+
+from netsuite_csv_split import remove_import_parts, split_csv_for_import
+from netsuite_import_tracker import ImportJobTracker, StatusUnsupported
+from netsuite_session import ConnectionHealth, create_netsuite_session
+
 # NetSuite Configuration - Replace with your actual sandbox credentials
 NETSUITE_CONFIG = {
     # Your NetSuite Sandbox Account ID (e.g., "123456_SB1")
@@ -22,6 +26,14 @@ NETSUITE_CONFIG = {
     'FILE_CABINET_FOLDER_ID': '16866'
 }
 
+# Large CSVs are split into row/size-bounded parts that are imported as parallel jobs.
+# Rows sharing IMPORT_GROUP_COLUMN (e.g. 'External ID' for PO uploads) always stay in the same part.
+IMPORT_GROUP_COLUMN = None
+IMPORT_WORKERS = 3
+
+# Wait for the import jobs to finish and report their results
+WAIT_FOR_IMPORT = True
+
 
 
 class NetSuiteIntegration:
@@ -29,20 +41,13 @@ class NetSuiteIntegration:
         self.config = config
         self.account_formatted = config['ACCOUNT_ID'].lower().replace('_', '-')
         self.base_url = f"https://{self.account_formatted}.suitetalk.api.netsuite.com"
-        self.realm = config['ACCOUNT_ID'].replace('_', '-').upper()
+        self.realm = config['ACCOUNT_ID'].replace('-', '_').upper()
+        # Signed persistent session (OAuth key material prepared once, see netsuite_session.NetSuiteAuth)
+        self.session = create_netsuite_session(config)
+        # Skip the connection test while a recent call succeeded; re-test and retry once on 401
+        self.health = ConnectionHealth(config)
+        self.health.attach(self.session, self.test_connection)
         
-    def create_oauth_auth(self, url, method='GET'):
-        """Create OAuth1 authentication object"""
-        return OAuth1(
-            client_key=self.config['CONSUMER_KEY'],
-            client_secret=self.config['CONSUMER_SECRET'],
-            resource_owner_key=self.config['TOKEN_ID'],
-            resource_owner_secret=self.config['TOKEN_SECRET'],
-            realm=self.realm,
-            signature_method='HMAC-SHA256',
-            signature_type='AUTH_HEADER'
-        )
-    
     def test_connection(self):
         """Test NetSuite API connection"""
         print("🔍 Testing NetSuite API connection...")
@@ -50,11 +55,8 @@ class NetSuiteIntegration:
         url = f"{self.base_url}/services/rest/record/v1/item"
         
         try:
-            auth = self.create_oauth_auth(url, 'GET')
-            
-            response = requests.get(
+            response = self.session.get(
                 url,
-                auth=auth,
                 headers={'Accept': 'application/json'},
                 params={'limit': 1},
                 timeout=30
@@ -89,14 +91,15 @@ class NetSuiteIntegration:
         try:
             with open(csv_file_path, 'r', encoding='utf-8') as file:
                 reader = csv.reader(file)
-                rows = list(reader)
+                headers = next(reader, None)
+                data_rows = sum(1 for _ in reader)
                 
-            if len(rows) < 2:  # Header + at least 1 data row
+            if not data_rows:  # Header + at least 1 data row
                 print(f"❌ CSV file has no data rows")
                 return False
                 
-            print(f"✅ CSV file validated: {len(rows)-1} data rows found")
-            print(f"Headers: {rows[0] if rows else 'None'}")
+            print(f"✅ CSV file validated: {data_rows} data rows found")
+            print(f"Headers: {headers if headers else 'None'}")
             return True
             
         except Exception as e:
@@ -108,33 +111,27 @@ class NetSuiteIntegration:
         print(f"📤 Uploading file to NetSuite: {csv_file_path}")
         
         try:
-            # Read file content
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                file_content = file.read()
-            
             filename = os.path.basename(csv_file_path)
             
             # NetSuite file upload endpoint
             url = f"{self.base_url}/services/rest/file/v1/files"
             
-            auth = self.create_oauth_auth(url, 'POST')
-            
-            # Prepare multipart form data
-            files = {
-                'file': (filename, file_content, 'text/csv')
-            }
-            
             data = {
                 'folder': self.config['FILE_CABINET_FOLDER_ID']
             }
             
-            response = requests.post(
-                url,
-                auth=auth,
-                files=files,
-                data=data,
-                timeout=120
-            )
+            # Prepare multipart form data, reading the file from disk instead of a str copy
+            with open(csv_file_path, 'rb') as file:
+                files = {
+                    'file': (filename, file, 'text/csv')
+                }
+                
+                response = self.session.post(
+                    url,
+                    files=files,
+                    data=data,
+                    timeout=120
+                )
             
             print(f"Upload response status: {response.status_code}")
             
@@ -174,7 +171,7 @@ class NetSuiteIntegration:
             url = f"{self.base_url}/services/rest/async/job/v1/import/job"
             
             payload = {
-                "jobName": f"Tradlinx_Import_{int(time.time())}",
+                "jobName": f"Tradlinx_Import_{int(time.time())}_{file_id}",
                 "importDefinition": {
                     "savedImport": {"id": self.config['SAVED_IMPORT_ID']}
                 },
@@ -183,11 +180,8 @@ class NetSuiteIntegration:
                 }
             }
             
-            auth = self.create_oauth_auth(url, 'POST')
-            
-            response = requests.post(
+            response = self.session.post(
                 url,
-                auth=auth,
                 json=payload,
                 headers={
                     'Content-Type': 'application/vnd.oracle.adf.action+json',
@@ -222,6 +216,32 @@ class NetSuiteIntegration:
             print(f"❌ Import job error: {str(e)}")
             return None
     
+    def check_import_jobs(self, job_ids):
+        """
+        Status of several async import jobs, fetched concurrently: {job_id: job status JSON}.
+        Raises StatusUnsupported when the account does not serve the async job status endpoint (404/405).
+        """
+        def get_status(job_id):
+            response = self.session.get(
+                f"{self.base_url}/services/rest/async/job/v1/import/job/{job_id}",
+                headers={'Accept': 'application/json'},
+                timeout=30
+            )
+            if response.status_code in (404, 405):
+                raise StatusUnsupported(f"async job status not available ({response.status_code}: {response.text})")
+            response.raise_for_status()
+            return job_id, response.json()
+        
+        with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+            return dict(executor.map(get_status, job_ids))
+    
+    def upload_and_start_import(self, csv_file_path):
+        """Upload one CSV file and start its import job, returns (file_id, job_result)"""
+        file_id = self.upload_file_to_netsuite(csv_file_path)
+        if not file_id:
+            return None, None
+        return file_id, self.start_import_job(file_id)
+    
     def get_import_status_url(self):
         """Get NetSuite import status monitoring URL"""
         return f"https://{self.account_formatted}.app.netsuite.com/app/setup/import/importstatus.nl"
@@ -231,7 +251,7 @@ class NetSuiteIntegration:
         print("=== Starting NetSuite CSV Import Process ===\n")
         
         # Step 1: Test connection
-        if not self.test_connection():
+        if not self.health.ensure(self.test_connection):
             print("❌ Connection test failed. Aborting process.")
             return False
         
@@ -240,16 +260,24 @@ class NetSuiteIntegration:
             print("❌ CSV validation failed. Aborting process.")
             return False
         
-        # Step 3: Upload file
-        file_id = self.upload_file_to_netsuite(csv_file_path)
-        if not file_id:
-            print("❌ File upload failed. Aborting process.")
-            return False
+        # Step 3: Split large files into import-sized parts (grouped rows stay together, temporary directory)
+        part_paths = split_csv_for_import(csv_file_path, group_column=IMPORT_GROUP_COLUMN)
+        if len(part_paths) > 1:
+            print(f"✂️  Split into {len(part_paths)} parts for parallel import")
         
-        # Step 4: Start import job
-        job_result = self.start_import_job(file_id)
-        if not job_result:
-            print("❌ Import job failed to start. Aborting process.")
+        # Step 4: Upload each part and start its import job, IMPORT_WORKERS parts at a time,
+        # then drop the part files (their content is in the File Cabinet now)
+        try:
+            with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+                results = list(executor.map(self.upload_and_start_import, part_paths))
+        finally:
+            remove_import_parts(part_paths, csv_file_path)
+        
+        failed = [path for path, (file_id, job_result) in zip(part_paths, results) if not job_result]
+        if failed:
+            print(f"❌ Upload / import job failed for {len(failed)}/{len(part_paths)} file(s):")
+            for path in failed:
+                print(f"   - {os.path.basename(path)}")
             return False
         
         # Step 5: Success summary
@@ -258,10 +286,20 @@ class NetSuiteIntegration:
         print("="*60)
         print(f"✅ File uploaded to NetSuite File Cabinet")
         print(f"✅ Import job started successfully")
-        print(f"📁 File ID: {file_id}")
         
-        if isinstance(job_result, str):
-            print(f"📋 Job ID: {job_result}")
+        for file_id, job_result in results:
+            print(f"📁 File ID: {file_id}")
+            if isinstance(job_result, str):
+                print(f"📋 Job ID: {job_result}")
+        
+        job_ids = [job_result for _, job_result in results if isinstance(job_result, str)]
+        if WAIT_FOR_IMPORT and job_ids:
+            try:
+                statuses = ImportJobTracker(self.check_import_jobs).wait(job_ids)
+            except StatusUnsupported as e:
+                print(f"⚠️  Stopped tracking the import: {e}")
+            else:
+                return all(s['finished'] and s['status'] not in ('FAILED', 'ERROR') for s in statuses.values())
         
         print(f"\n🔍 Monitor import progress at:")
         print(f"   {self.get_import_status_url()}")
@@ -304,10 +342,10 @@ def main():
 if __name__ == "__main__":
     # Install required packages if needed
     try:
-        import requests_oauthlib
+        import requests
     except ImportError:
         print("Installing required packages...")
         import subprocess
-        subprocess.check_call(['pip', 'install', 'requests', 'requests-oauthlib'])
+        subprocess.check_call(['pip', 'install', 'requests'])
     
     main()
\ No newline at end of file
@@ -1,10 +1,52 @@
 import requests
 import json
-import time
+import os
 import pandas as pd
-from requests_oauthlib import OAuth1
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from typing import List, Dict, Optional
+from itertools import islice
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from netsuite_fetcher import NetSuiteRecordFetcher
+from netsuite_session import NetSuiteAuth, run_suiteql
+
+# 'suiteql': headers + lines of all POs in the window with paged SuiteQL queries
+# 'records': PO list + one record GET per PO via its self link
+EXTRACTION_MODE = 'suiteql'
+
+# SuiteQL window: trandate range (YYYY-MM-DD, None = open-ended) and transaction status codes
+# (PO statuses B/D/E/F = Pending Receipt, Partially Received, Pending Billing/Partially Received, Pending Bill)
+PO_START_DATE = None
+PO_END_DATE = None
+PO_STATUSES = ['B', 'D', 'E', 'F']
+
+# 'records' mode: stop after this many POs (None = whole book)
+RECORDS_LIMIT = None
+# 'records' mode: fetched POs are checkpointed here so an interrupted run resumes
+PO_CHECKPOINT_PATH = "po_fetch_checkpoint.jsonl"
+
+# Summary columns -> candidate PO keys, in priority order (resolved per chunk from the keys its POs carry)
+PO_SUMMARY_FIELDS = {
+    'id': ['id', 'internalId', 'internalid', 'list_id'],
+    'po_number': ['tranid', 'tranId', 'documentNumber', 'number'],
+    'po_date': ['trandate', 'tranDate', 'date', 'transactionDate'],
+    'total': ['total', 'amount', 'totalAmount'],
+    'memo': ['memo', 'description'],
+}
+PO_REFERENCE_FIELDS = {
+    'vendor': ['entity', 'vendor', 'supplier'],
+    'status': ['status', 'approvalStatus', 'orderStatus'],
+}
+PO_LINE_FIELDS = ['item', 'items', 'lineItems', 'itemList']
+
+# extract_po_summary_safe: POs held in memory at a time while summarizing a stream
+SUMMARY_CHUNK_SIZE = 1000
+
+# print_summary: POs listed individually before the rest is only counted
+SUMMARY_PRINT_LIMIT = 20
+
 
 class NetSuitePOBulkExtractor:
     def __init__(self, account_id: str, consumer_key: str, consumer_secret: str, 
@@ -24,32 +66,37 @@ class NetSuitePOBulkExtractor:
             print(f"Realm: 4238542_SB1")
             print(f"API Base URL: {self.api_base_url}")
         
-        # Create OAuth1 authentication object
-        self.auth = OAuth1(
-            client_key=consumer_key,
-            client_secret=consumer_secret,
-            resource_owner_key=token_id,
-            resource_owner_secret=token_secret,
-            signature_method='HMAC-SHA256',
-            realm=realm,
-            signature_type='auth_header'
-        )
+        # OAuth 1.0 signer (key material prepared once, see netsuite_session.NetSuiteAuth)
+        self.auth = NetSuiteAuth(consumer_key, consumer_secret, token_id, token_secret, realm)
         
         self.headers = {
             "Prefer": "transient",
             "Content-Type": "application/json"
         }
         
-        self.rate_limit_delay = 0.5
+        # Record GETs run concurrently up to the account's concurrency limit, paced by a token bucket
+        self.concurrency_limit = 5
+        self.requests_per_second = 10
+
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=self.concurrency_limit))
+
+        # One fetcher (concurrency slots + token bucket) for page prefetching and record GETs alike
+        self.fetcher = NetSuiteRecordFetcher(
+            self.session,
+            max_workers=self.concurrency_limit,
+            requests_per_second=self.requests_per_second,
+            headers=self.headers
+        )
 
     def test_authentication(self):
         """Test authentication with a simple API call"""
         endpoint_url = f"https://4238542-sb1.suitetalk.api.netsuite.com/services/rest/record/v1/purchaseOrder"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 endpoint_url,
-                auth=self.auth,
                 headers=self.headers
             )
             
@@ -78,9 +125,8 @@ class NetSuitePOBulkExtractor:
         print(f"Fetching PO list - Offset: {offset}, Limit: {params['limit']}")
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 endpoint_url,
-                auth=self.auth,
                 headers=self.headers,
                 params=params
             )
@@ -92,14 +138,65 @@ class NetSuitePOBulkExtractor:
             print(f"Error getting PO list: {e}")
             raise
 
+    def iter_record_pages(self, record_type: str = "purchaseOrder", page_size: int = 1000,
+                          query: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield every page of a record collection (purchaseOrder, itemReceipt, inboundShipment, ...),
+        following links.next while hasMore is set. The next page is requested in the background while
+        the caller processes the current one.
+        """
+        params = {"limit": min(page_size, 1000), "offset": 0}
+        if query:
+            params["q"] = query
+        url = f"{self.api_base_url}/services/rest/record/v1/{record_type}?{urlencode(params)}"
+        fetcher = self.fetcher
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(fetcher.fetch, url)
+            while future is not None:
+                page = future.result()
+                future = None
+
+                if page.get('hasMore'):
+                    next_url = next((link.get('href') for link in page.get('links', []) if link.get('rel') == 'next'), None)
+                    if not next_url:
+                        params["offset"] = page.get('offset', params["offset"]) + page.get('count', len(page.get('items', [])))
+                        next_url = f"{self.api_base_url}/services/rest/record/v1/{record_type}?{urlencode(params)}"
+                    future = executor.submit(fetcher.fetch, next_url)
+
+                if self.debug:
+                    print(f"{record_type} page offset {page.get('offset', '?')}: {len(page.get('items', []))} records "
+                          f"(total {page.get('totalResults', '?')})")
+                yield page
+
+    def iter_records(self, record_type: str = "purchaseOrder", page_size: int = 1000,
+                     query: Optional[str] = None) -> Iterator[Dict]:
+        """Yield the list entries (id + links) of every record in the collection, one page in memory at a time"""
+        for page in self.iter_record_pages(record_type, page_size, query):
+            yield from page.get('items', [])
+
+    def iter_detailed_purchase_orders(self, page_size: int = 100, query: Optional[str] = None,
+                                      checkpoint_path: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield full purchase orders page by page (details fetched concurrently per page), e.g. into extract_po_summary_safe.
+        With checkpoint_path the checkpoint covers the whole stream: a rerun skips every PO already fetched,
+        and the file is removed once the stream has been consumed to the end without failures.
+        """
+        done = self.fetcher.load_checkpoint(checkpoint_path)
+        failures = self.fetcher.failures
+        for i, page in enumerate(self.iter_record_pages("purchaseOrder", page_size, query)):
+            yield from self.get_detailed_purchase_orders(page.get('items', []), checkpoint_path=checkpoint_path,
+                                                         debug_first=(i == 0), done=done, remove_checkpoint=False)
+        if checkpoint_path and self.fetcher.failures == failures and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
     def get_single_purchase_order_from_link(self, link_href: str) -> Dict:
         """Get detailed information for a single purchase order using its self link"""
         print(f"Fetching PO details from link: {link_href}")
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 link_href,
-                auth=self.auth,
                 headers=self.headers
             )
             
@@ -113,6 +210,73 @@ class NetSuitePOBulkExtractor:
             print(f"❌ Error getting PO from link {link_href}: {e}")
             return None
 
+    def run_suiteql(self, query: str, page_size: int = 1000) -> List[Dict]:
+        """Run a SuiteQL query and return all rows, following hasMore with offset paging (max 1000 rows/page)"""
+        return run_suiteql(self.session, self.api_base_url, query, page_size, debug=self.debug)
+
+    def _suiteql_po_filter(self, start_date: Optional[str], end_date: Optional[str],
+                           statuses: Optional[List[str]]) -> str:
+        """WHERE clause for purchase orders in a trandate (YYYY-MM-DD) / status window"""
+        conditions = ["t.type = 'PurchOrd'"]
+        if start_date:
+            conditions.append(f"t.trandate >= TO_DATE('{start_date}', 'YYYY-MM-DD')")
+        if end_date:
+            conditions.append(f"t.trandate <= TO_DATE('{end_date}', 'YYYY-MM-DD')")
+        if statuses:
+            status_list = ", ".join(f"'{status}'" for status in statuses)
+            conditions.append(f"t.status IN ({status_list})")
+        return " AND ".join(conditions)
+
+    def get_purchase_orders_suiteql(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                    statuses: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Pull header and line fields of every PO in the window with two paged SuiteQL queries and join
+        the lines to their headers locally. Returns PO dicts in the record API layout (entity / status as
+        {id, refName}, lines under 'item'), so they can go straight into extract_po_summary_safe.
+        """
+        where = self._suiteql_po_filter(start_date, end_date, statuses)
+
+        print("Fetching PO headers via SuiteQL...")
+        headers = self.run_suiteql(f"""
+            SELECT t.id, t.tranid, t.trandate, t.foreigntotal AS total, t.memo,
+                   t.entity, BUILTIN.DF(t.entity) AS entity_name,
+                   t.status, BUILTIN.DF(t.status) AS status_name,
+                   t.duedate, t.lastmodifieddate
+            FROM transaction t
+            WHERE {where}
+            ORDER BY t.id
+        """)
+
+        print("Fetching PO lines via SuiteQL...")
+        lines = self.run_suiteql(f"""
+            SELECT tl.transaction, tl.linesequencenumber AS line, tl.item, BUILTIN.DF(tl.item) AS item_name,
+                   tl.quantity, tl.rate, tl.foreignamount AS amount, tl.expectedreceiptdate,
+                   tl.location, BUILTIN.DF(tl.location) AS location_name
+            FROM transactionline tl
+            JOIN transaction t ON t.id = tl.transaction
+            WHERE {where} AND tl.mainline = 'F'
+            ORDER BY tl.transaction, tl.linesequencenumber
+        """)
+
+        # Join lines to headers locally
+        lines_by_po = {}
+        for line in lines:
+            po_id = line.pop('transaction')
+            line['item'] = {'id': line.get('item'), 'refName': line.pop('item_name', '')}
+            line['location'] = {'id': line.get('location'), 'refName': line.pop('location_name', '')}
+            lines_by_po.setdefault(po_id, []).append(line)
+
+        purchase_orders = []
+        for header in headers:
+            po = dict(header)
+            po['entity'] = {'id': po.get('entity'), 'refName': po.pop('entity_name', '')}
+            po['status'] = {'id': po.get('status'), 'refName': po.pop('status_name', '')}
+            po['item'] = lines_by_po.get(header['id'], [])
+            purchase_orders.append(po)
+
+        print(f"✅ Retrieved {len(purchase_orders)} POs with {len(lines)} lines via SuiteQL")
+        return purchase_orders
+
     def debug_po_structure(self, po_data: Dict, po_id: str):
         """Debug function to print the actual structure"""
         print(f"\n🔍 DEBUG: Structure of PO {po_id}")
@@ -144,15 +308,18 @@ class NetSuitePOBulkExtractor:
             json.dump(po_data, f, indent=2, default=str)
         print(f"Raw PO data saved to debug_po_{po_id}.json")
 
-    def get_detailed_purchase_orders(self, po_list: List[Dict]) -> List[Dict]:
-        """Get detailed information for multiple purchase orders using their self links"""
-        detailed_pos = []
-        total_pos = len(po_list)
-        
+    def get_detailed_purchase_orders(self, po_list: List[Dict], checkpoint_path: Optional[str] = None,
+                                     debug_first: bool = True, done: Optional[Dict[str, Dict]] = None,
+                                     remove_checkpoint: bool = True) -> List[Dict]:
+        """
+        Get detailed information for multiple purchase orders using their self links.
+        The GETs run concurrently (see NetSuiteRecordFetcher); with checkpoint_path an interrupted run resumes
+        without re-fetching the POs it already has (done / remove_checkpoint: see NetSuiteRecordFetcher.fetch_all).
+        """
+        self_links = {}
         for i, po_item in enumerate(po_list, 1):
             po_id = po_item.get('id', f'PO_{i}')
-            print(f"Processing PO {i}/{total_pos}: {po_id}")
-            
+
             # Find the self link
             self_link = None
             if 'links' in po_item:
@@ -160,129 +327,141 @@ class NetSuitePOBulkExtractor:
                     if link.get('rel') == 'self':
                         self_link = link.get('href')
                         break
-            
+
             if self_link:
-                po_detail = self.get_single_purchase_order_from_link(self_link)
-                if po_detail:
-                    # Add the ID for reference
-                    po_detail['list_id'] = po_id
-                    detailed_pos.append(po_detail)
-                    
-                    # Debug the first PO structure
-                    if i == 1:
-                        self.debug_po_structure(po_detail, po_id)
-                        
+                self_links[po_id] = self_link
             else:
                 print(f"❌ No self link found for PO {po_id}")
-            
-            # Rate limiting
-            if i < total_pos:
-                time.sleep(self.rate_limit_delay)
-        
+
+        print(f"Fetching {len(self_links)} POs ({self.concurrency_limit} concurrent, {self.requests_per_second}/s max)")
+        records = self.fetcher.fetch_all(self_links, checkpoint_path=checkpoint_path, done=done,
+                                         remove_checkpoint=remove_checkpoint)
+
+        detailed_pos = []
+        for po_id, po_detail in records.items():
+            if po_detail:
+                # Add the ID for reference
+                po_detail['list_id'] = po_id
+                detailed_pos.append(po_detail)
+
+        # Debug the first PO structure
+        if detailed_pos and self.debug and debug_first:
+            self.debug_po_structure(detailed_pos[0], detailed_pos[0]['list_id'])
+
         return detailed_pos
 
-    def extract_po_summary_safe(self, detailed_pos: List[Dict]) -> List[Dict]:
+    def discover_po_schema(self, pos: List[Dict]) -> Dict[str, List[str]]:
         """
-        Safe extraction that handles unknown data structures
+        Resolve each summary column to its field paths in the json_normalize'd POs, from a batch of POs.
+        NetSuite omits null fields, so the layout is built from the union of keys across the batch:
+        every candidate key any PO carries is kept, in PO_SUMMARY_FIELDS order, and per PO the first
+        non-null one wins. Reference fields ({id, refName}) map to their refName/name and id paths,
+        the line list to 'item' or its 'item.items' / 'item.item'.
         """
-        summary_data = []
-        
-        for i, po in enumerate(detailed_pos):
-            print(f"\n🔧 Processing PO {i+1}...")
-            
-            # Try to find common fields with various possible names
-            po_id = self.safe_get(po, ['id', 'internalId', 'internalid', 'list_id'])
-            po_number = self.safe_get(po, ['tranid', 'tranId', 'documentNumber', 'number'])
-            po_date = self.safe_get(po, ['trandate', 'tranDate', 'date', 'transactionDate'])
-            total = self.safe_get(po, ['total', 'amount', 'totalAmount'])
-            memo = self.safe_get(po, ['memo', 'description'])
-            
-            # Try to extract vendor information
-            vendor_name = ''
-            vendor_id = ''
-            entity_fields = ['entity', 'vendor', 'supplier']
-            for field in entity_fields:
-                if field in po and po[field]:
-                    entity = po[field]
-                    if isinstance(entity, dict):
-                        vendor_name = entity.get('refName', '') or entity.get('name', '')
-                        vendor_id = entity.get('id', '')
-                    else:
-                        vendor_name = str(entity)
-                    break
-            
-            # Try to extract status information
-            status_name = ''
-            status_id = ''
-            status_fields = ['status', 'approvalStatus', 'orderStatus']
-            for field in status_fields:
-                if field in po and po[field]:
-                    status = po[field]
-                    if isinstance(status, dict):
-                        status_name = status.get('refName', '') or status.get('name', '')
-                        status_id = status.get('id', '')
-                    else:
-                        status_name = str(status)
-                    break
-            
-            # Try to find line items
-            line_items_count = 0
-            item_fields = ['item', 'items', 'lineItems', 'itemList']
-            for field in item_fields:
-                if field in po:
-                    items = po[field]
-                    if isinstance(items, list):
-                        line_items_count = len(items)
-                        break
-                    elif isinstance(items, dict) and 'item' in items:
-                        items_list = items['item']
-                        line_items_count = len(items_list) if isinstance(items_list, list) else 1
-                        break
-            
-            summary = {
-                'id': po_id,
-                'po_number': po_number,
-                'po_date': po_date,
-                'vendor_id': vendor_id,
-                'vendor_name': vendor_name,
-                'total': self.safe_float(total),
-                'status_id': status_id,
-                'status_name': status_name,
-                'memo': memo,
-                'line_items_count': line_items_count
-            }
-            
-            # Print what we found
-            print(f"  ID: {po_id}")
-            print(f"  Number: {po_number}")
-            print(f"  Date: {po_date}")
-            print(f"  Vendor: {vendor_name}")
-            print(f"  Total: {total}")
-            print(f"  Status: {status_name}")
-            print(f"  Line Items: {line_items_count}")
-            
-            summary_data.append(summary)
-        
-        return summary_data
-
-    def safe_get(self, data: Dict, keys: List[str]) -> str:
-        """Safely get a value from dict using multiple possible keys"""
-        for key in keys:
-            if key in data and data[key] is not None:
-                value = data[key]
-                if isinstance(value, dict):
-                    return value.get('refName', '') or value.get('name', '') or str(value)
-                return str(value)
-        return ''
-
-    def safe_float(self, value) -> float:
-        """Safely convert value to float"""
-        if value is None:
-            return 0.0
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
+        keys = set().union(*pos)
+
+        def present(candidates):
+            return [key for key in candidates if key in keys]
+
+        schema = {}
+        for column, candidates in PO_SUMMARY_FIELDS.items():
+            schema[column] = [path for key in present(candidates) for path in (f"{key}.refName", f"{key}.name", key)]
+
+        for prefix, candidates in PO_REFERENCE_FIELDS.items():
+            schema[f"{prefix}_name"] = [path for key in present(candidates)
+                                        for path in (f"{key}.refName", f"{key}.name", key)]
+            schema[f"{prefix}_id"] = [f"{key}.id" for key in present(candidates)]
+
+        schema['line_items'] = []
+        for key in present(PO_LINE_FIELDS):
+            for po in pos:
+                items = po.get(key)
+                if isinstance(items, list):
+                    path = key
+                else:
+                    sub = next((sub for sub in ('items', 'item') if isinstance(items, dict) and sub in items), None)
+                    path = f"{key}.{sub}" if sub else None
+                if path and path not in schema['line_items']:
+                    schema['line_items'].append(path)
+
+        return schema
+
+    def extract_po_summary_safe(self, detailed_pos: Iterable[Dict]) -> List[Dict]:
+        """
+        Summary rows for POs of unknown structure (detailed_pos can be a list or a stream of POs).
+        POs are consumed SUMMARY_CHUNK_SIZE at a time; each chunk's field layout is discovered from
+        the chunk and applied to its POs in bulk.
+        """
+        pos = (po for po in detailed_pos if po)
+        chunks = []
+        layout = None
+        while True:
+            chunk = list(islice(pos, SUMMARY_CHUNK_SIZE))
+            if not chunk:
+                break
+            schema = self.discover_po_schema(chunk)
+            chunk_layout = ', '.join(f"{name}<-{'|'.join(paths) or '-'}" for name, paths in schema.items())
+            if chunk_layout != layout:
+                layout = chunk_layout
+                print(f"🔧 PO field layout: {layout}")
+            chunks.append(self._summarize_po_chunk(chunk, schema))
+
+        if not chunks:
+            return []
+
+        summary_df = pd.concat(chunks, ignore_index=True)
+        print(f"✅ Summarized {len(summary_df)} POs: {summary_df['line_items_count'].sum()} lines, "
+              f"total {summary_df['total'].sum():,.2f}, "
+              f"{(summary_df['id'] == '').sum()} without ID, {(summary_df['vendor_name'] == '').sum()} without vendor")
+        return summary_df.to_dict('records')
+
+    def _summarize_po_chunk(self, pos: List[Dict], schema: Dict[str, List[str]]) -> pd.DataFrame:
+        """Summary rows of one chunk of POs, read through the chunk's discover_po_schema layout"""
+        # Only the top-level keys the schema reads are normalized (json_normalize copies each record),
+        # the line list is counted straight from its path
+        header_keys = sorted({path.split('.')[0] for column, paths in schema.items()
+                              if column != 'line_items' for path in paths})
+        flat = pd.json_normalize([{key: po.get(key) for key in header_keys} for po in pos])
+        empty = pd.Series([None] * len(pos), index=pd.RangeIndex(len(pos)), dtype=object)
+
+        def column(paths):
+            # First non-null value across the candidate paths (e.g. refName, then name, then the next key)
+            values = empty
+            for path in paths:
+                if path in flat.columns:
+                    values = values.where(values.notna(), flat[path].astype(object))
+            return values
+
+        def text(paths):
+            values = column(paths)
+            return values.where(values.notna(), '').astype(str)
+
+        line_paths = [path.split('.') for path in schema['line_items']]
+
+        def line_count(po):
+            # First line path this PO actually carries
+            for line_path in line_paths:
+                value = po
+                for key in line_path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if isinstance(value, list):
+                    return len(value)
+                if value is not None:
+                    return 1
+            return 0
+
+        return pd.DataFrame({
+            'id': text(schema['id']),
+            'po_number': text(schema['po_number']),
+            'po_date': text(schema['po_date']),
+            'vendor_id': column(schema['vendor_id']).where(lambda v: v.notna(), ''),
+            'vendor_name': text(schema['vendor_name']),
+            'total': pd.to_numeric(column(schema['total']), errors='coerce').fillna(0.0).astype(float),
+            'status_id': column(schema['status_id']).where(lambda v: v.notna(), ''),
+            'status_name': text(schema['status_name']),
+            'memo': text(schema['memo']),
+            'line_items_count': [line_count(po) for po in pos],
+        })
 
     def save_to_excel(self, data: List[Dict], filename: str):
         """Save data to Excel file"""
@@ -301,6 +480,16 @@ class NetSuitePOBulkExtractor:
             json.dump(data, f, indent=2, default=str)
         print(f"✅ Data saved to {filename}")
 
+    def stream_to_json(self, data: Iterable[Dict], filename: str) -> Iterator[Dict]:
+        """Pass records through while writing them to a JSON array file, so a stream is saved without holding it"""
+        with open(filename, 'w') as f:
+            f.write('[')
+            for i, record in enumerate(data):
+                f.write((',\n' if i else '\n') + json.dumps(record, indent=2, default=str))
+                yield record
+            f.write('\n]\n')
+        print(f"✅ Data saved to {filename}")
+
     def print_summary(self, summary_data: List[Dict]):
         """Print a summary of the data"""
         if not summary_data:
@@ -311,7 +500,7 @@ class NetSuitePOBulkExtractor:
         print("PURCHASE ORDER SUMMARY")
         print("="*80)
         
-        for i, po in enumerate(summary_data, 1):
+        for i, po in enumerate(summary_data[:SUMMARY_PRINT_LIMIT], 1):
             print(f"\n{i}. PO ID: {po.get('id', 'N/A')}")
             print(f"   PO Number: {po.get('po_number', 'N/A')}")
             print(f"   Date: {po.get('po_date', 'N/A')}")
@@ -319,6 +508,8 @@ class NetSuitePOBulkExtractor:
             print(f"   Total: ${po.get('total', 0):,.2f}")
             print(f"   Status: {po.get('status_name', 'N/A')}")
             print(f"   Line Items: {po.get('line_items_count', 0)}")
+        if len(summary_data) > SUMMARY_PRINT_LIMIT:
+            print(f"\n... and {len(summary_data) - SUMMARY_PRINT_LIMIT} more POs (see the Excel summary)")
 
 
 def main():
@@ -354,49 +545,45 @@ def main():
             print("❌ Authentication failed")
             return
         
-        # Step 2: Get 2 purchase order items for debugging
-        print("\n=== Step 2: Getting 2 Purchase Order Items ===")
-        response_data = extractor.get_purchase_orders_list(limit=2, offset=0)
-        
-        if 'items' in response_data and response_data['items']:
-            po_items = response_data['items']
-            print(f"✅ Retrieved {len(po_items)} PO items")
-            
-            # Show what we got from the list
-            for i, item in enumerate(po_items, 1):
-                print(f"  Item {i}: ID = {item.get('id')}, Links = {len(item.get('links', []))}")
-            
-            # Step 3: Get detailed information using self links
-            print("\n=== Step 3: Getting Detailed Information via Self Links ===")
-            detailed_pos = extractor.get_detailed_purchase_orders(po_items)
-            
-            if detailed_pos:
-                print(f"✅ Retrieved {len(detailed_pos)} detailed POs")
-                
-                # Step 4: Extract data using safe method
-                print("\n=== Step 4: Processing Data with Safe Extraction ===")
-                summary_data = extractor.extract_po_summary_safe(detailed_pos)
-                
-                # Step 5: Display results
-                extractor.print_summary(summary_data)
-                
-                # Step 6: Save data
-                print("\n=== Step 5: Saving Data ===")
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                
-                extractor.save_to_excel(summary_data, f"po_summary_corrected_{timestamp}.xlsx")
-                extractor.save_to_json(detailed_pos, f"po_raw_corrected_{timestamp}.json")
-                
-                print(f"\n🎉 SUCCESS! Files created:")
-                print(f"   • po_summary_corrected_{timestamp}.xlsx - Processed summary")
-                print(f"   • po_raw_corrected_{timestamp}.json - All raw data")
+        if EXTRACTION_MODE == 'suiteql':
+            # Step 2: Headers + lines of every PO in the window via SuiteQL
+            print("\n=== Step 2: Getting Purchase Orders via SuiteQL ===")
+            detailed_pos = extractor.get_purchase_orders_suiteql(
+                start_date=PO_START_DATE, end_date=PO_END_DATE, statuses=PO_STATUSES
+            )
+        else:
+            # Step 2: Stream the PO list page by page, fetching each page's details concurrently
+            print("\n=== Step 2: Getting Purchase Orders via Paged Record List ===")
+            detailed_pos = islice(extractor.iter_detailed_purchase_orders(checkpoint_path=PO_CHECKPOINT_PATH),
+                                  RECORDS_LIMIT)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        raw_file = f"po_raw_corrected_{timestamp}.json"
+
+        # Step 4: Extract data using safe method; POs are written to the raw JSON as they stream through
+        print("\n=== Step 4: Processing Data with Safe Extraction ===")
+        summary_data = extractor.extract_po_summary_safe(extractor.stream_to_json(detailed_pos, raw_file))
+
+        if summary_data:
+            print(f"✅ Retrieved {len(summary_data)} detailed POs")
+
+            # Step 5: Display results
+            extractor.print_summary(summary_data)
+
+            # Step 6: Save data
+            print("\n=== Step 5: Saving Data ===")
+            extractor.save_to_excel(summary_data, f"po_summary_corrected_{timestamp}.xlsx")
+
+            print(f"\n🎉 SUCCESS! Files created:")
+            print(f"   • po_summary_corrected_{timestamp}.xlsx - Processed summary")
+            print(f"   • {raw_file} - All raw data")
+            if EXTRACTION_MODE != 'suiteql':
                 print(f"   • debug_po_[ID].json - Raw structure of first PO")
-                
-            else:
-                print("❌ No detailed data retrieved")
+
         else:
-            print("❌ No purchase orders found")
-    
+            os.remove(raw_file)
+            print("❌ No detailed data retrieved")
+
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
@@ -1,12 +1,14 @@
-import requests
-import time
-import hmac
-import hashlib
-import base64
-import urllib.parse
-import secrets
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from netsuite_csv_split import remove_import_parts, split_csv_for_import
+from netsuite_session import ConnectionHealth, create_netsuite_session
+
+# Large CSVs are split into row/size-bounded parts that are imported as parallel jobs.
+# Rows sharing IMPORT_GROUP_COLUMN (e.g. 'External ID' for PO uploads) always stay in the same part.
+IMPORT_GROUP_COLUMN = None
+IMPORT_WORKERS = 3
 
 class NetSuiteAutomatedImport:
     """Fully automated NetSuite CSV import using RESTlet"""
@@ -16,78 +18,23 @@ class NetSuiteAutomatedImport:
         self.account_formatted = config['ACCOUNT_ID'].lower().replace('_', '-')
         self.realm = config['ACCOUNT_ID']
         self.restlet_url = config['RESTLET_URL']
-    
-    def generate_oauth_header(self, url, method='GET'):
-        """Generate OAuth 1.0 header"""
-        oauth_timestamp = str(int(time.time()))
-        oauth_nonce = secrets.token_hex(8)
-        
-        oauth_params = {
-            'oauth_consumer_key': self.config['CONSUMER_KEY'],
-            'oauth_token': self.config['TOKEN_ID'],
-            'oauth_signature_method': 'HMAC-SHA256',
-            'oauth_timestamp': oauth_timestamp,
-            'oauth_nonce': oauth_nonce,
-            'oauth_version': '1.0'
-        }
-        
-        parsed_url = urllib.parse.urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-        query_params = urllib.parse.parse_qsl(parsed_url.query)
-        
-        all_params = {**oauth_params}
-        for key, value in query_params:
-            all_params[key] = value
-        
-        sorted_params = sorted(all_params.items())
-        param_string = '&'.join([f"{urllib.parse.quote(str(k), safe='')}={urllib.parse.quote(str(v), safe='')}" 
-                                 for k, v in sorted_params])
-        
-        signature_base = '&'.join([
-            method.upper(),
-            urllib.parse.quote(base_url, safe=''),
-            urllib.parse.quote(param_string, safe='')
-        ])
-        
-        signing_key = f"{urllib.parse.quote(self.config['CONSUMER_SECRET'], safe='')}&{urllib.parse.quote(self.config['TOKEN_SECRET'], safe='')}"
-        
-        signature = base64.b64encode(
-            hmac.new(
-                signing_key.encode('utf-8'),
-                signature_base.encode('utf-8'),
-                hashlib.sha256
-            ).digest()
-        ).decode('utf-8')
-        
-        encoded_signature = urllib.parse.quote(signature, safe='')
-        
-        auth_header = (
-            f'OAuth realm="{self.realm}",'
-            f'oauth_consumer_key="{oauth_params["oauth_consumer_key"]}",'
-            f'oauth_token="{oauth_params["oauth_token"]}",'
-            f'oauth_signature_method="{oauth_params["oauth_signature_method"]}",'
-            f'oauth_timestamp="{oauth_params["oauth_timestamp"]}",'
-            f'oauth_nonce="{oauth_params["oauth_nonce"]}",'
-            f'oauth_version="{oauth_params["oauth_version"]}",'
-            f'oauth_signature="{encoded_signature}"'
-        )
-        
-        return auth_header
+        # Signed persistent session (OAuth key material prepared once, see netsuite_session.NetSuiteAuth)
+        self.session = create_netsuite_session(config)
+        # Skip the connection test while a recent call succeeded; re-test and retry once on 401
+        self.health = ConnectionHealth(config)
+        self.health.attach(self.session, self.test_restlet_connection)
     
     def test_restlet_connection(self):
         """Test RESTlet connection"""
         print("🔍 Testing RESTlet connection...\n")
         
-        auth_header = self.generate_oauth_header(self.restlet_url, 'GET')
-        
         headers = {
-            'Authorization': auth_header,
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
         
         try:
-            response = requests.get(self.restlet_url, headers=headers, timeout=30)
+            response = self.session.get(self.restlet_url, headers=headers, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -123,10 +70,7 @@ class NetSuiteAutomatedImport:
                 "savedImportId": self.config['SAVED_IMPORT_ID']
             }
             
-            auth_header = self.generate_oauth_header(self.restlet_url, 'POST')
-            
             headers = {
-                'Authorization': auth_header,
                 'Content-Type': 'application/json',
                 'Accept': 'application/json'
             }
@@ -140,7 +84,7 @@ class NetSuiteAutomatedImport:
             print(f"Saved Import ID: {self.config['SAVED_IMPORT_ID']}")
             print("="*70 + "\n")
             
-            response = requests.post(
+            response = self.session.post(
                 self.restlet_url,
                 headers=headers,
                 json=payload,
@@ -186,6 +130,11 @@ class NetSuiteAutomatedImport:
             traceback.print_exc()
             return {'success': False, 'error': str(e)}
     
+    def upload_and_import_parts(self, part_paths):
+        """Upload and import each CSV part as its own job, up to IMPORT_WORKERS at a time"""
+        with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+            return list(executor.map(self.upload_and_import_csv, part_paths))
+    
     def run(self, csv_file_path):
         """Main workflow"""
         print("\n" + "="*70)
@@ -202,7 +151,7 @@ class NetSuiteAutomatedImport:
         
         # Test RESTlet
         print("Step 1: Testing RESTlet connection...")
-        if not self.test_restlet_connection():
+        if not self.health.ensure(self.test_restlet_connection):
             print("❌ RESTlet connection failed.\n")
             print("Troubleshooting:")
             print("1. Verify RESTlet is deployed with Status = RELEASED")
@@ -210,26 +159,40 @@ class NetSuiteAutomatedImport:
             print("3. Verify your role is in the Audience list\n")
             return False
         
-        # Upload and import
+        # Split large files into import-sized parts (written to a temporary directory)
+        part_paths = split_csv_for_import(csv_file_path, group_column=IMPORT_GROUP_COLUMN)
+        if len(part_paths) > 1:
+            print(f"✂️  Split into {len(part_paths)} parts for parallel import\n")
+        
+        # Upload and import, then drop the part files (their content is in the File Cabinet now)
         print("Step 2: Uploading file and triggering import...")
-        result = self.upload_and_import_csv(csv_file_path)
+        try:
+            results = self.upload_and_import_parts(part_paths)
+        finally:
+            remove_import_parts(part_paths, csv_file_path)
         
-        if result.get('success'):
+        failed = [path for path, result in zip(part_paths, results) if not result.get('success')]
+        if not failed:
             print("\n" + "="*70)
             print("🎉 FULLY AUTOMATED PROCESS COMPLETE!")
             print("="*70)
             print(f"✅ File uploaded automatically")
             print(f"✅ Import job triggered automatically")
             
-            if result.get('importTaskId'):
-                print(f"\n📋 Import Task ID: {result.get('importTaskId')}")
+            for result in results:
+                if result.get('importTaskId'):
+                    print(f"\n📋 Import Task ID: {result.get('importTaskId')}")
             
             print(f"\n🔍 Monitor import status at:")
             print(f"   https://{self.account_formatted}.app.netsuite.com/app/setup/import/importstatus.nl")
             print("="*70 + "\n")
+            
             return True
         else:
-            print("\n❌ Process failed.\n")
+            print(f"\n❌ Process failed for {len(failed)}/{len(part_paths)} file(s):")
+            for path in failed:
+                print(f"   - {os.path.basename(path)}")
+            print()
             return False
 
 
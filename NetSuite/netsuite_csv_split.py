@@ -0,0 +1,92 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+
+# NetSuite CSV import limits per file (rows) and a payload size that stays well under the RESTlet request limit
+IMPORT_MAX_ROWS = 25000
+IMPORT_MAX_BYTES = 5 * 1024 * 1024
+
+
+def split_csv_for_import(csv_file_path, max_rows=IMPORT_MAX_ROWS, max_bytes=IMPORT_MAX_BYTES,
+                         group_column=None, output_dir=None):
+    """
+    Streams a CSV from disk into row/size-bounded part files, each starting with the header row.
+
+    - group_column: rows sharing this value (e.g. 'External ID' = one PO's lines) are never split across
+      parts. They are expected to be contiguous, as in the generated import files; a group larger than
+      the limits is kept whole in its own part.
+    - Parts go to output_dir, or to a new temporary directory when it is not given; remove them with
+      remove_import_parts once uploaded.
+    - Returns the list of part paths, or [csv_file_path] when the file already fits in one part.
+    """
+    base, ext = os.path.splitext(os.path.basename(csv_file_path))
+
+    def encoded_size(row):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        return len(buffer.getvalue().encode('utf-8'))
+
+    parts = []
+    part_rows, part_bytes = [], 0
+    group_rows, group_bytes, group_key = [], 0, None
+
+    def flush_part():
+        nonlocal part_rows, part_bytes, output_dir
+        if not part_rows:
+            return
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix=f"{base}_parts_")
+        path = os.path.join(output_dir, f"{base}_part{len(parts) + 1}{ext}")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(part_rows)
+        parts.append(path)
+        part_rows, part_bytes = [], 0
+
+    def add_group():
+        nonlocal part_rows, part_bytes, group_rows, group_bytes
+        if part_rows and (len(part_rows) + len(group_rows) > max_rows
+                          or header_bytes + part_bytes + group_bytes > max_bytes):
+            flush_part()
+        if len(group_rows) > max_rows or group_bytes + header_bytes > max_bytes:
+            print(f"⚠️  Group '{group_key}' has {len(group_rows)} rows / {group_bytes} bytes, kept whole in one part")
+        part_rows.extend(group_rows)
+        part_bytes += group_bytes
+        group_rows, group_bytes = [], 0
+
+    with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        header_bytes = encoded_size(header)
+        key_index = header.index(group_column) if group_column else None
+
+        for row in reader:
+            key = row[key_index] if key_index is not None else None
+            # Without a group column every row is its own group
+            if group_rows and (key_index is None or key != group_key):
+                add_group()
+            group_key = key
+            group_rows.append(row)
+            group_bytes += encoded_size(row)
+        if group_rows:
+            add_group()
+
+    if not parts:
+        return [csv_file_path]
+    flush_part()
+    return parts
+
+
+def remove_import_parts(part_paths, csv_file_path):
+    """Deletes the part files written by split_csv_for_import (never the source CSV) and their temporary directory"""
+    source = os.path.abspath(csv_file_path)
+    part_paths = [path for path in part_paths if os.path.abspath(path) != source]
+    for path in part_paths:
+        if os.path.exists(path):
+            os.remove(path)
+    for folder in {os.path.dirname(path) for path in part_paths}:
+        if os.path.basename(folder).startswith(f"{os.path.splitext(os.path.basename(source))[0]}_parts_"):
+            shutil.rmtree(folder, ignore_errors=True)
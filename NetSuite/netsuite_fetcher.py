@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional
+
+# TokenBucket lives at the repo root (shared with PO_Check_8.py)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+from token_bucket import TokenBucket
+
+
+class NetSuiteRecordFetcher:
+    """
+    Fetches NetSuite records concurrently, up to the account's concurrency limit.
+
+    - Requests are paced by a token bucket instead of a fixed sleep, and at most max_workers are in flight
+      at once across every thread using the fetcher (fetch_all workers and direct fetch calls alike).
+    - On 429 / CONCURRENCY_LIMIT_EXCEEDED the request backs off exponentially with jitter and the
+      bucket rate is halved; every success recovers it a little towards the configured rate.
+    - With a checkpoint file, fetched records are appended as JSON lines so an interrupted run resumes
+      where it stopped. The checkpoint is removed once every record has been fetched.
+    - failures counts the records fetch_all gave up on over the fetcher's lifetime.
+    """
+
+    def __init__(self, session, max_workers: int = 5, requests_per_second: float = 10,
+                 max_retries: int = 6, backoff_base: float = 1.0, backoff_cap: float = 60.0,
+                 headers: Optional[Dict] = None):
+        self.session = session
+        self.max_workers = max_workers
+        self.max_rate = requests_per_second
+        self.min_rate = requests_per_second / 20
+        self.bucket = TokenBucket(requests_per_second, capacity=max_workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.headers = headers or {}
+        self.slots = threading.BoundedSemaphore(max_workers)
+        self.lock = threading.Lock()
+        self.throttled = 0
+        self.failures = 0
+
+    @staticmethod
+    def is_throttled(response) -> bool:
+        return response.status_code == 429 or 'CONCURRENCY_LIMIT_EXCEEDED' in response.text
+
+    def _on_throttled(self) -> None:
+        with self.lock:
+            self.throttled += 1
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+
+    def _on_success(self) -> None:
+        if self.bucket.rate < self.max_rate:
+            with self.lock:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate / 50))
+
+    def fetch(self, url: str) -> Dict:
+        """GET one record, retrying throttled and 5xx responses. Raises on other errors or when retries run out."""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                with self.slots:
+                    response = self.session.get(url, headers=self.headers, timeout=60)
+            except requests.exceptions.RequestException as e:
+                error = str(e)  # connection resets / timeouts are retried like 5xx
+            else:
+                if response.status_code == 200:
+                    self._on_success()
+                    return response.json()
+
+                if self.is_throttled(response):
+                    self._on_throttled()
+                elif response.status_code < 500:
+                    response.raise_for_status()
+                error = f"{response.status_code}: {response.text[:200]}"
+
+            if attempt < self.max_retries:
+                delay = min(self.backoff_cap, self.backoff_base * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+
+        raise RuntimeError(f"Giving up on {url} after {self.max_retries} retries ({error})")
+
+    def load_checkpoint(self, checkpoint_path: Optional[str]) -> Dict[str, Dict]:
+        """{key: record} of a checkpoint file ({} when there is none)"""
+        done = {}
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partially written last line of an interrupted run
+                    done[entry['key']] = entry['record']
+        return done
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def fetch_all(self, urls: Dict[str, str], checkpoint_path: Optional[str] = None,
+                  done: Optional[Dict[str, Dict]] = None, remove_checkpoint: bool = True) -> Dict[str, Optional[Dict]]:
+        """
+        Fetches {key: url} and returns {key: record} in the order of urls (None for records that failed).
+        Keys already in the checkpoint are not fetched again.
+
+        Callers fetching one collection in several calls (e.g. page by page) load the checkpoint once and
+        pass it as done (keys of urls are taken out of it), with remove_checkpoint=False so the file is kept
+        until they have finished.
+        """
+        if done is None:
+            results = self.load_checkpoint(checkpoint_path)
+        else:
+            results = {key: done.pop(key) for key in urls if key in done}
+        pending = {key: url for key, url in urls.items() if key not in results}
+        if results:
+            print(f"↩️  Resuming from checkpoint: {len(urls) - len(pending)}/{len(urls)} records already fetched")
+
+        failed = {}
+        checkpoint = open(checkpoint_path, 'a') if checkpoint_path else None
+        if checkpoint and checkpoint.tell() and not self._ends_with_newline(checkpoint_path):
+            checkpoint.write('\n')  # don't append onto the torn last line of an interrupted run
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.fetch, url): key for key, url in pending.items()}
+                for i, future in enumerate(as_completed(futures), 1):
+                    key = futures[future]
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        failed[key] = str(e)
+                        with self.lock:
+                            self.failures += 1
+                        print(f"❌ Error fetching {key}: {e}")
+                        continue
+                    results[key] = record
+                    if checkpoint:
+                        checkpoint.write(json.dumps({'key': key, 'record': record}, default=str) + '\n')
+                        checkpoint.flush()
+                    if i % 100 == 0 or i == len(futures):
+                        print(f"Fetched {i}/{len(futures)} records (throttled {self.throttled}x, "
+                              f"rate {self.bucket.rate:.1f}/s)")
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        if checkpoint_path and remove_checkpoint and not failed and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return {key: results.get(key) for key in urls}
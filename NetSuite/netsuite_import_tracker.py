@@ -0,0 +1,98 @@
+import os
+import time
+
+
+class StatusUnsupported(Exception):
+    """Raised by a check_batch function whose endpoint cannot report job statuses at all"""
+
+
+# Task statuses that end polling (N/task CSV import statuses, async job states)
+FINISHED_STATUSES = {'COMPLETE', 'COMPLETED', 'SUCCEEDED', 'FAILED', 'ERROR'}
+
+
+def normalize_status(data):
+    """
+    Status dict -> {'status', 'finished', 'errors', 'failure_csv'} from either a task
+    status ({status, errors, failureCsv}) or an async job ({completed, progress, ...}).
+    """
+    status = str(data.get('status') or data.get('progress') or 'UNKNOWN').upper()
+    return {
+        'status': status,
+        'finished': bool(data.get('completed')) or status in FINISHED_STATUSES,
+        'errors': int(data.get('errors') or data.get('errorCount') or 0),
+        'failure_csv': data.get('failureCsv') or data.get('failure_csv'),
+    }
+
+
+class ImportJobTracker:
+    """
+    Polls many CSV import jobs until all of them have finished.
+
+    - check_batch(job_ids) -> {job_id: status dict} checks one batch of ids (e.g. one concurrent
+      round of async job GETs); at most batch_size ids are passed per call.
+    - Polling starts after initial_delay seconds and backs off exponentially up to max_delay, and
+      returns as soon as no job is pending (or after timeout seconds, leaving the rest unfinished).
+    - Row-level failures returned by NetSuite are saved as import_failures_<job id>.csv in failure_dir.
+    - check_batch raises StatusUnsupported when the endpoint cannot report statuses at all; that ends
+      tracking right away (it propagates out of wait) instead of polling until the timeout.
+    """
+
+    def __init__(self, check_batch, batch_size=50, initial_delay=5, max_delay=120, backoff=2,
+                 timeout=3600, failure_dir='.'):
+        self.check_batch = check_batch
+        self.batch_size = batch_size
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+        self.failure_dir = failure_dir
+
+    def _report(self, job_id, status):
+        icon = '✅' if status['status'] not in ('FAILED', 'ERROR') and not status['errors'] else '❌'
+        print(f"{icon} Import {job_id}: {status['status']} ({status['errors']} row errors)")
+        if status['failure_csv']:
+            path = os.path.join(self.failure_dir, f"import_failures_{job_id}.csv")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(status['failure_csv'])
+            status['failure_csv'] = path
+            print(f"   📄 Failed rows saved to {path}")
+
+    def wait(self, job_ids):
+        """Polls until every job has finished and returns {job_id: normalized status}"""
+        job_ids = [str(job_id) for job_id in job_ids if job_id]
+        results = {}
+        pending = list(job_ids)
+        delay = self.initial_delay
+        deadline = time.monotonic() + self.timeout
+
+        print(f"⏳ Tracking {len(pending)} import job(s)...")
+        while pending:
+            time.sleep(min(delay, max(0, deadline - time.monotonic())))
+
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                try:
+                    statuses = self.check_batch(batch)
+                except StatusUnsupported:
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Status check failed, retrying next round: {e}")
+                    continue
+                for job_id, data in statuses.items():
+                    status = normalize_status(data)
+                    if status['finished'] and str(job_id) not in results:
+                        self._report(job_id, status)
+                        results[str(job_id)] = status
+
+            pending = [job_id for job_id in job_ids if job_id not in results]
+            if pending and time.monotonic() >= deadline:
+                print(f"⚠️  Stopped tracking after {self.timeout}s, {len(pending)} job(s) still running")
+                for job_id in pending:
+                    results[job_id] = {'status': 'PENDING', 'finished': False, 'errors': 0, 'failure_csv': None}
+                break
+            delay = min(self.max_delay, delay * self.backoff)
+
+        finished = sum(r['finished'] for r in results.values())
+        errors = sum(r['errors'] for r in results.values())
+        print(f"📋 {finished}/{len(job_ids)} import job(s) finished, {errors} row errors in total")
+        return {job_id: results[job_id] for job_id in job_ids}
@@ -0,0 +1,280 @@
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+from netsuite_automated_import import NETSUITE_CONFIG as IMPORT_CONFIG
+from netsuite_session import create_netsuite_session, rest_base_url, run_suiteql
+
+# ========== CONFIGURATION ==========
+# Account and token credentials are shared with the CSV import (netsuite_automated_import.NETSUITE_CONFIG)
+NETSUITE_CONFIG = {key: IMPORT_CONFIG[key] for key in ('ACCOUNT_ID', 'CONSUMER_KEY', 'CONSUMER_SECRET', 'TOKEN_ID', 'TOKEN_SECRET')}
+
+MIRROR_DB_PATH = 'netsuite_mirror.db'
+
+# First sync (no watermark yet) starts from this lastModifiedDate
+INITIAL_WATERMARK = '2024-01-01 00:00:00'
+TIMESTAMP_FORMAT = 'YYYY-MM-DD HH24:MI:SS'
+
+# Transaction types mirrored into transactions / transaction_lines
+TRANSACTION_TYPES = {'PurchOrd': 'purchase order', 'ItemRcpt': 'item receipt'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY, type TEXT, tranid TEXT, trandate TEXT, externalid TEXT,
+    entity INTEGER, entity_name TEXT, status TEXT, status_name TEXT,
+    total REAL, memo TEXT, lastmodified TEXT
+);
+CREATE TABLE IF NOT EXISTS transaction_lines (
+    transaction_id INTEGER, line INTEGER, item INTEGER, item_name TEXT,
+    quantity REAL, quantity_received REAL, rate REAL, amount REAL,
+    location INTEGER, location_name TEXT, expectedreceiptdate TEXT, createdfrom INTEGER,
+    PRIMARY KEY (transaction_id, line)
+);
+CREATE TABLE IF NOT EXISTS inbound_shipments (
+    id INTEGER PRIMARY KEY, shipmentnumber TEXT, externaldocumentnumber TEXT, status TEXT,
+    billoflading TEXT, vesselnumber TEXT, expectedshippingdate TEXT, actualshippingdate TEXT,
+    expecteddeliverydate TEXT, actualdeliverydate TEXT, lastmodified TEXT
+);
+CREATE TABLE IF NOT EXISTS inbound_shipment_items (
+    id INTEGER PRIMARY KEY, inbound_shipment_id INTEGER, purchase_order_id INTEGER, po_number TEXT,
+    item INTEGER, item_name TEXT, quantity_expected REAL, quantity_received REAL, location TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, watermark TEXT, synced_at TEXT);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_tranid ON transactions (tranid);
+CREATE INDEX IF NOT EXISTS idx_transactions_type_status ON transactions (type, status);
+CREATE INDEX IF NOT EXISTS idx_lines_item ON transaction_lines (item_name);
+CREATE INDEX IF NOT EXISTS idx_lines_createdfrom ON transaction_lines (createdfrom);
+CREATE INDEX IF NOT EXISTS idx_shipments_number ON inbound_shipments (shipmentnumber);
+CREATE INDEX IF NOT EXISTS idx_shipments_bol ON inbound_shipments (billoflading);
+CREATE INDEX IF NOT EXISTS idx_shipment_items_shipment ON inbound_shipment_items (inbound_shipment_id);
+CREATE INDEX IF NOT EXISTS idx_shipment_items_po ON inbound_shipment_items (purchase_order_id);
+
+CREATE VIEW IF NOT EXISTS purchase_orders AS SELECT * FROM transactions WHERE type = 'PurchOrd';
+CREATE VIEW IF NOT EXISTS item_receipts AS SELECT * FROM transactions WHERE type = 'ItemRcpt';
+"""
+
+
+class NetSuiteMirror:
+    """
+    Local SQLite copy of NetSuite purchase orders, item receipts (with lines) and inbound shipments.
+
+    sync() pulls only records whose lastModifiedDate is at or after the stored watermark (SuiteQL),
+    upserts them and replaces their lines, so repeated syncs stay small. Records deleted in NetSuite
+    are not detected incrementally; sync(full=True) rebuilds the mirror.
+    """
+
+    def __init__(self, config, db_path=MIRROR_DB_PATH):
+        self.config = config
+        self.base_url = rest_base_url(config)
+        self.session = create_netsuite_session(config)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    # ---------------------------------------------------------
+    # Sync
+    # ---------------------------------------------------------
+    def _get_watermark(self, name):
+        row = self.conn.execute("SELECT watermark FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else INITIAL_WATERMARK
+
+    def _set_watermark(self, name, watermark):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (name, watermark, synced_at) VALUES (?, ?, ?)",
+            (name, watermark, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+
+    def _upsert(self, table, rows, columns):
+        if rows:
+            placeholders = ', '.join('?' for _ in columns)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                [tuple(row.get(column) for column in columns) for row in rows]
+            )
+
+    def _delete_children(self, table, key_column, parent_ids):
+        parent_ids = list(parent_ids)
+        for start in range(0, len(parent_ids), 500):
+            batch = parent_ids[start:start + 500]
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE {key_column} IN ({', '.join('?' for _ in batch)})", batch
+            )
+
+    def sync_transactions(self):
+        """Purchase orders and item receipts modified since the watermark, with all their lines"""
+        watermark = self._get_watermark('transactions')
+        types = ', '.join(f"'{t}'" for t in TRANSACTION_TYPES)
+        where = (f"t.type IN ({types}) AND "
+                 f"t.lastmodifieddate >= TO_TIMESTAMP('{watermark}', '{TIMESTAMP_FORMAT}')")
+
+        headers = run_suiteql(self.session, self.base_url, f"""
+            SELECT t.id, t.type, t.tranid, TO_CHAR(t.trandate, 'YYYY-MM-DD') AS trandate, t.externalid,
+                   t.entity, BUILTIN.DF(t.entity) AS entity_name, t.status, BUILTIN.DF(t.status) AS status_name,
+                   t.foreigntotal AS total, t.memo,
+                   TO_CHAR(t.lastmodifieddate, '{TIMESTAMP_FORMAT}') AS lastmodified
+            FROM transaction t
+            WHERE {where}
+        """)
+        lines = run_suiteql(self.session, self.base_url, f"""
+            SELECT tl.transaction AS transaction_id, tl.linesequencenumber AS line,
+                   tl.item, BUILTIN.DF(tl.item) AS item_name, tl.quantity,
+                   tl.quantityshiprecv AS quantity_received, tl.rate, tl.foreignamount AS amount,
+                   tl.location, BUILTIN.DF(tl.location) AS location_name,
+                   TO_CHAR(tl.expectedreceiptdate, 'YYYY-MM-DD') AS expectedreceiptdate, tl.createdfrom
+            FROM transactionline tl
+            JOIN transaction t ON t.id = tl.transaction
+            WHERE {where} AND tl.mainline = 'F'
+        """)
+
+        with self.conn:
+            self._upsert('transactions', headers, [
+                'id', 'type', 'tranid', 'trandate', 'externalid', 'entity', 'entity_name',
+                'status', 'status_name', 'total', 'memo', 'lastmodified'
+            ])
+            # Lines of a changed transaction are replaced as a whole (removed lines disappear too)
+            self._delete_children('transaction_lines', 'transaction_id', {row['id'] for row in headers})
+            self._upsert('transaction_lines', lines, [
+                'transaction_id', 'line', 'item', 'item_name', 'quantity', 'quantity_received', 'rate',
+                'amount', 'location', 'location_name', 'expectedreceiptdate', 'createdfrom'
+            ])
+            if headers:
+                self._set_watermark('transactions', max(row['lastmodified'] for row in headers))
+        return len(headers), len(lines)
+
+    def sync_inbound_shipments(self):
+        """Inbound shipments modified since the watermark, with all their items"""
+        watermark = self._get_watermark('inbound_shipments')
+        where = f"s.lastmodifieddate >= TO_TIMESTAMP('{watermark}', '{TIMESTAMP_FORMAT}')"
+
+        shipments = run_suiteql(self.session, self.base_url, f"""
+            SELECT s.id, s.shipmentnumber, s.externaldocumentnumber, BUILTIN.DF(s.shipmentstatus) AS status,
+                   s.billoflading, s.vesselnumber,
+                   TO_CHAR(s.expectedshippingdate, 'YYYY-MM-DD') AS expectedshippingdate,
+                   TO_CHAR(s.actualshippingdate, 'YYYY-MM-DD') AS actualshippingdate,
+                   TO_CHAR(s.expecteddeliverydate, 'YYYY-MM-DD') AS expecteddeliverydate,
+                   TO_CHAR(s.actualdeliverydate, 'YYYY-MM-DD') AS actualdeliverydate,
+                   TO_CHAR(s.lastmodifieddate, '{TIMESTAMP_FORMAT}') AS lastmodified
+            FROM inboundshipment s
+            WHERE {where}
+        """)
+        items = run_suiteql(self.session, self.base_url, f"""
+            SELECT i.id, i.inboundshipment AS inbound_shipment_id, i.purchaseordertransaction AS purchase_order_id,
+                   BUILTIN.DF(i.purchaseordertransaction) AS po_number,
+                   i.shipmentitem AS item, BUILTIN.DF(i.shipmentitem) AS item_name,
+                   i.quantityexpected AS quantity_expected, i.quantityreceived AS quantity_received,
+                   BUILTIN.DF(i.receivinglocation) AS location
+            FROM inboundshipmentitem i
+            JOIN inboundshipment s ON s.id = i.inboundshipment
+            WHERE {where}
+        """)
+
+        with self.conn:
+            self._upsert('inbound_shipments', shipments, [
+                'id', 'shipmentnumber', 'externaldocumentnumber', 'status', 'billoflading', 'vesselnumber',
+                'expectedshippingdate', 'actualshippingdate', 'expecteddeliverydate', 'actualdeliverydate',
+                'lastmodified'
+            ])
+            self._delete_children('inbound_shipment_items', 'inbound_shipment_id', {row['id'] for row in shipments})
+            self._upsert('inbound_shipment_items', items, [
+                'id', 'inbound_shipment_id', 'purchase_order_id', 'po_number', 'item', 'item_name',
+                'quantity_expected', 'quantity_received', 'location'
+            ])
+            if shipments:
+                self._set_watermark('inbound_shipments', max(row['lastmodified'] for row in shipments))
+        return len(shipments), len(items)
+
+    def sync(self, full=False):
+        """Incremental sync of all mirrored records (full=True clears the mirror and reloads everything)"""
+        if full:
+            with self.conn:
+                for table in ['transactions', 'transaction_lines', 'inbound_shipments',
+                              'inbound_shipment_items', 'sync_state']:
+                    self.conn.execute(f"DELETE FROM {table}")
+
+        transactions, lines = self.sync_transactions()
+        print(f"✅ Transactions: {transactions} changed ({lines} lines)")
+        shipments, items = self.sync_inbound_shipments()
+        print(f"✅ Inbound shipments: {shipments} changed ({items} items)")
+
+    # ---------------------------------------------------------
+    # Query helpers
+    # ---------------------------------------------------------
+    def query(self, sql, params=()):
+        """Run any SQL against the mirror and return a DataFrame"""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def po_internal_ids(self, po_numbers):
+        """PO# (tranid) -> Internal Id, e.g. for landed cost"""
+        po_numbers = list(po_numbers)
+        if not po_numbers:
+            return {}
+        rows = self.conn.execute(
+            f"SELECT tranid, id FROM purchase_orders WHERE tranid IN ({', '.join('?' for _ in po_numbers)})",
+            po_numbers
+        ).fetchall()
+        return dict(rows)
+
+    def po_lines(self, po_number=None, item=None, open_only=False):
+        """PO lines with header fields, optionally for one PO# / item, or only lines not fully received"""
+        sql = """
+            SELECT t.id AS "Internal Id", t.tranid AS "PO#", t.trandate, t.entity_name AS vendor,
+                   t.status_name, l.line, l.item_name AS item, l.quantity, l.quantity_received,
+                   l.rate, l.amount, l.location_name AS location, l.expectedreceiptdate
+            FROM purchase_orders t
+            JOIN transaction_lines l ON l.transaction_id = t.id
+            WHERE 1 = 1
+        """
+        params = []
+        if po_number:
+            sql += " AND t.tranid = ?"
+            params.append(po_number)
+        if item:
+            sql += " AND l.item_name = ?"
+            params.append(item)
+        if open_only:
+            sql += " AND COALESCE(l.quantity_received, 0) < l.quantity"
+        return self.query(sql + " ORDER BY t.id, l.line", params)
+
+    def receipts_for_po(self, po_number):
+        """Item receipt lines created from the PO"""
+        return self.query("""
+            SELECT r.id AS receipt_id, r.tranid AS receipt_number, r.trandate, l.item_name AS item,
+                   l.quantity, l.location_name AS location
+            FROM purchase_orders p
+            JOIN transaction_lines l ON l.createdfrom = p.id
+            JOIN item_receipts r ON r.id = l.transaction_id
+            WHERE p.tranid = ?
+            ORDER BY r.trandate, r.id, l.line
+        """, (po_number,))
+
+    def shipments_for_po(self, po_number):
+        """Inbound shipment items of a PO with their shipment status and dates"""
+        return self.query("""
+            SELECT s.shipmentnumber, s.status, s.billoflading, s.vesselnumber, s.expecteddeliverydate,
+                   s.actualdeliverydate, i.item_name AS item, i.quantity_expected, i.quantity_received, i.location
+            FROM inbound_shipment_items i
+            JOIN inbound_shipments s ON s.id = i.inbound_shipment_id
+            JOIN purchase_orders p ON p.id = i.purchase_order_id
+            WHERE p.tranid = ?
+            ORDER BY s.expecteddeliverydate, s.shipmentnumber
+        """, (po_number,))
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    print("="*70)
+    print("NetSuite Local Mirror Sync")
+    print("="*70 + "\n")
+
+    mirror = NetSuiteMirror(NETSUITE_CONFIG)
+    try:
+        mirror.sync()
+    finally:
+        mirror.close()
+    print(f"\n📁 Mirror: {MIRROR_DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import time
+import random
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from netsuite_automated_import import NETSUITE_CONFIG as IMPORT_CONFIG
+from netsuite_session import create_netsuite_session, rest_base_url
+
+# ========== CONFIGURATION ==========
+# Account and token credentials are shared with the CSV import (netsuite_automated_import.NETSUITE_CONFIG)
+NETSUITE_CONFIG = {
+    **{key: IMPORT_CONFIG[key] for key in ('ACCOUNT_ID', 'CONSUMER_KEY', 'CONSUMER_SECRET', 'TOKEN_ID', 'TOKEN_SECRET')},
+    # Concurrent request limit of the account (Setup > Integration > Integration Governance)
+    'CONCURRENCY_LIMIT': 5,
+    # Leave empty to use the vendor's primary subsidiary
+    'SUBSIDIARY_ID': ''
+}
+
+# Output of AHC_PO/PO_Upload_2.py
+PO_CSV_PATH = '/Users/yingji/Documents/python/vs_code/python_playground/AHC_PO/PO_Upload_Output_2.csv'
+
+# POs submitted per progress report
+BATCH_SIZE = 50
+MAX_RETRIES = 4
+
+# PO upload CSV column -> purchaseOrder field (add custom fields here, e.g. 'custbody_requested_ship_date')
+HEADER_FIELDS = {
+    'tranDate': 'Date',
+    'memo': 'Memo',
+}
+LINE_FIELDS = {
+    'quantity': 'BOX QTY',
+    'rate': 'UNIT COST_Orig',
+    'amount': 'Total Amount $',
+    'expectedReceiptDate': 'Exp Receipt Date',
+}
+
+
+def _json_value(value):
+    """numpy scalars -> Python values, NaN/blank -> None"""
+    if pd.isna(value) or (isinstance(value, str) and not value.strip()):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _ref(value):
+    """Record reference {"id": ...} from an internal id (None when unknown)"""
+    value = _json_value(value)
+    if value is None or value == 'Unknown':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return {'id': str(value)}
+
+
+class NetSuitePOCreator:
+    """Creates purchase orders through the REST record API, one upsert per External ID"""
+
+    def __init__(self, config, max_workers=None):
+        self.config = config
+        self.base_url = rest_base_url(config)
+        self.max_workers = max_workers or config.get('CONCURRENCY_LIMIT', 5)
+        self.session = create_netsuite_session(config, pool_size=self.max_workers)
+
+    def build_po_payloads(self, po_df):
+        """One purchaseOrder body per External ID from the PO upload rows"""
+        payloads = {}
+        for external_id, lines in po_df.groupby('External ID', sort=False):
+            first = lines.iloc[0]
+            payload = {
+                'entity': _ref(first['Vendor InternalID']),
+                'location': _ref(first['Location InternalID']),
+            }
+            if self.config.get('SUBSIDIARY_ID'):
+                payload['subsidiary'] = {'id': str(self.config['SUBSIDIARY_ID'])}
+            for field, column in HEADER_FIELDS.items():
+                if column in lines and _json_value(first[column]) is not None:
+                    payload[field] = _json_value(first[column])
+
+            items = []
+            for _, line in lines.iterrows():
+                item_line = {'item': _ref(line['Item InternalID'])}
+                for field, column in LINE_FIELDS.items():
+                    if column in lines and _json_value(line[column]) is not None:
+                        item_line[field] = _json_value(line[column])
+                items.append(item_line)
+            payload['item'] = {'items': items}
+            payloads[str(external_id)] = payload
+        return payloads
+
+    def upsert_purchase_order(self, external_id, payload):
+        """
+        PUT on purchaseOrder/eid:<External ID> creates the PO or updates the existing one,
+        so re-running a wave never duplicates POs. replace=item swaps the lines instead of appending.
+        External IDs carry the wave id (PO_Upload_2.build_po_upload), so only the same wave is updated.
+        """
+        url = f"{self.base_url}/services/rest/record/v1/purchaseOrder/eid:{external_id}"
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self.session.put(url, params={'replace': 'item'}, json=payload, timeout=120)
+            except Exception as e:
+                error = str(e)
+            else:
+                if response.status_code in [200, 204]:
+                    location_header = response.headers.get('Location', '')
+                    return {'externalId': external_id, 'success': True,
+                            'id': location_header.split('/')[-1] if location_header else None}
+                error = f"{response.status_code}: {response.text}"
+                # Only throttling / server errors are worth another try
+                if response.status_code != 429 and 'CONCURRENCY_LIMIT_EXCEEDED' not in response.text \
+                        and response.status_code < 500:
+                    break
+            if attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt + random.random())
+
+        return {'externalId': external_id, 'success': False, 'error': error}
+
+    def create_purchase_orders(self, po_df):
+        """Upserts every PO of the upload rows, up to max_workers at a time, and returns one result per External ID"""
+        payloads = self.build_po_payloads(po_df)
+        external_ids = list(payloads)
+        results = []
+
+        print(f"📤 Creating {len(external_ids)} purchase orders ({self.max_workers} concurrent requests)...\n")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for start in range(0, len(external_ids), BATCH_SIZE):
+                batch = external_ids[start:start + BATCH_SIZE]
+                futures = [executor.submit(self.upsert_purchase_order, eid, payloads[eid]) for eid in batch]
+                batch_results = [future.result() for future in as_completed(futures)]
+                results.extend(batch_results)
+
+                failed = [r for r in batch_results if not r['success']]
+                print(f"   Batch {start // BATCH_SIZE + 1}: {len(batch) - len(failed)}/{len(batch)} POs created")
+                for result in failed:
+                    print(f"   ❌ {result['externalId']}: {result['error']}")
+
+        order = {eid: i for i, eid in enumerate(external_ids)}
+        results.sort(key=lambda r: order[r['externalId']])
+        return results
+
+
+def main():
+    print("="*70)
+    print("NetSuite PO Creation (REST record API)")
+    print("="*70 + "\n")
+
+    po_df = pd.read_csv(PO_CSV_PATH, dtype={'External ID': str})
+    creator = NetSuitePOCreator(NETSUITE_CONFIG)
+    results = creator.create_purchase_orders(po_df)
+
+    created = sum(r['success'] for r in results)
+    print(f"\n✅ {created}/{len(results)} purchase orders created or updated")
+    if created < len(results):
+        print("❌ Failed External IDs (safe to re-run, existing POs are updated):")
+        for result in results:
+            if not result['success']:
+                print(f"   - {result['externalId']}")
+
+
+if __name__ == "__main__":
+    main()
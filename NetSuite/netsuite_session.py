@@ -0,0 +1,226 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _quote(value):
+    return urllib.parse.quote(str(value), safe='')
+
+
+class NetSuiteAuth(requests.auth.AuthBase):
+    """
+    OAuth 1.0 (TBA, HMAC-SHA256) signing for NetSuite REST / RESTlet calls.
+
+    The signing key, the HMAC object and the percent-encoded static oauth params are built once;
+    each request only encodes its URL, timestamp and nonce and signs a .copy() of the keyed HMAC.
+    Works as a requests auth (session.auth = NetSuiteAuth(...)) or through header(url, method).
+    """
+
+    def __init__(self, consumer_key, consumer_secret, token_id, token_secret, realm):
+        self.realm = realm
+        signing_key = f"{_quote(consumer_secret)}&{_quote(token_secret)}"
+        self._hmac = hmac.new(signing_key.encode('utf-8'), digestmod=hashlib.sha256)
+        self._static_params = [
+            ('oauth_consumer_key', _quote(consumer_key)),
+            ('oauth_token', _quote(token_id)),
+            ('oauth_signature_method', 'HMAC-SHA256'),
+            ('oauth_version', '1.0'),
+        ]
+        self._header_prefix = (
+            f'OAuth realm="{realm}",'
+            f'oauth_consumer_key="{_quote(consumer_key)}",'
+            f'oauth_token="{_quote(token_id)}",'
+            f'oauth_signature_method="HMAC-SHA256",'
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['CONSUMER_KEY'], config['CONSUMER_SECRET'],
+            config['TOKEN_ID'], config['TOKEN_SECRET'],
+            realm=config['ACCOUNT_ID'].replace('-', '_').upper()
+        )
+
+    def sign(self, method, url, timestamp, nonce):
+        """Base64 HMAC-SHA256 signature of the request (query string params included)"""
+        parsed_url = urllib.parse.urlsplit(url)
+        base_url = f"{parsed_url.scheme.lower()}://{parsed_url.netloc.lower()}{parsed_url.path}"
+
+        params = self._static_params + [('oauth_timestamp', timestamp), ('oauth_nonce', nonce)]
+        params += [(_quote(k), _quote(v)) for k, v in urllib.parse.parse_qsl(parsed_url.query, keep_blank_values=True)]
+        param_string = '&'.join(f"{k}={v}" for k, v in sorted(params))
+
+        signature_base = f"{method.upper()}&{_quote(base_url)}&{_quote(param_string)}"
+        signer = self._hmac.copy()
+        signer.update(signature_base.encode('utf-8'))
+        return base64.b64encode(signer.digest()).decode('utf-8')
+
+    def header(self, url, method='GET'):
+        """Authorization header value for one request"""
+        timestamp = str(int(time.time()))
+        nonce = secrets.token_hex(8)
+        signature = self.sign(method, url, timestamp, nonce)
+        return (
+            f'{self._header_prefix}'
+            f'oauth_timestamp="{timestamp}",'
+            f'oauth_nonce="{nonce}",'
+            f'oauth_version="1.0",'
+            f'oauth_signature="{_quote(signature)}"'
+        )
+
+    def __call__(self, r):
+        r.headers['Authorization'] = self.header(r.url, r.method)
+        return r
+
+
+def rest_base_url(config):
+    """SuiteTalk REST base URL for the account (REST_BASE_URL in the config overrides it, e.g. for a mock server)"""
+    if config.get('REST_BASE_URL'):
+        return config['REST_BASE_URL'].rstrip('/')
+    account_formatted = config['ACCOUNT_ID'].lower().replace('_', '-')
+    return f"https://{account_formatted}.suitetalk.api.netsuite.com"
+
+
+def create_netsuite_session(config, pool_size=10):
+    """
+    Persistent session signed with the config's token-based auth credentials (NetSuiteAuth).
+    The connection pool holds pool_size keep-alive connections so worker threads can share it.
+    """
+    session = requests.Session()
+    session.auth = NetSuiteAuth.from_config(config)
+    session.headers.update({'Accept': 'application/json'})
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def run_suiteql(session, base_url, query, page_size=1000, debug=False):
+    """Run a SuiteQL query and return all rows, following hasMore with offset paging (max 1000 rows/page)"""
+    endpoint_url = f"{base_url}/services/rest/query/v1/suiteql"
+    page_size = min(page_size, 1000)
+    rows = []
+    offset = 0
+
+    while True:
+        response = session.post(
+            endpoint_url,
+            headers={'Prefer': 'transient', 'Content-Type': 'application/json'},
+            params={'limit': page_size, 'offset': offset},
+            json={'q': query}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        for row in data.get('items', []):
+            row.pop('links', None)
+            rows.append(row)
+
+        if debug:
+            print(f"SuiteQL page offset {offset}: {len(data.get('items', []))} rows (total {data.get('totalResults', '?')})")
+
+        if not data.get('hasMore'):
+            return rows
+        offset += page_size
+
+
+# Last successful auth per account + token, shared by all scripts on this machine
+HEALTH_CACHE_PATH = os.path.expanduser('~/.netsuite_connection_health.json')
+HEALTH_TTL = 15 * 60
+
+
+class ConnectionHealth:
+    """
+    Remembers when the config's account/token last authenticated successfully, so workflows can skip
+    their connection test while that is fresher than ttl seconds. attach() makes a session re-probe and
+    retry a request once when it fails with 401 (expired/revoked token, stale cache entry).
+    """
+
+    _probing = threading.local()
+
+    def __init__(self, config, path=HEALTH_CACHE_PATH, ttl=HEALTH_TTL):
+        self.key = hashlib.sha256(f"{config['ACCOUNT_ID']}:{config['TOKEN_ID']}".encode('utf-8')).hexdigest()[:16]
+        self.path = path
+        self.ttl = ttl
+        self.marked_at = 0
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # the cache is only an optimization
+
+    def is_fresh(self):
+        return time.time() - self._load().get(self.key, 0) < self.ttl
+
+    def mark_ok(self):
+        self.marked_at = time.time()
+        entries = self._load()
+        entries[self.key] = time.time()
+        self._save(entries)
+
+    def invalidate(self):
+        entries = self._load()
+        if entries.pop(self.key, None) is not None:
+            self._save(entries)
+
+    def probe(self, test_connection):
+        """Runs the real connection test (bypassing the cache) and records a success"""
+        self._probing.active = True
+        try:
+            ok = test_connection()
+        finally:
+            self._probing.active = False
+        if ok:
+            self.mark_ok()
+        else:
+            self.invalidate()
+        return ok
+
+    def ensure(self, test_connection):
+        """True when the connection is known good within ttl, otherwise runs test_connection"""
+        if self.is_fresh():
+            print("✅ Connection verified recently, skipping connection test\n")
+            return True
+        return self.probe(test_connection)
+
+    def attach(self, session, test_connection):
+        """
+        Successful responses keep the cache entry fresh; on a 401 response the connection is probed and,
+        if it is healthy, the request is resent once (re-signed).
+        """
+        def retry_on_auth_error(response, **kwargs):
+            request = response.request
+            if response.ok and time.time() - self.marked_at > self.ttl / 4:
+                self.mark_ok()
+            if response.status_code != 401 or getattr(request, 'auth_retried', False) \
+                    or getattr(self._probing, 'active', False):
+                return response
+            print("⚠️  Authentication error, re-testing connection...")
+            if not self.probe(test_connection):
+                return response
+            retry = request.copy()
+            retry.auth_retried = True
+            session.auth(retry)
+            return session.send(retry, **kwargs)
+
+        session.hooks['response'].append(retry_on_auth_error)
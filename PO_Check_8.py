@@ -3,7 +3,14 @@ import numpy as np
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import logging
-from typing import Any, List, Tuple
+import numbers
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from gspread.utils import numericise_all, rowcol_to_a1
+
+from token_bucket import TokenBucket
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -20,11 +27,61 @@ SHEET_NAMES = {
     'detail': 'PO leftover detail',
     'summary': 'Inventory Summary'
 }
+# Status -> Inventory Summary column; statuses that map to the same column are summed together
+STATUS_BUCKETS = {
+    'In Transit': 'In Transit Quantity',
+    'To Be Shipped': 'Unshipped Quantity',
+    'NA': 'Unshipped Quantity'
+}
+# Inbound column -> Shipping view column, and the column order of the Shipping views
+SHIPPING_COLUMNS_MAPPING = {
+    "Internal Id": "Internal Id", "Status": "Status", "PO#": "PO#", "Supplier Name": "Supplier Name",
+    "Location": "Location", "Item": "Item", "Quantity on Shipments": "Quantity",
+    "Total Cases-Line": "Total Cases", "N.W.-Line": "Net Weight", "G.W.-Line": "Gross Weight",
+    "CBM-Line": "CBM", "Item Rate": "Item Rate", "Item Amount": "Item Amount", "MBL#": "MBL#",
+    "Container#": "Container#", "ETD": "ETD"
+}
+SHIPPING_COLUMN_ORDER = ["Internal Id", "Status", "PO#", "Supplier Name", "Location", "Item",
+                         "Quantity", "Total Cases", "Net Weight", "Gross Weight", "CBM",
+                         "Item Rate", "Item Amount", "MBL#", "AMS#", "Container#", "ETD"]
+# Supplier views: each gets "<name> Shipping" and "<name> PO" in the source workbook, copied to
+# target_workbook when set. match selects shipments with "any" or "only" rows of the supplier;
+# preserve_ams keeps AMS# entered by hand in the target Shipping sheet.
+SUPPLIER_VIEWS = [
+    {'name': 'Yanada', 'supplier': 'SUNNER GROUP CO., LTD.', 'match': 'any',
+     'target_workbook': YANADA_TARGET_WORKBOOK, 'preserve_ams': False},
+    {'name': 'AHC', 'supplier': 'American Hygienics Corporation', 'match': 'only',
+     'target_workbook': AHC_TARGET_WORKBOOK, 'preserve_ams': True},
+    {'name': 'Tianjin Yiyi', 'supplier': 'Tianjin Yiyi Hygiene Products Co., Ltd.', 'match': 'any',
+     'target_workbook': None, 'preserve_ams': False},
+    {'name': 'Thai Duong', 'supplier': 'Thai Duong Rubber Joint Stock Company', 'match': 'any',
+     'target_workbook': None, 'preserve_ams': False},
+    {'name': 'Delon', 'supplier': 'DELON LAB. (1990) INC', 'match': 'any',
+     'target_workbook': None, 'preserve_ams': False},
+]
+# Above this share of changed cells a sheet is rewritten as one range instead of cell-level diffs
+FULL_REWRITE_RATIO = 0.5
+# Publishing: worksheets written in parallel and the per-user Sheets quota (requests per minute),
+# charged per API call made by the publish workers
+PUBLISH_WORKERS = 4
+SHEETS_REQUESTS_PER_MINUTE = 60
 
-def authenticate_google_sheets(credential_file: str, scope: List[str]) -> Any:
-    """Authenticates with Google Sheets API using a service account."""
+def authenticate_google_sheets(credential_file: str, scope: List[str], limiter: Optional["TokenBucket"] = None) -> Any:
+    """
+    Authenticates with Google Sheets API using a service account.
+    With a limiter, every API request the client sends first takes one token from it.
+    """
     credentials = ServiceAccountCredentials.from_json_keyfile_name(credential_file, scope)
     client = gspread.authorize(credentials)
+    if limiter is not None:
+        # gspread 6 sends through client.http_client, older versions through client.request
+        http = getattr(client, 'http_client', client)
+        send = http.request
+
+        def throttled_request(*args, **kwargs):
+            limiter.acquire()
+            return send(*args, **kwargs)
+        http.request = throttled_request
     logging.info("Authenticated with Google Sheets API.")
     return client
 
@@ -156,107 +213,167 @@ def sort_detail_dataframe(df_detail: pd.DataFrame) -> pd.DataFrame:
     df_sorted.drop(columns=["original_order"], inplace=True)
     return df_sorted
 
-def build_summary_dataframe(df_detail: pd.DataFrame) -> pd.DataFrame:
+def build_summary_dataframe(df_detail: pd.DataFrame, extra_statuses: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Constructs the summary DataFrame for 'Inventory Summary' by aggregating detail data.
     Aggregation is on: Supplier Name, Location, and Item.
+    
+    Each Status is mapped to a bucket column (STATUS_BUCKETS); every status in extra_statuses
+    (e.g. "At Port") gets its own "<status> Quantity" column. All buckets add up to Total on Order Quantity.
     """
     group_cols = ["Supplier Name", "Location", "Item"]
-    def in_transit_qty(group: pd.DataFrame) -> float:
-        return group.loc[group["Status"] == "In Transit", "Unshipped Quantity"].sum()
-    def unshipped_qty(group: pd.DataFrame) -> float:
-        return group.loc[group["Status"].isin(["To Be Shipped", "NA"]), "Unshipped Quantity"].sum()
-    df_summary = df_detail.groupby(group_cols).apply(lambda g: pd.Series({
-        "In Transit Quantity": in_transit_qty(g),
-        "Unshipped Quantity": unshipped_qty(g)
-    })).reset_index()
-    df_summary["Total on Order Quantity"] = df_summary["In Transit Quantity"] + df_summary["Unshipped Quantity"]
+    buckets = dict(STATUS_BUCKETS)
+    for status in extra_statuses or []:
+        buckets[status] = f"{status} Quantity"
+    bucket_cols = list(dict.fromkeys(buckets.values()))
+    df = df_detail[group_cols].copy()
+    bucket = df_detail["Status"].map(buckets)
+    for col in bucket_cols:
+        df[col] = df_detail["Unshipped Quantity"].where(bucket == col, 0)
+    df_summary = df.groupby(group_cols)[bucket_cols].sum().reset_index()
+    df_summary["Total on Order Quantity"] = df_summary[bucket_cols].sum(axis=1)
     logging.info("Built summary DataFrame for Inventory Summary.")
     return df_summary
 
-def build_yanada_shipping_dataframe(df_inbound: pd.DataFrame) -> pd.DataFrame:
+def build_supplier_shipping_dataframe(df_inbound: pd.DataFrame, supplier: str, match: str = "any") -> pd.DataFrame:
     """
-    Constructs the Yanada Shipping DataFrame from inbound data.
-    Selects groups (by Internal Id) where at least one row has Supplier Name "SUNNER GROUP CO., LTD.".
+    Constructs a supplier's Shipping DataFrame from inbound data.
+    Selects every row of the shipments (by Internal Id) that belong to the supplier:
+      - match="any":  at least one row of the shipment has the supplier's name,
+      - match="only": every row of the shipment has the supplier's name.
     Renames required columns and adds a blank 'AMS#'.
     """
-    groups = df_inbound.groupby("Internal Id")
-    list_dfs = [group for id_val, group in groups if (group["Supplier Name"] == "SUNNER GROUP CO., LTD.").any()]
-    df_yanada = pd.concat(list_dfs) if list_dfs else pd.DataFrame()
-    columns_mapping = {
-        "Internal Id": "Internal Id", "Status": "Status", "PO#": "PO#", "Supplier Name": "Supplier Name",
-        "Location": "Location", "Item": "Item", "Quantity on Shipments": "Quantity",
-        "Total Cases-Line": "Total Cases", "N.W.-Line": "Net Weight", "G.W.-Line": "Gross Weight",
-        "CBM-Line": "CBM", "Item Rate": "Item Rate", "Item Amount": "Item Amount", "MBL#": "MBL#",
-        "Container#": "Container#", "ETD": "ETD"
-    }
-    cols_to_keep = [col for col in columns_mapping if col in df_yanada.columns]
-    df_yanada = df_yanada[cols_to_keep].copy()
-    df_yanada.rename(columns=columns_mapping, inplace=True)
-    df_yanada["AMS#"] = ""
-    desired_order = ["Internal Id", "Status", "PO#", "Supplier Name", "Location", "Item",
-                     "Quantity", "Total Cases", "Net Weight", "Gross Weight", "CBM",
-                     "Item Rate", "Item Amount", "MBL#", "AMS#", "Container#", "ETD"]
-    df_yanada = df_yanada[[col for col in desired_order if col in df_yanada.columns]]
-    return df_yanada
+    is_supplier = df_inbound["Supplier Name"] == supplier
+    per_shipment = is_supplier.groupby(df_inbound["Internal Id"]).transform("all" if match == "only" else "any")
+    keep = per_shipment.fillna(False).astype(bool)
+    df_supplier = df_inbound[keep].sort_values("Internal Id", kind="stable")
+    cols_to_keep = [col for col in SHIPPING_COLUMNS_MAPPING if col in df_supplier.columns]
+    df_supplier = df_supplier[cols_to_keep].rename(columns=SHIPPING_COLUMNS_MAPPING)
+    df_supplier["AMS#"] = ""
+    df_supplier = df_supplier[[col for col in SHIPPING_COLUMN_ORDER if col in df_supplier.columns]]
+    return df_supplier
 
-def build_ahc_shipping_dataframe(df_inbound: pd.DataFrame) -> pd.DataFrame:
+def build_supplier_po_dataframe(df_po_original: pd.DataFrame, supplier: str) -> pd.DataFrame:
     """
-    Constructs the AHC Shipping DataFrame from inbound data.
-    Selects groups (by Internal Id) where the unique Supplier Name is "American Hygienics Corporation".
-    Renames required columns and adds a blank 'AMS#'.
+    Filters the raw "Purchase Orders Tracking" rows where Supplier Name is exactly the given supplier.
+    The output DataFrame retains the original sheet's format.
     """
-    groups = df_inbound.groupby("Internal Id")
-    list_dfs = [group for id_val, group in groups if set(group["Supplier Name"].unique()) == {"American Hygienics Corporation"}]
-    df_ahc = pd.concat(list_dfs) if list_dfs else pd.DataFrame()
-    columns_mapping = {
-        "Internal Id": "Internal Id", "Status": "Status", "PO#": "PO#", "Supplier Name": "Supplier Name",
-        "Location": "Location", "Item": "Item", "Quantity on Shipments": "Quantity",
-        "Total Cases-Line": "Total Cases", "N.W.-Line": "Net Weight", "G.W.-Line": "Gross Weight",
-        "CBM-Line": "CBM", "Item Rate": "Item Rate", "Item Amount": "Item Amount", "MBL#": "MBL#",
-        "Container#": "Container#", "ETD": "ETD"
-    }
-    cols_to_keep = [col for col in columns_mapping if col in df_ahc.columns]
-    df_ahc = df_ahc[cols_to_keep].copy()
-    df_ahc.rename(columns=columns_mapping, inplace=True)
-    df_ahc["AMS#"] = ""
-    desired_order = ["Internal Id", "Status", "PO#", "Supplier Name", "Location", "Item",
-                     "Quantity", "Total Cases", "Net Weight", "Gross Weight", "CBM",
-                     "Item Rate", "Item Amount", "MBL#", "AMS#", "Container#", "ETD"]
-    df_ahc = df_ahc[[col for col in desired_order if col in df_ahc.columns]]
-    return df_ahc
+    supplier_names = df_po_original["Supplier Name"].astype(str).str.strip()
+    df_supplier_po = df_po_original[supplier_names == supplier].copy()
+    df_supplier_po["Supplier Name"] = supplier_names[supplier_names == supplier]
+    return df_supplier_po
 
-def build_yanada_po_dataframe(po_sheet: Any) -> pd.DataFrame:
+def sanitize_for_sheet(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Reads data from "Purchase Orders Tracking" and filters rows where Supplier Name is "SUNNER GROUP CO., LTD.".
-    The output DataFrame retains the original sheet's format.
+    Replaces float NaN and infinite values with "NA" so the DataFrame can be serialized to a worksheet.
+    Works column-wise: float columns are checked with one isfinite call, object and text columns cell
+    by cell for float NaN/inf only (None, pd.NA and every other value are written unchanged).
+    Only columns that contain such a value are rewritten, so their other cells keep their types.
     """
-    df_po_original = pd.DataFrame(po_sheet.get_all_records())
-    df_po_original["Supplier Name"] = df_po_original["Supplier Name"].astype(str).str.strip()
-    df_yanada_po = df_po_original[df_po_original["Supplier Name"] == "SUNNER GROUP CO., LTD."]
-    return df_yanada_po
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind == "f":
+            bad = ~np.isfinite(values.to_numpy(dtype=float, na_value=np.nan))
+        elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            bad = np.fromiter((isinstance(x, float) and not np.isfinite(x) for x in values), dtype=bool, count=len(values))
+        else:
+            continue
+        if bad.any():
+            df[col] = values.astype(object).where(~bad, "NA")
+    return df
+
+def _cell_matches(old: str, new: Any) -> bool:
+    """Compares a value read back from the sheet (always a string) with a value about to be written."""
+    if new is None:
+        return old == ""
+    if isinstance(new, bool):
+        return old.upper() == str(new).upper()
+    if isinstance(new, numbers.Number):
+        try:
+            return float(old.replace(",", "")) == float(new)
+        except ValueError:
+            return False
+    return old == str(new)
 
-def build_ahc_po_dataframe(po_sheet: Any) -> pd.DataFrame:
+def diff_sheet_values(existing: List[List[str]], new_values: List[List[Any]],
+                      max_cols: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, int]:
     """
-    Reads data from "Purchase Orders Tracking" and filters rows where Supplier Name is exactly "American Hygienics Corporation".
-    The output DataFrame retains the original sheet's format.
+    Computes the ranges needed to turn the current sheet values into new_values.
+    
+    - Each changed row contributes one range spanning its first to last changed cell.
+    - Rows/columns present in the sheet but not in new_values are blanked out.
+    - Only the first max_cols columns are considered when max_cols is given.
+    Returns (batch_update ranges, changed cell count, total cell count).
+    """
+    if max_cols is not None:
+        existing = [row[:max_cols] for row in existing]
+        new_values = [row[:max_cols] for row in new_values]
+    n_rows = max(len(existing), len(new_values))
+    n_cols = max([len(row) for row in existing + new_values] or [0])
+    ranges = []
+    changed_cells = 0
+    for r in range(n_rows):
+        old_row = existing[r] if r < len(existing) else []
+        new_row = new_values[r] if r < len(new_values) else []
+        old_row = list(old_row) + [""] * (n_cols - len(old_row))
+        new_row = list(new_row) + [""] * (n_cols - len(new_row))
+        changed = [c for c in range(n_cols) if not _cell_matches(old_row[c], new_row[c])]
+        if not changed:
+            continue
+        changed_cells += len(changed)
+        first, last = changed[0], changed[-1]
+        ranges.append({
+            "range": f"{rowcol_to_a1(r + 1, first + 1)}:{rowcol_to_a1(r + 1, last + 1)}",
+            "values": [new_row[first:last + 1]]
+        })
+    return ranges, changed_cells, n_rows * n_cols
+
+def sync_google_sheet(sheet: Any, df: pd.DataFrame, existing_values: Optional[List[List[str]]] = None,
+                      max_cols: Optional[int] = None, full_rewrite_ratio: float = FULL_REWRITE_RATIO) -> bool:
+    """
+    Writes a DataFrame to a worksheet by sending only the cells that differ from the current content.
+    
+    - Reads the current values (unless existing_values is passed in) and diffs them against the DataFrame.
+    - All changed ranges go out in a single batch_update; the sheet is never cleared first.
+    - When more than full_rewrite_ratio of the cells changed, the whole grid is sent as one range instead.
+    - Returns True when a batch_update was sent, False when the sheet already matched.
     """
-    df_po_original = pd.DataFrame(po_sheet.get_all_records())
-    df_po_original["Supplier Name"] = df_po_original["Supplier Name"].astype(str).str.strip()
-    df_ahc_po = df_po_original[df_po_original["Supplier Name"] == "American Hygienics Corporation"]
-    return df_ahc_po
+    if existing_values is None:
+        existing_values = sheet.get_all_values()
+    new_values = [df.columns.tolist()] + df.values.tolist()
+    if len(new_values) > sheet.row_count:
+        sheet.add_rows(len(new_values) - sheet.row_count)
+    if len(new_values[0]) > sheet.col_count:
+        sheet.add_cols(len(new_values[0]) - sheet.col_count)
+    ranges, changed_cells, total_cells = diff_sheet_values(existing_values, new_values, max_cols)
+    if not ranges:
+        logging.info(f"Worksheet '{sheet.title}' is unchanged, nothing to write.")
+        return False
+    if total_cells and changed_cells / total_cells > full_rewrite_ratio:
+        n_cols = max(len(row) for row in existing_values + new_values)
+        if max_cols is not None:
+            n_cols = min(n_cols, max_cols)
+        n_rows = max(len(existing_values), len(new_values))
+        grid = []
+        for r in range(n_rows):
+            row = list(new_values[r][:n_cols]) if r < len(new_values) else []
+            grid.append(row + [""] * (n_cols - len(row)))
+        ranges = [{"range": f"A1:{rowcol_to_a1(n_rows, n_cols)}", "values": grid}]
+        logging.info(f"Rewriting worksheet '{sheet.title}': {changed_cells}/{total_cells} cells changed.")
+    else:
+        logging.info(f"Patching worksheet '{sheet.title}': {changed_cells}/{total_cells} cells in {len(ranges)} ranges.")
+    sheet.batch_update(ranges)
+    return True
 
 def update_google_sheet(sheet: Any, df: pd.DataFrame) -> None:
     """
-    Clears existing content in a worksheet and updates it with new data from a DataFrame.
+    Syncs a worksheet with new data from a DataFrame, writing only the cells that changed.
     Sanitizes the DataFrame by converting NaN or infinite values to "NA".
     """
-    df = df.applymap(lambda x: "NA" if (isinstance(x, float) and (np.isnan(x) or np.isinf(x))) else x)
-    sheet.clear()
-    headers = df.columns.tolist()
-    data = df.values.tolist()
-    sheet.update([headers] + data)
-    logging.info(f"Updated worksheet '{sheet.title}' with {len(data)} rows.")
+    df = sanitize_for_sheet(df)
+    if sync_google_sheet(sheet, df):
+        logging.info(f"Updated worksheet '{sheet.title}' with {len(df)} rows.")
 
 def update_shipping_sheet(sheet: Any, new_df: pd.DataFrame) -> None:
     """
@@ -266,23 +383,19 @@ def update_shipping_sheet(sheet: Any, new_df: pd.DataFrame) -> None:
     - Preserves all columns after column Q
     """
     try:
-        existing_data = sheet.get_all_records()
         existing_values = sheet.get_all_values()
     except Exception as e:
         logging.error(f"Failed to get existing data: {e}")
-        existing_data = []
         existing_values = []
 
-    if existing_data:
-        df_existing = pd.DataFrame(existing_data)
-        # Create DataFrame with all columns including headers
-        df_full = pd.DataFrame(existing_values)
-        
-        # If there's data, get columns after Q (index 16)
-        additional_cols = df_full.iloc[:, 17:] if df_full.shape[1] > 17 else pd.DataFrame()
-    else:
-        df_existing = pd.DataFrame()
-        additional_cols = pd.DataFrame()
+    # Records as get_all_records would return them, built from the same single read
+    existing_data = []
+    if len(existing_values) > 1:
+        header = existing_values[0]
+        existing_data = [dict(zip(header, numericise_all(row + [""] * (len(header) - len(row)))))
+                         for row in existing_values[1:]]
+
+    df_existing = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
 
     # Handle AMS# preservation logic
     key_cols = ["Internal Id", "PO#", "Supplier Name", "Item"]
@@ -290,42 +403,68 @@ def update_shipping_sheet(sheet: Any, new_df: pd.DataFrame) -> None:
         df_existing = df_existing.drop_duplicates(subset=key_cols)
         df_merge = pd.merge(new_df, df_existing[key_cols + ["AMS#"]],
                           on=key_cols, how="left", suffixes=("", "_old"))
-        df_merge["AMS#"] = df_merge.apply(
-            lambda row: row["AMS#_old"] if (row["AMS#"] == "" or pd.isna(row["AMS#"])) and pd.notna(row["AMS#_old"])
-            else row["AMS#"],
-            axis=1
-        )
+        ams_blank = df_merge["AMS#"].isna() | (df_merge["AMS#"] == "")
+        df_merge["AMS#"] = df_merge["AMS#"].mask(ams_blank & df_merge["AMS#_old"].notna(), df_merge["AMS#_old"])
         df_merge.drop(columns=["AMS#_old"], inplace=True)
         new_df = df_merge
 
-    # Sanitize the data
-    new_df = new_df.applymap(lambda x: "NA" if (isinstance(x, float) and (np.isnan(x) or np.isinf(x))) else x)
+    new_df = sanitize_for_sheet(new_df)
 
-    # Prepare the update data
-    headers = new_df.columns.tolist()
-    data = new_df.values.tolist()
-    update_data = [headers] + data
+    # Diff columns A through Q against the current sheet; columns after Q are never touched
+    if sync_google_sheet(sheet, new_df, existing_values=existing_values, max_cols=17):
+        logging.info(f"Updated shipping worksheet '{sheet.title}' columns A-Q with {len(new_df)} rows.")
 
-    # If there are additional columns, append them to the update data
-    if not additional_cols.empty:
-        # Skip the header row from additional_cols as we already have headers
-        additional_data = additional_cols.iloc[1:].values.tolist()
-        
-        # Extend each row with the additional columns
-        for i in range(len(update_data)):
-            if i < len(additional_data):
-                update_data[i].extend(additional_data[i])
-            else:
-                # If new_df has more rows than existing data, pad with empty strings
-                update_data[i].extend([''] * additional_cols.shape[1])
-
-    # Update only the range needed (A1:Q{last_row})
-    num_rows = len(update_data)
-    range_name = f'A1:Q{num_rows}'
-    sheet.batch_clear([range_name])
-    sheet.update(range_name, [row[:17] for row in update_data])  # Only update first 17 columns
+def publish_worksheets(jobs: List[Tuple[Any, str, pd.DataFrame, Callable[[Any, pd.DataFrame], None]]],
+                       max_workers: int = PUBLISH_WORKERS,
+                       requests_per_minute: int = SHEETS_REQUESTS_PER_MINUTE,
+                       credential_file: str = CREDENTIAL_FILE, scope: List[str] = SCOPE) -> Dict[str, float]:
+    """
+    Publishes independent worksheets concurrently.
     
-    logging.info(f"Updated shipping worksheet '{sheet.title}' columns A-Q with {len(data)} rows.")
+    - jobs: (workbook, sheet title, DataFrame, writer) tuples; writer is update_google_sheet or update_shipping_sheet.
+    - Up to max_workers worksheets are written at once. Each worker thread authorizes its own client and
+      reopens the workbooks by key; all their API calls share one token bucket that keeps the total
+      under requests_per_minute.
+    - Returns seconds spent per "<workbook>/<sheet>" and logs the timings. Raises RuntimeError after
+      all jobs have run if any of them failed.
+    """
+    limiter = TokenBucket(rate=requests_per_minute / 60.0, capacity=max_workers)
+    worker = threading.local()
+
+    def worker_workbook(workbook: Any) -> Any:
+        if not hasattr(worker, 'client'):
+            worker.client = authenticate_google_sheets(credential_file, scope, limiter)
+            worker.workbooks = {}
+        if workbook.id not in worker.workbooks:
+            worker.workbooks[workbook.id] = worker.client.open_by_key(workbook.id)
+        return worker.workbooks[workbook.id]
+
+    def run_job(workbook: Any, sheet_title: str, df: pd.DataFrame,
+                writer: Callable[[Any, pd.DataFrame], None]) -> float:
+        start = time.perf_counter()
+        writer(get_or_create_worksheet(worker_workbook(workbook), sheet_title), df)
+        return time.perf_counter() - start
+
+    timings = {}
+    failures = []
+    publish_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_job, *job): f"{job[0].title}/{job[1]}" for job in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                timings[name] = future.result()
+            except Exception as e:
+                logging.error(f"Failed to publish '{name}': {e}")
+                failures.append(name)
+    total = time.perf_counter() - publish_start
+    for name, seconds in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+        logging.info(f"  {name}: {seconds:.1f}s")
+    logging.info(f"Published {len(timings)}/{len(jobs)} worksheets in {total:.1f}s "
+                 f"(sum of sheets {sum(timings.values()):.1f}s).")
+    if failures:
+        raise RuntimeError(f"Failed to publish worksheets: {failures}")
+    return timings
 
 def main() -> None:
     client = authenticate_google_sheets(CREDENTIAL_FILE, SCOPE)
@@ -345,46 +484,32 @@ def main() -> None:
     df_detail_sorted = sort_detail_dataframe(df_detail)
     df_summary = build_summary_dataframe(df_detail_sorted)
     
-    # Build shipping and PO worksheets data from source "PO check"
-    df_yanada_shipping = build_yanada_shipping_dataframe(df_inbound)
-    df_ahc_shipping = build_ahc_shipping_dataframe(df_inbound)
-    df_yanada_po = build_yanada_po_dataframe(po_ws)
-    df_ahc_po = build_ahc_po_dataframe(po_ws)
-    
-     # Update the six worksheets in the source workbook ("PO check")
-    detail_sheet = get_or_create_worksheet(source_wb, SHEET_NAMES['detail'])
-    summary_sheet = get_or_create_worksheet(source_wb, SHEET_NAMES['summary'])
-    yanada_shipping_sheet = get_or_create_worksheet(source_wb, "Yanada Shipping")
-    yanada_po_sheet = get_or_create_worksheet(source_wb, "Yanada PO")
-    ahc_shipping_sheet = get_or_create_worksheet(source_wb, "AHC Shipping")
-    ahc_po_sheet = get_or_create_worksheet(source_wb, "AHC PO")
-    
-    update_google_sheet(detail_sheet, df_detail_sorted)
-    update_google_sheet(summary_sheet, df_summary)
-    update_google_sheet(yanada_shipping_sheet, df_yanada_shipping) 
-    update_google_sheet(yanada_po_sheet, df_yanada_po)
-    update_google_sheet(ahc_shipping_sheet, df_ahc_shipping) 
-    update_google_sheet(ahc_po_sheet, df_ahc_po)
-    
-    # Now update target workbooks:
-    # "Yanada POs" gets data from source "Yanada Shipping" and "Yanada PO"
-    # "AHC POs" gets data from source "AHC Shipping" and "AHC PO"
-    yanada_wb = client.open("Yanada POs")
-    ahc_wb = client.open("AHC POs")
-    
-    yanada_shipping_target = get_or_create_worksheet(yanada_wb, "Yanada Shipping")
-    yanada_po_target = get_or_create_worksheet(yanada_wb, "Yanada PO")
-    ahc_shipping_target = get_or_create_worksheet(ahc_wb, "AHC Shipping")
-    ahc_po_target = get_or_create_worksheet(ahc_wb, "AHC PO")
+    # "PO leftover detail" and "Inventory Summary" go to the source workbook ("PO check")
+    jobs = [
+        (source_wb, SHEET_NAMES['detail'], df_detail_sorted, update_google_sheet),
+        (source_wb, SHEET_NAMES['summary'], df_summary, update_google_sheet),
+    ]
     
-    # We can use update_google_sheet() to copy data from our DataFrames built above
-    update_google_sheet(yanada_shipping_target, df_yanada_shipping)
-    update_google_sheet(yanada_po_target, df_yanada_po)
-    update_shipping_sheet(ahc_shipping_target, df_ahc_shipping)
-    update_google_sheet(ahc_po_target, df_ahc_po)
+    # Shipping and PO views of every configured supplier, plus copies in the supplier's own workbook
+    df_po_original = pd.DataFrame(po_ws.get_all_records())
+    target_wbs = {}
+    for view in SUPPLIER_VIEWS:
+        name = view['name']
+        df_shipping = build_supplier_shipping_dataframe(df_inbound, view['supplier'], view['match'])
+        df_supplier_po = build_supplier_po_dataframe(df_po_original, view['supplier'])
+        jobs.append((source_wb, f"{name} Shipping", df_shipping, update_google_sheet))
+        jobs.append((source_wb, f"{name} PO", df_supplier_po, update_google_sheet))
+        
+        if view['target_workbook']:
+            if view['target_workbook'] not in target_wbs:
+                target_wbs[view['target_workbook']] = client.open(view['target_workbook'])
+            target_wb = target_wbs[view['target_workbook']]
+            shipping_writer = update_shipping_sheet if view['preserve_ams'] else update_google_sheet
+            jobs.append((target_wb, f"{name} Shipping", df_shipping, shipping_writer))
+            jobs.append((target_wb, f"{name} PO", df_supplier_po, update_google_sheet))
     
-    logging.info("Source workbook 'PO check' updated with 'PO leftover detail', 'Inventory Summary', 'Yanada Shipping', 'Yanada PO', 'AHC Shipping', and 'AHC PO'.")
-    logging.info("Target workbooks 'Yanada POs' and 'AHC POs' have been updated with the corresponding shipping and PO data.")
+    publish_worksheets(jobs)
+    logging.info(f"Source workbook '{SOURCE_WORKBOOK}' and target workbooks {list(target_wbs)} have been updated.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+# The scripts import their sibling modules directly (e.g. `from netsuite_session import ...`)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('AHC_PO', 'NetSuite', ''):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+
+class MockServer:
+    """
+    Local HTTP server for API tests. `respond(request)` returns (status, body[, headers]) for each
+    request dict {method, path, query, headers, json (JSON bodies only)}; every request is recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.respond = lambda request: (200, {})
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                request = {
+                    'method': self.command,
+                    'path': url.path,
+                    'query': {k: v[0] for k, v in parse_qs(url.query).items()},
+                    'headers': dict(self.headers),
+                    'json': json.loads(raw) if raw and 'json' in self.headers.get('Content-Type', '') else None,
+                }
+                with server.lock:
+                    server.requests.append(request)
+                status, body, *headers = server.respond(request)
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in (headers[0] if headers else {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def mock_server():
+    server = MockServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def netsuite_config(mock_server):
+    """Dummy TBA credentials pointed at the mock server"""
+    return {
+        'ACCOUNT_ID': '1234567_SB1',
+        'CONSUMER_KEY': 'ck', 'CONSUMER_SECRET': 'cs',
+        'TOKEN_ID': 'tk', 'TOKEN_SECRET': 'ts',
+        'REST_BASE_URL': mock_server.url,
+    }
@@ -0,0 +1,21 @@
+from Container_Building_SL_WP_1 import ITEMS_PER_CONTAINER, Container, PalletSpec
+
+
+def small_spec(item):
+    return PalletSpec(item, c_per_pal=1, units_per_carton=1, unit_weight=1.0, cbm_per_unit=0.001)
+
+
+def test_a_container_with_the_maximum_lines_takes_no_more_pallets():
+    container = Container('American Hygienics Corporation', 'Source NJ')
+    specs = [small_spec(f"ITEM{i}") for i in range(ITEMS_PER_CONTAINER)]
+    for spec in specs[:-1]:
+        container.add(1, spec)
+
+    # The last free line can still be used
+    assert container.can_fit(1, specs[-1]) and container.max_pallets(specs[-1]) > 0
+    container.add(1, specs[-1])
+
+    # Once full, neither a new item nor one already in the container is added (as can_fit_pallets did)
+    for spec in (small_spec('NEW'), specs[0]):
+        assert not container.can_fit(1, spec)
+        assert container.max_pallets(spec) == 0
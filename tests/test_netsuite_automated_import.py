@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import netsuite_automated_import
+import netsuite_csv_split
+from netsuite_automated_import import NetSuiteAutomatedImport
+
+
+@pytest.fixture
+def importer(mock_server, netsuite_config):
+    config = {**netsuite_config, 'RESTLET_URL': f"{mock_server.url}/restlet",
+              'FILE_CABINET_FOLDER_ID': '16866', 'SAVED_IMPORT_ID': '224'}
+    return NetSuiteAutomatedImport(config)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'tracking.csv'
+    path.write_text('BL,Status\nBL1,Arrived\nBL2,Sailing\n', encoding='utf-8')
+    return str(path)
+
+
+def restlet(request):
+    """RESTlet that starts one task per upload; GET answers the connection test"""
+    if request['method'] == 'POST':
+        return 200, {'success': True, 'fileId': '11', 'importTaskId': 'CSVIMPORT_1'}
+    return 200, {'message': 'RESTlet ready', 'version': '1.0'}
+
+
+def test_run_uploads_and_starts_the_import(mock_server, importer, csv_file):
+    mock_server.respond = restlet
+
+    assert importer.run(csv_file) is True
+    posts = [r for r in mock_server.requests if r['method'] == 'POST']
+    assert [(r['json']['filename'], r['json']['savedImportId']) for r in posts] == [('tracking.csv', '224')]
+
+
+def test_split_parts_are_uploaded_from_a_temp_dir_and_removed(mock_server, importer, tmp_path, monkeypatch):
+    created_parts = []
+
+    def split(path, group_column=None):
+        created_parts.extend(netsuite_csv_split.split_csv_for_import(path, max_rows=2, group_column=group_column))
+        return list(created_parts)
+
+    monkeypatch.setattr(netsuite_automated_import, 'split_csv_for_import', split)
+    source = tmp_path / 'tracking.csv'
+    source.write_text('BL,Status\n' + ''.join(f"BL{i},Arrived\n" for i in range(5)), encoding='utf-8')
+    uploaded = []
+
+    def respond(request):
+        if request['method'] == 'POST':
+            uploaded.append(request['json']['filename'])
+        return restlet(request)
+
+    mock_server.respond = respond
+
+    assert importer.run(str(source)) is True
+    assert sorted(uploaded) == ['tracking_part1.csv', 'tracking_part2.csv', 'tracking_part3.csv']
+    assert [p.name for p in tmp_path.iterdir()] == ['tracking.csv']
+    assert not any(os.path.exists(os.path.dirname(path)) for path in created_parts)
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+import pytest
+
+import NetSuite_1
+from NetSuite_1 import NetSuitePOBulkExtractor
+
+N_POS = 45
+
+
+@pytest.fixture
+def extractor(mock_server):
+    extractor = NetSuitePOBulkExtractor('1234567-sb1', 'ck', 'cs', 'tk', 'ts')
+    extractor.api_base_url = mock_server.url
+    extractor.fetcher.bucket.set_rate(1000)
+    extractor.fetcher.max_rate = 1000
+    return extractor
+
+
+def serve_purchase_orders(server, failing=(), delay=0.0):
+    """PO list pages with links.next plus one record per PO; tracks the peak number of requests in flight"""
+    stats = {'in_flight': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def respond(request):
+        with lock:
+            stats['in_flight'] += 1
+            stats['peak'] = max(stats['peak'], stats['in_flight'])
+        time.sleep(delay)
+        with lock:
+            stats['in_flight'] -= 1
+
+        path = request['path']
+        if path.endswith('/purchaseOrder'):
+            limit, offset = int(request['query']['limit']), int(request['query']['offset'])
+            ids = range(offset + 1, min(offset + limit, N_POS) + 1)
+            page = {
+                'items': [{'id': str(i), 'links': [{'rel': 'self', 'href': f"{server.url}/po/{i}"}]} for i in ids],
+                'hasMore': offset + limit < N_POS, 'offset': offset, 'count': len(ids), 'totalResults': N_POS,
+                'links': [],
+            }
+            if page['hasMore']:
+                page['links'].append({'rel': 'next', 'href': f"{server.url}{path}?limit={limit}&offset={offset + limit}"})
+            return 200, page
+        po_id = path.rsplit('/', 1)[-1]
+        if po_id in failing:
+            return 404, {'title': 'Not found'}
+        return 200, {'id': po_id, 'tranId': f"PO{po_id}", 'item': {'items': [{'line': 1}]}}
+
+    server.respond = respond
+    return stats
+
+
+def test_page_prefetch_and_detail_fetches_share_the_concurrency_limit(mock_server, extractor):
+    stats = serve_purchase_orders(mock_server, delay=0.01)
+
+    pos = list(extractor.iter_detailed_purchase_orders(page_size=10))
+
+    assert [po['id'] for po in pos] == [str(i) for i in range(1, N_POS + 1)]
+    assert stats['peak'] <= extractor.concurrency_limit
+
+
+def test_checkpoint_resumes_across_pages(mock_server, extractor, tmp_path):
+    checkpoint = str(tmp_path / 'po_fetch.jsonl')
+    serve_purchase_orders(mock_server, failing={'7', '33'})
+
+    first = list(extractor.iter_detailed_purchase_orders(page_size=10, checkpoint_path=checkpoint))
+
+    assert len(first) == N_POS - 2
+    assert os.path.exists(checkpoint)  # kept for the whole stream while POs are missing
+
+    serve_purchase_orders(mock_server)
+    mock_server.requests.clear()
+    second = list(extractor.iter_detailed_purchase_orders(page_size=10, checkpoint_path=checkpoint))
+
+    record_requests = sorted(r['path'] for r in mock_server.requests if r['path'].startswith('/po/'))
+    assert record_requests == ['/po/33', '/po/7']
+    assert sorted(int(po['id']) for po in second) == list(range(1, N_POS + 1))
+    assert not os.path.exists(checkpoint)
+
+
+def test_stream_to_json_writes_a_valid_array(extractor, tmp_path):
+    import json
+    path = str(tmp_path / 'raw.json')
+
+    passed = list(extractor.stream_to_json(iter([{'id': '1'}, {'id': '2'}]), path))
+
+    assert passed == [{'id': '1'}, {'id': '2'}]
+    with open(path) as f:
+        assert json.load(f) == passed
+
+
+def test_summary_reads_fields_missing_from_the_first_po(extractor):
+    # NetSuite omits null fields, so the first PO does not carry every key
+    pos = [
+        {'id': '1', 'tranId': 'PO1', 'tranDate': '2025-01-01', 'entity': {'id': '7', 'refName': 'Vendor A'},
+         'item': {'items': [{'line': 1}, {'line': 2}]}},
+        {'id': '2', 'tranId': 'PO2', 'tranDate': '2025-01-02', 'memo': 'hello', 'total': 12.5,
+         'status': {'id': 'B', 'refName': 'Pending Receipt'}},
+        {'id': '3', 'tranid': 'PO3', 'trandate': '2025-01-03', 'vendor': 'Vendor C', 'items': [{'line': 1}]},
+    ]
+
+    rows = extractor.extract_po_summary_safe(pos)
+
+    assert [(r['po_number'], r['po_date'], r['memo']) for r in rows] == [
+        ('PO1', '2025-01-01', ''), ('PO2', '2025-01-02', 'hello'), ('PO3', '2025-01-03', '')]
+    assert [(r['vendor_id'], r['vendor_name']) for r in rows] == [('7', 'Vendor A'), ('', ''), ('', 'Vendor C')]
+    assert [r['status_name'] for r in rows] == ['', 'Pending Receipt', '']
+    assert [r['total'] for r in rows] == [0.0, 12.5, 0.0]
+    assert [r['line_items_count'] for r in rows] == [2, 0, 1]
+
+
+def test_summary_consumes_the_stream_in_chunks(extractor, monkeypatch):
+    monkeypatch.setattr(NetSuite_1, 'SUMMARY_CHUNK_SIZE', 4)
+    consumed = []
+
+    def stream():
+        for i in range(1, 11):
+            consumed.append(i)
+            yield {'id': str(i), 'tranId': f"PO{i}"} if i % 3 else {'id': str(i), 'memo': f"m{i}"}
+
+    chunk_sizes = []
+    summarize = extractor._summarize_po_chunk
+
+    def summarize_chunk(pos, schema):
+        chunk_sizes.append((len(pos), len(consumed)))
+        return summarize(pos, schema)
+
+    monkeypatch.setattr(extractor, '_summarize_po_chunk', summarize_chunk)
+    rows = extractor.extract_po_summary_safe(stream())
+
+    assert chunk_sizes == [(4, 4), (4, 8), (2, 10)]
+    assert [r['po_number'] for r in rows] == ['PO1', 'PO2', '', 'PO4', 'PO5', '', 'PO7', 'PO8', '', 'PO10']
+    assert [r['memo'] for r in rows][:3] == ['', '', 'm3']
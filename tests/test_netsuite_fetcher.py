@@ -0,0 +1,121 @@
+import os
+import time
+
+import pytest
+import requests
+
+import netsuite_fetcher
+from netsuite_fetcher import NetSuiteRecordFetcher
+from token_bucket import TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(netsuite_fetcher.random, 'uniform', lambda low, high: 0.0)
+
+
+def record_urls(server, n):
+    return {str(i): f"{server.url}/purchaseOrder/{i}" for i in range(1, n + 1)}
+
+
+def record_id(request):
+    return request['path'].rsplit('/', 1)[-1]
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # first token is in the bucket, the other 10 refill at 50/s
+    assert time.monotonic() - start >= 0.18
+
+
+def test_fetch_retries_throttled_and_server_errors(mock_server):
+    responses = iter([
+        (429, {'title': 'Too many requests'}),
+        (400, {'o:errorDetails': [{'o:errorCode': 'CONCURRENCY_LIMIT_EXCEEDED'}]}),
+        (502, {'title': 'Bad gateway'}),
+        (200, {'id': '1', 'tranId': 'PO1'}),
+    ])
+    mock_server.respond = lambda request: next(responses)
+    fetcher = NetSuiteRecordFetcher(requests.Session(), requests_per_second=1000, backoff_base=0.001)
+
+    assert fetcher.fetch(f"{mock_server.url}/purchaseOrder/1") == {'id': '1', 'tranId': 'PO1'}
+    assert len(mock_server.requests) == 4
+    assert fetcher.throttled == 2
+    assert fetcher.bucket.rate < 1000  # halved twice, only partly recovered by the success
+
+
+def test_fetch_raises_on_client_errors_without_retry(mock_server):
+    mock_server.respond = lambda request: (404, {'title': 'Record not found'})
+    fetcher = NetSuiteRecordFetcher(requests.Session(), requests_per_second=1000, backoff_base=0.001)
+
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch(f"{mock_server.url}/purchaseOrder/1")
+    assert len(mock_server.requests) == 1
+
+
+def test_fetch_gives_up_after_max_retries(mock_server):
+    mock_server.respond = lambda request: (503, {'title': 'Unavailable'})
+    fetcher = NetSuiteRecordFetcher(requests.Session(), requests_per_second=1000, max_retries=2, backoff_base=0.001)
+
+    with pytest.raises(RuntimeError, match='after 2 retries'):
+        fetcher.fetch(f"{mock_server.url}/purchaseOrder/1")
+    assert len(mock_server.requests) == 3
+
+
+def test_fetch_all_keeps_url_order_and_sends_headers(mock_server):
+    mock_server.respond = lambda request: (200, {'id': record_id(request)})
+    fetcher = NetSuiteRecordFetcher(requests.Session(), max_workers=4, requests_per_second=1000,
+                                    headers={'Prefer': 'transient'})
+
+    results = fetcher.fetch_all(record_urls(mock_server, 20))
+
+    assert list(results) == [str(i) for i in range(1, 21)]
+    assert all(results[key] == {'id': key} for key in results)
+    assert all(request['headers']['Prefer'] == 'transient' for request in mock_server.requests)
+
+
+def test_fetch_all_respects_the_request_rate(mock_server):
+    mock_server.respond = lambda request: (200, {'id': record_id(request)})
+    fetcher = NetSuiteRecordFetcher(requests.Session(), max_workers=2, requests_per_second=40)
+
+    start = time.monotonic()
+    fetcher.fetch_all(record_urls(mock_server, 22))
+    # 2 tokens up front, the other 20 refill at 40/s
+    assert time.monotonic() - start >= 0.45
+
+
+def test_fetch_all_resumes_from_checkpoint(mock_server, tmp_path):
+    checkpoint = tmp_path / 'po_fetch.jsonl'
+    urls = record_urls(mock_server, 6)
+    missing = {'4', '5'}
+    mock_server.respond = lambda request: (
+        (404, {'title': 'Not found'}) if record_id(request) in missing else (200, {'id': record_id(request)})
+    )
+    fetcher = NetSuiteRecordFetcher(requests.Session(), max_workers=3, requests_per_second=1000, backoff_base=0.001)
+
+    first = fetcher.fetch_all(urls, checkpoint_path=str(checkpoint))
+
+    assert first['4'] is None and first['5'] is None
+    assert sum(record is not None for record in first.values()) == 4
+    # the checkpoint is kept while records are missing; add a torn line like an interrupted run leaves
+    with open(checkpoint, 'a') as f:
+        f.write('{"key": "9", "rec')
+
+    missing.discard('5')
+    mock_server.requests.clear()
+    second = fetcher.fetch_all(urls, checkpoint_path=str(checkpoint))
+
+    assert sorted(record_id(request) for request in mock_server.requests) == ['4', '5']
+    assert second['5'] == {'id': '5'} and second['4'] is None
+    assert set(fetcher.load_checkpoint(str(checkpoint))) == {'1', '2', '3', '5', '6'}
+
+    missing.clear()
+    mock_server.requests.clear()
+    third = fetcher.fetch_all(urls, checkpoint_path=str(checkpoint))
+
+    assert [record_id(request) for request in mock_server.requests] == ['4']
+    assert third == {key: {'id': key} for key in urls}
+    assert not os.path.exists(checkpoint)  # removed once everything was fetched
@@ -0,0 +1,120 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import netsuite_po_create
+from netsuite_po_create import NetSuitePOCreator
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(netsuite_po_create, 'time', SimpleNamespace(sleep=lambda seconds: None))
+
+
+def po_rows(n_pos=3, lines_per_po=2):
+    rows = []
+    for po in range(1, n_pos + 1):
+        for line in range(lines_per_po):
+            rows.append({
+                'External ID': f"20260105-093000-{po}", 'Date': '2026-01-05', 'Memo': '',
+                'Location InternalID': 9, 'Vendor InternalID': 476, 'Item InternalID': 100 + line,
+                'BOX QTY': 10 * (line + 1), 'UNIT COST_Orig': 1.5, 'Total Amount $': 15.0 * (line + 1),
+                'Exp Receipt Date': '2026-03-01',
+            })
+    return pd.DataFrame(rows)
+
+
+def eid_of(request):
+    return request['path'].rsplit('eid:', 1)[-1]
+
+
+def test_build_po_payloads_groups_lines_by_external_id(netsuite_config):
+    payloads = NetSuitePOCreator(netsuite_config).build_po_payloads(po_rows())
+
+    assert list(payloads) == ['20260105-093000-1', '20260105-093000-2', '20260105-093000-3']
+    payload = payloads['20260105-093000-1']
+    assert payload['entity'] == {'id': '476'}
+    assert payload['location'] == {'id': '9'}
+    assert payload['tranDate'] == '2026-01-05'
+    assert 'memo' not in payload  # blank cells are left out
+    assert payload['item']['items'][1] == {
+        'item': {'id': '101'}, 'quantity': 20, 'rate': 1.5, 'amount': 30.0, 'expectedReceiptDate': '2026-03-01'
+    }
+
+
+def test_upsert_puts_signed_request_on_external_id(mock_server, netsuite_config):
+    mock_server.respond = lambda request: (204, b'', {'Location': f"{mock_server.url}/purchaseOrder/777"})
+    creator = NetSuitePOCreator(netsuite_config)
+
+    result = creator.upsert_purchase_order('W1-1', {'entity': {'id': '476'}})
+
+    assert result == {'externalId': 'W1-1', 'success': True, 'id': '777'}
+    request, = mock_server.requests
+    assert request['method'] == 'PUT'
+    assert request['path'] == '/services/rest/record/v1/purchaseOrder/eid:W1-1'
+    assert request['query'] == {'replace': 'item'}
+    assert request['json'] == {'entity': {'id': '476'}}
+    assert request['headers']['Authorization'].startswith('OAuth realm="1234567_SB1"')
+
+
+@pytest.mark.parametrize('status, body', [
+    (429, {'title': 'Too many requests'}),
+    (400, {'o:errorDetails': [{'o:errorCode': 'CONCURRENCY_LIMIT_EXCEEDED'}]}),
+    (503, {'title': 'Service unavailable'}),
+])
+def test_upsert_retries_throttling_and_server_errors(mock_server, netsuite_config, status, body):
+    def respond(request):
+        return (status, body) if len(mock_server.requests) < 3 else (204, b'')
+    mock_server.respond = respond
+
+    result = NetSuitePOCreator(netsuite_config).upsert_purchase_order('W1-1', {})
+
+    assert result['success']
+    assert len(mock_server.requests) == 3
+
+
+def test_upsert_does_not_retry_validation_errors(mock_server, netsuite_config):
+    mock_server.respond = lambda request: (400, {'title': 'Invalid field value'})
+
+    result = NetSuitePOCreator(netsuite_config).upsert_purchase_order('W1-1', {})
+
+    assert not result['success']
+    assert result['error'].startswith('400')
+    assert len(mock_server.requests) == 1
+
+
+def test_upsert_gives_up_after_max_retries(mock_server, netsuite_config):
+    mock_server.respond = lambda request: (500, {'title': 'Unexpected error'})
+
+    result = NetSuitePOCreator(netsuite_config).upsert_purchase_order('W1-1', {})
+
+    assert not result['success']
+    assert len(mock_server.requests) == netsuite_po_create.MAX_RETRIES + 1
+
+
+def test_create_purchase_orders_stays_under_concurrency_limit(mock_server, netsuite_config, monkeypatch):
+    monkeypatch.setattr(netsuite_po_create, 'BATCH_SIZE', 4)
+    in_flight = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def respond(request):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        time.sleep(0.02)
+        with lock:
+            in_flight['now'] -= 1
+        if eid_of(request).endswith('-5'):
+            return 400, {'title': 'Invalid vendor'}
+        return 204, b''
+    mock_server.respond = respond
+
+    results = NetSuitePOCreator(netsuite_config, max_workers=3).create_purchase_orders(po_rows(n_pos=10))
+
+    assert [r['externalId'] for r in results] == [f"20260105-093000-{i}" for i in range(1, 11)]
+    assert [r['success'] for r in results] == [i != 5 for i in range(1, 11)]
+    assert in_flight['max'] <= 3
+    assert len(mock_server.requests) == 10
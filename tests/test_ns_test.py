@@ -0,0 +1,65 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import NS_Test
+import netsuite_import_tracker
+from NS_Test import NetSuiteIntegration
+
+
+@pytest.fixture(autouse=True)
+def no_poll_delay(monkeypatch):
+    monkeypatch.setattr(netsuite_import_tracker, 'time',
+                        SimpleNamespace(sleep=lambda seconds: None, monotonic=time.monotonic))
+
+
+@pytest.fixture
+def integration(mock_server, netsuite_config):
+    integration = NetSuiteIntegration({**netsuite_config, 'SAVED_IMPORT_ID': '224', 'FILE_CABINET_FOLDER_ID': '16866'})
+    integration.base_url = mock_server.url
+    return integration
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'tracking.csv'
+    path.write_text('BL,Status\nBL1,Arrived\nBL2,Sailing\n', encoding='utf-8')
+    return str(path)
+
+
+def netsuite(job_status):
+    """File upload, async import job start, and job status answered by job_status(request)"""
+    def respond(request):
+        if request['path'].endswith('/file/v1/files'):
+            return 201, {'id': 'F1'}
+        if request['path'].endswith('/import/job') and request['method'] == 'POST':
+            return 202, {}, {'Location': f"/services/rest/async/job/v1/import/job/J1"}
+        if '/import/job/' in request['path']:
+            return job_status(request)
+        return 200, {'items': []}
+    return respond
+
+
+def test_tracks_async_import_jobs_until_they_finish(mock_server, integration, csv_file, monkeypatch):
+    monkeypatch.setattr(NS_Test, 'WAIT_FOR_IMPORT', True)
+    replies = iter([(200, {'progress': 'PROCESSING'}), (200, {'completed': True, 'status': 'SUCCEEDED'})])
+    mock_server.respond = netsuite(lambda request: next(replies))
+
+    assert integration.process_csv_to_netsuite(csv_file) is True
+    assert len([r for r in mock_server.requests if r['path'].endswith('/import/job/J1')]) == 2
+
+
+def test_failed_import_job_fails_the_process(mock_server, integration, csv_file, monkeypatch):
+    monkeypatch.setattr(NS_Test, 'WAIT_FOR_IMPORT', True)
+    mock_server.respond = netsuite(lambda request: (200, {'completed': True, 'status': 'FAILED'}))
+
+    assert integration.process_csv_to_netsuite(csv_file) is False
+
+
+def test_tracking_stops_when_job_statuses_are_unsupported(mock_server, integration, csv_file, monkeypatch):
+    monkeypatch.setattr(NS_Test, 'WAIT_FOR_IMPORT', True)
+    mock_server.respond = netsuite(lambda request: (404, {'title': 'Not Found'}))
+
+    assert integration.process_csv_to_netsuite(csv_file) is True
+    assert len([r for r in mock_server.requests if r['path'].endswith('/import/job/J1')]) == 1
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gspread")
+pytest.importorskip("oauth2client")
+
+from PO_Check_8 import sanitize_for_sheet
+
+
+def test_sanitize_replaces_only_float_nan_and_inf():
+    df = pd.DataFrame({
+        'qty': [2.0, np.nan, np.inf, 1.5],
+        'whole': [2.0, 3.0, 4.0, 5.0],
+        'mixed': [2.0, None, 'x', float('-inf')],
+        'text': ['a', None, np.nan, 'b'],
+    })
+
+    out = sanitize_for_sheet(df)
+
+    assert out['qty'].tolist() == [2.0, 'NA', 'NA', 1.5]
+    assert out['whole'].dtype == np.float64
+    assert out['mixed'].tolist() == [2.0, None, 'x', 'NA']
+    assert isinstance(out['mixed'][0], float)
+    assert out['text'].tolist()[2] == 'NA' and out['text'].tolist()[0] == 'a'
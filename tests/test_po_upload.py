@@ -0,0 +1,32 @@
+import pandas as pd
+
+from PO_Upload_2 import build_po_upload
+
+
+def wave_inputs():
+    container_data = pd.DataFrame({
+        'Container#': [2, 1, 1, 2],
+        'Location': ['Source NJ'] * 4,
+        'Supplier': ['American Hygienics Corporation'] * 4,
+        'Item': ['A', 'B', 'A', 'C'],
+        'Quantity': [100, 200, 300, 400],
+    })
+    sku_dictionary = pd.DataFrame({'Item': ['A', 'B', 'C'], 'Payee Price': [1.0, 2.0, 3.0], 'Internal ID': [11, 12, 13]})
+    return container_data, sku_dictionary
+
+
+def test_external_ids_are_unique_per_wave():
+    first = build_po_upload(*wave_inputs(), wave_id='090000')
+    second = build_po_upload(*wave_inputs(), wave_id='140000')
+
+    today = pd.Timestamp.today().strftime('%Y%m%d')
+    assert list(first['External ID']) == [f"{today}-090000-1"] * 2 + [f"{today}-090000-2"] * 2
+    assert set(first['External ID']).isdisjoint(second['External ID'])
+
+
+def test_default_wave_id_is_the_run_time():
+    output = build_po_upload(*wave_inputs())
+
+    date, wave_id, number = output['External ID'].iloc[0].split('-')
+    assert len(wave_id) == 6 and wave_id.isdigit()
+    assert number == '1'
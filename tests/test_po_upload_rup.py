@@ -0,0 +1,75 @@
+from decimal import Decimal, ROUND_UP
+
+import numpy as np
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st
+
+from PO_Upload_2 import rup
+
+# rup is exact while |x| * 10**ndigits stays below 2**53
+NDIGITS = st.integers(min_value=-2, max_value=4)
+MAGNITUDE = 1e9
+
+
+def rup_reference(x, ndigits=0):
+    """The previous Decimal implementation of Excel ROUNDUP."""
+    q = Decimal('1').scaleb(-ndigits)
+    return float(Decimal(str(x)).quantize(q, rounding=ROUND_UP))
+
+
+def same_float(a, b):
+    """Bitwise equality, so 0.0 and -0.0 are told apart."""
+    return np.float64(a).view(np.int64) == np.float64(b).view(np.int64)
+
+
+any_floats = st.floats(min_value=-MAGNITUDE, max_value=MAGNITUDE, allow_nan=False, allow_infinity=False)
+# Prices and quantities with a few decimals sit exactly on (or next to) the rounding steps
+short_decimals = st.decimals(min_value=-10**6, max_value=10**6, places=6,
+                             allow_nan=False, allow_infinity=False).map(float)
+values = st.one_of(any_floats, short_decimals)
+
+
+@settings(max_examples=2000)
+@given(values, NDIGITS)
+def test_scalar_matches_decimal_reference(x, ndigits):
+    result = rup(x, ndigits)
+    assert isinstance(result, float)
+    assert same_float(result, rup_reference(x, ndigits))
+
+
+@settings(max_examples=300)
+@given(st.lists(values, min_size=1, max_size=50), NDIGITS)
+def test_vectorized_matches_scalar(xs, ndigits):
+    result = rup(np.array(xs), ndigits)
+    assert result.shape == (len(xs),)
+    for x, r in zip(xs, result):
+        assert same_float(r, rup(x, ndigits))
+        assert same_float(r, rup_reference(x, ndigits))
+
+
+@given(values, NDIGITS)
+def test_rounds_away_from_zero_by_less_than_one_step(x, ndigits):
+    result = rup(x, ndigits)
+    assert abs(result) >= abs(x)
+    assert abs(result) - abs(x) < 10.0 ** -ndigits * (1 + 1e-9)
+    assert result == 0 or np.sign(result) == np.sign(x)
+
+
+@pytest.mark.parametrize("x, ndigits, expected", [
+    (0.1 + 0.2, 2, 0.31),
+    (1.15, 2, 1.15),
+    (2.675, 2, 2.68),
+    (-1.001, 2, -1.01),
+    (1234.5, -2, 1300.0),
+    (0.0, 2, 0.0),
+])
+def test_known_values(x, ndigits, expected):
+    assert rup(x, ndigits) == expected
+
+
+def test_non_finite_values_pass_through():
+    result = rup(np.array([np.nan, np.inf, -np.inf, 1.001]), 2)
+    assert np.isnan(result[0])
+    assert list(result[1:]) == [np.inf, -np.inf, 1.01]
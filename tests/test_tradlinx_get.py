@@ -0,0 +1,89 @@
+import csv
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import tradlinx_get
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(tradlinx_get, 'time', SimpleNamespace(sleep=sleeps.append))
+    return sleeps
+
+
+@pytest.fixture
+def tradlinx(mock_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(tradlinx_get, 'TRADLINX_URL', f"{mock_server.url}/query?")
+    monkeypatch.setattr(tradlinx_get, 'BATCH_SIZE', 1)
+    monkeypatch.chdir(tmp_path)
+    return mock_server
+
+
+def cargo(bl):
+    return {'bl_no': bl, 'cust_order_id': 'PO-12', 'pod': {'code': 'USLAX', 'eta': '2026-01-10 08:00'},
+            'containers': [{'cntr_no': f"C{bl}"}]}
+
+
+def answer_cargos(request):
+    return 200, {'content': [cargo(bl) for bl in request['query']['bl_no'].split(',')]}
+
+
+def write_bl_file(path, bls):
+    pd.DataFrame({'bl_no': bls}).to_excel(path, sheet_name='Sheet1', index=False)
+
+
+def output_file():
+    return f"Tradlinx_Retrieve_Shipping_Tracking_Data_{tradlinx_get.datetime.today().strftime('%Y%m%d')}.csv"
+
+
+def read_bls(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['bl_no'] for row in csv.DictReader(f)]
+
+
+def test_429_waits_for_retry_after(tradlinx, sleeps):
+    replies = iter([(429, {}, {'Retry-After': '7'}), (200, {'content': [cargo('BL1')]})])
+    tradlinx.respond = lambda request: next(replies)
+
+    assert tradlinx_get.fetch_batch(tradlinx_get.create_session(), ['BL1']) == [cargo('BL1')]
+    assert sleeps == [7.0]
+
+
+def test_rerun_of_failed_bls_appends_to_the_days_output(tradlinx, sleeps):
+    write_bl_file(tradlinx_get.BL_INPUT_FILE, ['BL1', 'BL2'])
+    tradlinx.respond = lambda request: (500, {}) if 'BL2' in request['query']['bl_no'] else answer_cargos(request)
+    tradlinx_get.get_tracking_data()
+    assert read_bls(output_file()) == ['BL1']
+
+    tradlinx.respond = answer_cargos
+    tradlinx_get.get_tracking_data(tradlinx_get.FAILED_BL_FILE)
+
+    assert read_bls(output_file()) == ['BL1', 'BL2']
+
+
+def test_failed_rerun_keeps_the_days_output(tradlinx, sleeps):
+    write_bl_file(tradlinx_get.BL_INPUT_FILE, ['BL1', 'BL2'])
+    tradlinx.respond = lambda request: (500, {}) if 'BL2' in request['query']['bl_no'] else answer_cargos(request)
+    tradlinx_get.get_tracking_data()
+
+    tradlinx.respond = lambda request: (500, {})
+    tradlinx_get.get_tracking_data(tradlinx_get.FAILED_BL_FILE)
+
+    assert read_bls(output_file()) == ['BL1']
+    assert pd.read_excel(tradlinx_get.FAILED_BL_FILE)['bl_no'].tolist() == ['BL2']
+
+
+def test_clean_run_keeps_an_earlier_runs_failed_bls(tradlinx, sleeps):
+    write_bl_file(tradlinx_get.FAILED_BL_FILE, ['BL9'])
+    write_bl_file(tradlinx_get.BL_INPUT_FILE, ['BL1'])
+    tradlinx.respond = answer_cargos
+
+    tradlinx_get.get_tracking_data()
+    assert pd.read_excel(tradlinx_get.FAILED_BL_FILE)['bl_no'].tolist() == ['BL9']
+
+    tradlinx_get.get_tracking_data(tradlinx_get.FAILED_BL_FILE)
+    assert not os.path.exists(tradlinx_get.FAILED_BL_FILE)
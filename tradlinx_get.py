@@ -1,9 +1,51 @@
 import pandas as pd
 import requests
 import re
-from datetime import datetime, timedelta
+import os
+import csv
+import time
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 import json
 
+# API configuration
+TRADLINX_URL = 'https://api.tradlinx.com/partners/track/v2/cargo-tracks/query?'
+TRADLINX_HEADERS = {
+    'tx-clientid': 'EarthRated',
+    'tx-apikey': 'MjVmMTQzN2QtMzRlMS0zMjA5LWJlZjYtZTRiNjEwOWQ5Nzkw',
+    'Content-Type': 'application/json'
+}
+
+BL_INPUT_FILE = 'Tradlinx Retrieve Shipping Tracking Data.xlsx'
+# BLs of batches that still failed after all retries; rerun with get_tracking_data(FAILED_BL_FILE),
+# which appends the recovered rows to the same day's output CSV
+FAILED_BL_FILE = 'Tradlinx Failed BLs.xlsx'
+
+BATCH_SIZE = 50          # BL numbers per query
+MAX_WORKERS = 4          # batches in flight at once
+MAX_RETRIES = 4          # retries per batch on timeouts, connection errors, 429 and 5xx
+BACKOFF_BASE = 2         # seconds, doubled on every retry (with jitter); a 429's Retry-After wins
+BACKOFF_CAP = 60
+REQUEST_TIMEOUT = (10, 60)  # connect, read seconds
+
+EVENT_COLUMNS = [
+    'CONTAINER_PICK_UP', 'GATE_IN', 'GATE_OUT',
+    'LOADING_ON_VESSEL', 'VESSEL_DEPARTURE_FROM_PORT',
+    'VESSEL_ARRIVAL_AT_PORT', 'DISCHARGING_FROM_VESSEL',
+    'RAIL_LOADING', 'RAIL_ARRIVAL',
+    'PICKING_UP_BY_CONSIGNEE', 'EMPTY_CONTAINER_RETURN'
+]
+OUTPUT_COLUMNS = [
+    'bl_no', 'cust_order_id', 'cur_vessel_nm',
+    'pol_etd', 'pol_atd', 'pod_code', 'pod_eta', 'pod_ata',
+    'cntr_no', 'with_extend_tracking',
+    *EVENT_COLUMNS,
+    'EXPECTED_DELIVERY_DATE', 'created_pol_atd'
+]
+
 def extract_number(cust_order_id):
     """Extract all digits from cust_order_id"""
     if pd.isna(cust_order_id) or cust_order_id is None:
@@ -60,236 +102,199 @@ def create_pol_atd(pol_atd, loading_on_vessel):
     else:
         return ''
 
-def get_tracking_data():
+def cargo_to_rows(cargo):
+    """One output row per container of a cargo-track result (one row with an empty cntr_no if it has none)"""
+    base_data = {
+        'bl_no': cargo.get('bl_no'),
+        'cust_order_id': extract_number(cargo.get('cust_order_id')),
+        'cur_vessel_nm': cargo.get('cur_vessel_nm', 'N/A'),
+        'pol_etd': format_datetime(cargo.get('pol', {}).get('etd')),
+        'pol_atd': format_datetime(cargo.get('pol', {}).get('atd')),
+        'pod_code': cargo.get('pod', {}).get('code', ''),
+        'pod_eta': format_datetime(cargo.get('pod', {}).get('eta')),
+        'pod_ata': format_datetime(cargo.get('pod', {}).get('ata')),
+        'with_extend_tracking': cargo.get('with_extend_tracking', False)
+    }
+
+    rows = []
+    for container in cargo.get('containers', []) or [{}]:
+        container_data = {**base_data, 'cntr_no': container.get('cntr_no', '')}
+        container_data.update({column: '' for column in EVENT_COLUMNS})
+
+        # Map all the extended tracking events (field name is 'tracking_point'; the last event of a type wins)
+        for event in container.get('tracking_point', []):
+            if event.get('type') in EVENT_COLUMNS:
+                container_data[event['type']] = format_datetime(event.get('event_datetime'))
+
+        # Calculate expected delivery date using pod_ata (fallback to pod_eta)
+        container_data['EXPECTED_DELIVERY_DATE'] = calculate_expected_delivery_date(
+            container_data['pod_code'],
+            container_data['pod_ata'],
+            container_data['pod_eta']
+        )
+
+        # Create the new created_pol_atd column
+        container_data['created_pol_atd'] = create_pol_atd(
+            container_data['pol_atd'],
+            container_data['LOADING_ON_VESSEL']
+        )
+        rows.append(container_data)
+    return rows
+
+def create_session():
+    """Keep-alive session with one pooled connection per worker"""
+    session = requests.Session()
+    session.headers.update(TRADLINX_HEADERS)
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session.mount('https://', adapter)
+    return session
+
+def retry_after_seconds(response):
+    """Wait requested by a Retry-After header (delay in seconds or an HTTP date), None if absent or invalid"""
+    value = response.headers.get('Retry-After', '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def fetch_batch(session, batch):
+    """
+    Query one batch of BL numbers and return its cargo-track results. Timeouts, connection errors,
+    429 and 5xx responses are retried with exponential backoff (or after the 429's Retry-After);
+    other errors raise immediately.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            response = session.get(
+                TRADLINX_URL,
+                params={'version': 'EA', 'bl_no': ','.join(batch)},
+                timeout=REQUEST_TIMEOUT
+            )
+            if response.status_code != 429 and response.status_code < 500:
+                response.raise_for_status()
+                return response.json().get('content', [])
+            error = requests.exceptions.HTTPError(f"{response.status_code} {response.reason}", response=response)
+            if response.status_code == 429:
+                retry_after = retry_after_seconds(response)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+
+        if attempt == MAX_RETRIES:
+            raise error
+        delay = retry_after if retry_after is not None else \
+            min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+        print(f"⚠️  Batch starting {batch[0]} failed ({error}), retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+        time.sleep(delay)
+
+def save_failed_bls(failed, rerun=False):
+    """
+    Write BLs of failed batches (with the error) in the input file layout. When a rerun of FAILED_BL_FILE
+    recovered every BL the file is removed; other runs leave an earlier run's failures in place.
+    """
+    if failed:
+        pd.DataFrame(failed, columns=['bl_no', 'error']).to_excel(FAILED_BL_FILE, sheet_name='Sheet1', index=False)
+        print(f"❌ {len(failed)} BL numbers failed, saved to {FAILED_BL_FILE} (rerun with get_tracking_data('{FAILED_BL_FILE}'))")
+    elif rerun and os.path.exists(FAILED_BL_FILE):
+        os.remove(FAILED_BL_FILE)
+
+def print_output_stats(df):
+    print(f"Total records: {len(df)}")
+
+    # Check if extended tracking is enabled
+    extended_tracking_count = (df['with_extend_tracking'].astype(str) == 'True').sum()
+    print(f"Records with extended tracking: {extended_tracking_count}")
+
+    # Check if any events were captured
+    total_events = 0
+    for col in EVENT_COLUMNS:
+        events_in_col = (df[col] != '').sum()
+        if events_in_col > 0:
+            print(f"{col}: {events_in_col} events found")
+        total_events += events_in_col
+
+    if total_events == 0:
+        print("No extended tracking events found in any records")
+    else:
+        print(f"Total extended tracking events captured: {total_events}")
+
+    # Check expected delivery date calculations
+    expected_delivery_count = (df['EXPECTED_DELIVERY_DATE'] != '').sum()
+    print(f"Records with expected delivery date calculated: {expected_delivery_count}")
+
+    # Check created_pol_atd calculations
+    created_pol_atd_count = (df['created_pol_atd'] != '').sum()
+    print(f"Records with created_pol_atd populated: {created_pol_atd_count}")
+
+def get_tracking_data(bl_file=BL_INPUT_FILE, append=None):
+    """
+    Query the BLs of bl_file and write their rows to the dated output CSV. With append (default: when
+    rerunning FAILED_BL_FILE) rows are added to an existing output of the same day instead of replacing it.
+    """
+    rerun = os.path.abspath(bl_file) == os.path.abspath(FAILED_BL_FILE)
+    if append is None:
+        append = rerun
+
     # Read BL numbers from Excel
     try:
-        bl_data = pd.read_excel('Tradlinx Retrieve Shipping Tracking Data.xlsx', sheet_name='Sheet1')
-        bl_nos = bl_data['bl_no'].tolist()
+        bl_data = pd.read_excel(bl_file, sheet_name='Sheet1')
+        bl_nos = [str(bl).strip() for bl in bl_data['bl_no'].dropna()]
     except Exception as e:
         print(f"Error reading Excel file: {e}")
         return
-    
-    # API configuration
-    url = 'https://api.tradlinx.com/partners/track/v2/cargo-tracks/query?'
-    headers = {
-        'tx-clientid': 'EarthRated',
-        'tx-apikey': 'MjVmMTQzN2QtMzRlMS0zMjA5LWJlZjYtZTRiNjEwOWQ5Nzkw',
-        'Content-Type': 'application/json'
-    }
-    
-    output = []
-    
-    # Process BL numbers in batches of 50
-    for i in range(0, len(bl_nos), 50):
-        batch = bl_nos[i:i+50]
-        try:
-            print(f"Processing batch: {batch}")
-            response = requests.get(
-                url,
-                headers=headers,
-                params={'version': 'EA', 'bl_no': ','.join(batch)}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            for cargo in data.get('content', []):
-                # Process base data with datetime formatting
-                base_data = {
-                    'bl_no': cargo.get('bl_no'),
-                    'cust_order_id': extract_number(cargo.get('cust_order_id')),
-                    'cur_vessel_nm': cargo.get('cur_vessel_nm', 'N/A'),
-                    'pol_etd': format_datetime(cargo.get('pol', {}).get('etd')),
-                    'pol_atd': format_datetime(cargo.get('pol', {}).get('atd')),
-                    'pod_code': cargo.get('pod', {}).get('code', ''),
-                    'pod_eta': format_datetime(cargo.get('pod', {}).get('eta')),
-                    'pod_ata': format_datetime(cargo.get('pod', {}).get('ata')),
-                    'with_extend_tracking': cargo.get('with_extend_tracking', False)
-                }
-                print(f"Base data: {base_data}")
-                
-                # Process containers
-                containers = cargo.get('containers', [])
-                print(f"Number of containers found: {len(containers)}")
-                
-                if containers:
-                    for idx, container in enumerate(containers):
-                        print(f"Container {idx + 1}: {container.get('cntr_no', 'N/A')}")
-                        
-                        # FIXED: Use correct field name 'tracking_point' instead of 'trackingPoint'
-                        tracking_points = container.get('tracking_point', [])
-                        print(f"  Number of tracking points: {len(tracking_points)}")
-                        
-                        if tracking_points:
-                            print("  Tracking points found:")
-                            for tp in tracking_points:
-                                print(f"    - Type: {tp.get('type')}, DateTime: {tp.get('event_datetime')}")
-                        else:
-                            print("  No tracking points found")
-                        
-                        container_data = {
-                            **base_data,
-                            'cntr_no': container.get('cntr_no', ''),
-                            'CONTAINER_PICK_UP': '',
-                            'GATE_IN': '',
-                            'GATE_OUT': '',
-                            'LOADING_ON_VESSEL': '',
-                            'VESSEL_DEPARTURE_FROM_PORT': '',
-                            'VESSEL_ARRIVAL_AT_PORT': '',
-                            'DISCHARGING_FROM_VESSEL': '',
-                            'RAIL_LOADING': '',
-                            'RAIL_ARRIVAL': '',
-                            'PICKING_UP_BY_CONSIGNEE': '',
-                            'EMPTY_CONTAINER_RETURN': ''
-                        }
-                        
-                        # FIXED: Process container events using correct field name
-                        events_found = 0
-                        for event in container.get('tracking_point', []):
-                            event_type = event.get('type')
-                            event_datetime = format_datetime(event.get('event_datetime'))
-                            
-                            print(f"    Processing event: {event_type} = {event_datetime}")
-                            
-                            # Map all the extended tracking events
-                            if event_type == 'CONTAINER_PICK_UP':
-                                container_data['CONTAINER_PICK_UP'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'GATE_IN':
-                                container_data['GATE_IN'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'GATE_OUT':
-                                container_data['GATE_OUT'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'LOADING_ON_VESSEL':
-                                container_data['LOADING_ON_VESSEL'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'VESSEL_DEPARTURE_FROM_PORT':
-                                container_data['VESSEL_DEPARTURE_FROM_PORT'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'VESSEL_ARRIVAL_AT_PORT':
-                                container_data['VESSEL_ARRIVAL_AT_PORT'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'DISCHARGING_FROM_VESSEL':
-                                container_data['DISCHARGING_FROM_VESSEL'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'RAIL_LOADING':
-                                container_data['RAIL_LOADING'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'RAIL_ARRIVAL':
-                                container_data['RAIL_ARRIVAL'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'PICKING_UP_BY_CONSIGNEE':
-                                container_data['PICKING_UP_BY_CONSIGNEE'] = event_datetime
-                                events_found += 1
-                            elif event_type == 'EMPTY_CONTAINER_RETURN':
-                                container_data['EMPTY_CONTAINER_RETURN'] = event_datetime
-                                events_found += 1
-                        
-                        # Calculate expected delivery date using pod_ata (fallback to pod_eta)
-                        container_data['EXPECTED_DELIVERY_DATE'] = calculate_expected_delivery_date(
-                            container_data['pod_code'], 
-                            container_data['pod_ata'],
-                            container_data['pod_eta']
-                        )
-                        
-                        # Create the new created_pol_atd column
-                        container_data['created_pol_atd'] = create_pol_atd(
-                            container_data['pol_atd'],
-                            container_data['LOADING_ON_VESSEL']
-                        )
-                        
-                        print(f"    Total events captured: {events_found}")
-                        output.append(container_data)
-                else:
-                    # If no containers, add base data only
-                    print("  No containers found, adding base data only")
-                    base_container_data = {
-                        **base_data,
-                        'cntr_no': '',
-                        'CONTAINER_PICK_UP': '',
-                        'GATE_IN': '',
-                        'GATE_OUT': '',
-                        'LOADING_ON_VESSEL': '',
-                        'VESSEL_DEPARTURE_FROM_PORT': '',
-                        'VESSEL_ARRIVAL_AT_PORT': '',
-                        'DISCHARGING_FROM_VESSEL': '',
-                        'RAIL_LOADING': '',
-                        'RAIL_ARRIVAL': '',
-                        'PICKING_UP_BY_CONSIGNEE': '',
-                        'EMPTY_CONTAINER_RETURN': ''
-                    }
-                    
-                    # Calculate expected delivery date for base data using pod_ata (fallback to pod_eta)
-                    base_container_data['EXPECTED_DELIVERY_DATE'] = calculate_expected_delivery_date(
-                        base_container_data['pod_code'], 
-                        base_container_data['pod_ata'],
-                        base_container_data['pod_eta']
-                    )
-                    
-                    # Create the new created_pol_atd column for base data
-                    base_container_data['created_pol_atd'] = create_pol_atd(
-                        base_container_data['pol_atd'],
-                        base_container_data['LOADING_ON_VESSEL']
-                    )
-                    
-                    output.append(base_container_data)
-                print("---")
-                    
-        except requests.exceptions.RequestException as e:
-            print(f"Error retrieving data for batch {i//50+1}: {e}")
-    
-    # Create DataFrame and save to CSV
-    if output:
-        df = pd.DataFrame(output)
-        df = df[[
-            'bl_no', 'cust_order_id', 'cur_vessel_nm',
-            'pol_etd', 'pol_atd', 'pod_code', 'pod_eta', 'pod_ata',
-            'cntr_no', 'with_extend_tracking',
-            'CONTAINER_PICK_UP', 'GATE_IN', 'GATE_OUT', 
-            'LOADING_ON_VESSEL', 'VESSEL_DEPARTURE_FROM_PORT',
-            'VESSEL_ARRIVAL_AT_PORT', 'DISCHARGING_FROM_VESSEL',
-            'RAIL_LOADING', 'RAIL_ARRIVAL', 
-            'PICKING_UP_BY_CONSIGNEE', 'EMPTY_CONTAINER_RETURN',
-            'EXPECTED_DELIVERY_DATE', 'created_pol_atd'  # Added the new column
-        ]]
-        
-        # Generate filename with current date
-        today = datetime.today().strftime('%Y%m%d')
-        filename = f'Tradlinx_Retrieve_Shipping_Tracking_Data_{today}.csv'
-        df.to_csv(filename, index=False)
-        print(f"Data saved to {filename}")
-        print(f"Total records: {len(df)}")
-        
-        # Check if extended tracking is enabled
-        extended_tracking_count = df['with_extend_tracking'].sum()
-        print(f"Records with extended tracking: {extended_tracking_count}")
-        
-        # Check if any events were captured
-        event_columns = ['CONTAINER_PICK_UP', 'GATE_IN', 'GATE_OUT', 'LOADING_ON_VESSEL', 
-                        'VESSEL_DEPARTURE_FROM_PORT', 'VESSEL_ARRIVAL_AT_PORT', 'DISCHARGING_FROM_VESSEL',
-                        'RAIL_LOADING', 'RAIL_ARRIVAL', 'PICKING_UP_BY_CONSIGNEE', 'EMPTY_CONTAINER_RETURN']
-        total_events = 0
-        for col in event_columns:
-            events_in_col = (df[col] != '').sum()
-            if events_in_col > 0:
-                print(f"{col}: {events_in_col} events found")
-            total_events += events_in_col
-        
-        if total_events == 0:
-            print("No extended tracking events found in any records")
+
+    batches = [bl_nos[i:i + BATCH_SIZE] for i in range(0, len(bl_nos), BATCH_SIZE)]
+    print(f"Querying {len(bl_nos)} BL numbers in {len(batches)} batches ({MAX_WORKERS} at a time)")
+
+    # Generate filename with current date; rows are appended as each batch completes
+    today = datetime.today().strftime('%Y%m%d')
+    filename = f'Tradlinx_Retrieve_Shipping_Tracking_Data_{today}.csv'
+    failed = []
+    total_rows = 0
+    existing = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+
+    session = create_session()
+    with open(filename, 'a' if existing else 'w', newline='', encoding='utf-8') as f, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+        if existing:
+            print(f"Appending to {filename}")
         else:
-            print(f"Total extended tracking events captured: {total_events}")
-        
-        # Check expected delivery date calculations
-        expected_delivery_count = (df['EXPECTED_DELIVERY_DATE'] != '').sum()
-        print(f"Records with expected delivery date calculated: {expected_delivery_count}")
-        
-        # Check created_pol_atd calculations
-        created_pol_atd_count = (df['created_pol_atd'] != '').sum()
-        print(f"Records with created_pol_atd populated: {created_pol_atd_count}")
-        
+            writer.writeheader()
+
+        futures = {executor.submit(fetch_batch, session, batch): batch for batch in batches}
+        for done, future in enumerate(as_completed(futures), 1):
+            batch = futures[future]
+            try:
+                cargos = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Batch {done}/{len(batches)} failed after {MAX_RETRIES} retries: {e}")
+                failed.extend((bl, str(e)) for bl in batch)
+                continue
+
+            rows = [row for cargo in cargos for row in cargo_to_rows(cargo)]
+            writer.writerows(rows)
+            f.flush()
+            total_rows += len(rows)
+            print(f"✅ Batch {done}/{len(batches)}: {len(cargos)} BLs, {len(rows)} rows written")
+
+    save_failed_bls(failed, rerun=rerun)
+
+    if total_rows:
+        print(f"Data saved to {filename}")
+        print_output_stats(pd.read_csv(filename, dtype=str, keep_default_na=False))
     else:
+        # Only a file this run created is removed, an earlier output of the day is kept
+        if not existing:
+            os.remove(filename)
         print("No data retrieved")
 
 if __name__ == "__main__":
-    get_tracking_data()
\ No newline at end of file
+    get_tracking_data()